@@ -1,2 +1,5 @@
-from .tello import Tello, TelloException, BackgroundFrameRead
-from .swarm import TelloSwarm
\ No newline at end of file
+from .tello import Tello, TelloException, StaleStateError, BackgroundFrameRead, QueryResult
+from .swarm import TelloSwarm, SwarmResult
+from .network import TelloNetwork
+from .choreography import Choreography, Timeline
+from .health import StateStreamMonitor, LinkManager
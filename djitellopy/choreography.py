@@ -0,0 +1,262 @@
+"""공통 단조 시계에 맞춰 여러 드론의 안무를 실행하는 타임라인 엔진.
+Timeline engine executing keyframed choreography for many drones against a shared monotonic clock.
+"""
+
+import time
+from collections import namedtuple
+from threading import Thread
+from typing import List
+
+from .tello import Tello, TelloException
+from .swarm import TelloSwarm
+from .tracing import span
+
+ScheduledCommand = namedtuple('ScheduledCommand', ['at', 'drone', 'command', 'expects_response'])
+ScheduledCommand.__doc__ = """컴파일된 스케줄의 항목 / entry of a compiled schedule.
+`at` is the planned execution time in seconds relative to the start of the show."""
+
+TimingRecord = namedtuple('TimingRecord', ['at', 'command', 'error', 'response'])
+TimingRecord.__doc__ = """실행된 명령의 타이밍 / timing of an executed command.
+`error`는 (실제 전송 시각 + 선행 전송 시간) - `at` (초), 즉 전송 시각의 오차입니다. 잠듦 지터와 명령 잠금 대기만
+나타내며, 드론에 실제로 도착한 시각의 오차(네트워크 지연의 변동)는 측정하지 않습니다.
+`error` is (actual send time + lookahead) - `at` in seconds, i.e. the send timing error. It only covers sleep
+jitter and waiting for the command lock, not the variation of the network latency."""
+
+
+class Timeline:
+    """드론 한 대의 키프레임 궤적. 모든 시각은 쇼 시작 기준 초 단위입니다.
+    Keyframed trajectory of a single drone. All times are seconds from the start of the show.
+
+    ```python
+    timeline = Timeline().takeoff(0).move(4, 'up', 50).curve(7, 50, 50, 0, 100, 0, 0, 30).land(15)
+    ```
+    """
+
+    def __init__(self):
+        self.keyframes = []
+
+    def command(self, at: float, command: str, expects_response: bool = True) -> 'Timeline':
+        """`at`초에 임의의 SDK 명령을 실행합니다.
+        Execute an arbitrary SDK command at `at` seconds.
+        """
+        self.keyframes.append((float(at), command, expects_response))
+        return self
+
+    def takeoff(self, at: float) -> 'Timeline':
+        return self.command(at, 'takeoff')
+
+    def land(self, at: float) -> 'Timeline':
+        return self.command(at, 'land')
+
+    def move(self, at: float, direction: str, distance: int) -> 'Timeline':
+        """[Tello.move][djitellopy.tello.Tello.move]과 같습니다 / same as Tello.move"""
+        return self.command(at, '{} {}'.format(direction, distance))
+
+    def rotate(self, at: float, degrees: int) -> 'Timeline':
+        """양수는 시계 방향, 음수는 반시계 방향 / positive is clockwise, negative counter clockwise"""
+        if degrees >= 0:
+            return self.command(at, 'cw {}'.format(degrees))
+        return self.command(at, 'ccw {}'.format(-degrees))
+
+    def go(self, at: float, x: int, y: int, z: int, speed: int) -> 'Timeline':
+        """[Tello.go_xyz_speed][djitellopy.tello.Tello.go_xyz_speed]과 같습니다"""
+        return self.command(at, 'go {} {} {} {}'.format(x, y, z, speed))
+
+    def curve(self, at: float, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int) -> 'Timeline':
+        """[Tello.curve_xyz_speed][djitellopy.tello.Tello.curve_xyz_speed]과 같습니다"""
+        return self.command(at, 'curve {} {} {} {} {} {} {}'.format(x1, y1, z1, x2, y2, z2, speed))
+
+    def rc(self, at: float, duration: float, left_right_velocity: int, forward_backward_velocity: int,
+           up_down_velocity: int, yaw_velocity: int) -> 'Timeline':
+        """`duration`초 동안 RC 속도 구간을 유지한 뒤 정지합니다.
+        Hold an RC velocity segment for `duration` seconds, then stop.
+        """
+        cmd = 'rc {} {} {} {}'.format(left_right_velocity, forward_backward_velocity,
+                                      up_down_velocity, yaw_velocity)
+        steps = max(1, int(round(duration / Choreography.RC_INTERVAL)))
+        for step in range(steps):
+            self.command(at + step * Choreography.RC_INTERVAL, cmd, expects_response=False)
+        return self.command(at + duration, 'rc 0 0 0 0', expects_response=False)
+
+
+class ChoreographyReport:
+    """드론별 타이밍 오차 보고서 / per-drone timing error report.
+
+    `records[i]`는 드론 `i`가 실행한 [TimingRecord][djitellopy.choreography.TimingRecord] 목록입니다.
+    """
+
+    def __init__(self, records: List[List[TimingRecord]]):
+        self.records = records
+
+    def max_error(self, drone: int) -> float:
+        """드론 하나의 최대 절대 전송 시각 오차 (초) / largest absolute send timing error of one drone in seconds"""
+        errors = [abs(record.error) for record in self.records[drone]]
+        return max(errors) if errors else 0.0
+
+    @property
+    def max_errors(self) -> List[float]:
+        return [self.max_error(i) for i in range(len(self.records))]
+
+    @property
+    def failures(self) -> List[tuple]:
+        """응답이 없거나 오류였던 `(drone, TimingRecord)` 목록 / records without an 'ok'"""
+        return [(i, record) for i, records in enumerate(self.records) for record in records
+                if record.response is not None and record.response != 'ok']
+
+    def __repr__(self):
+        return "ChoreographyReport(max_errors={})".format(['{:.3f}'.format(e) for e in self.max_errors])
+
+
+class Choreography:
+    """여러 드론의 [Timeline][djitellopy.choreography.Timeline]을 하나의 스케줄로 컴파일하고
+    공통 단조 시계에 맞춰 실행합니다.
+    Compile the timelines of many drones into one schedule and execute it against a
+    shared monotonic clock.
+
+    각 명령은 측정된 편도 지연 시간만큼 미리 전송되므로(lookahead) 드론에 도착하는 시각이 맞춰집니다.
+    Every command is transmitted ahead of time by the measured one-way latency
+    (lookahead), so that it arrives at the drone on schedule.
+
+    ```python
+    show = Choreography(swarm)
+    for i in range(len(swarm)):
+        show.add(i, Timeline().takeoff(0).move(5, 'up', 30 + i * 10).land(12))
+    report = show.run()
+    print(report.max_errors)
+    ```
+    """
+
+    # RC 구간을 보내는 주기 (초) / interval of RC segment packets
+    RC_INTERVAL = 0.05
+    # 목표 시각 직전에는 sleep 대신 바쁜 대기를 합니다 / busy-wait this close to a deadline
+    SPIN_THRESHOLD = 0.002
+    RESPONSE_POLL_INTERVAL = 0.002
+
+    def __init__(self, swarm: TelloSwarm, lookahead=None):
+        """
+        Arguments:
+            swarm: 안무를 실행할 스웜 / swarm executing the show
+            lookahead: 드론별 선행 전송 시간 (초). 생략하면 run()이 측정합니다.
+                seconds to transmit ahead per drone; measured by run() when omitted
+        """
+        self.swarm = swarm
+        self.timelines = [Timeline() for _ in swarm.tellos]
+        self.lookahead = lookahead
+
+    def add(self, drone: int, timeline: Timeline):
+        """드론 `drone`의 타임라인을 설정합니다 / set the timeline of drone `drone`"""
+        self.timelines[drone] = timeline
+
+    def compile(self) -> List[ScheduledCommand]:
+        """모든 타임라인을 시각 순으로 정렬된 스케줄로 변환합니다.
+        Convert all timelines into one schedule sorted by time.
+        """
+        schedule = []
+        for drone, timeline in enumerate(self.timelines):
+            keyframes = sorted(timeline.keyframes, key=lambda keyframe: keyframe[0])
+            for (at, command, expects_response), following in zip(keyframes, keyframes[1:] + [None]):
+                if at < 0:
+                    raise TelloException("Keyframe '{}' of drone #{} is scheduled before the start"
+                                         .format(command, drone))
+                if expects_response and following is not None and following[0] == at:
+                    raise TelloException("Drone #{} has two keyframes at {} seconds".format(drone, at))
+                schedule.append(ScheduledCommand(at, drone, command, expects_response))
+
+        schedule.sort(key=lambda entry: (entry.at, entry.drone))
+        return schedule
+
+    def measure_lookahead(self) -> List[float]:
+        """'command' 명령을 브로드캐스트하여 드론별 편도 지연 시간을 추정합니다.
+        Estimate the one-way latency per drone by broadcasting the 'command' command.
+        """
+        result = self.swarm.broadcast('command', timeout=Tello.RESPONSE_TIMEOUT)
+        return [duration / 2 if duration is not None else 0.0 for duration in result.durations]
+
+    def run(self, start_delay: float = 1.0) -> ChoreographyReport:
+        """스케줄을 실행하고 모든 드론이 끝나면 보고서를 반환합니다.
+        Execute the schedule and return the report once every drone has finished.
+
+        Arguments:
+            start_delay: 전송 준비를 위해 쇼 시작 전에 기다리는 시간 (초)
+                seconds between calling run() and the start of the show
+        """
+        schedule = self.compile()
+        lookahead = self.lookahead if self.lookahead is not None else self.measure_lookahead()
+
+        per_drone = [[] for _ in self.swarm.tellos]
+        for entry in schedule:
+            per_drone[entry.drone].append(entry)
+
+        records = [[] for _ in self.swarm.tellos]
+        start = time.monotonic() + start_delay
+
+        threads = []
+        for drone, entries in enumerate(per_drone):
+            thread = Thread(target=self._execute, daemon=True,
+                            args=(self.swarm.tellos[drone], entries, start, lookahead[drone], records[drone]))
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        report = ChoreographyReport(records)
+        Tello.LOGGER.info("Choreography finished: %s", report)
+        return report
+
+    def _execute(self, tello: Tello, entries: List[ScheduledCommand], start: float, lookahead: float,
+                 records: List[TimingRecord]):
+        """드론 한 대의 스케줄을 실행하는 스레드 함수.
+        Thread worker executing the schedule of a single drone.
+        """
+        for entry in entries:
+            at = start + entry.at
+            self._sleep_until(at - lookahead)
+
+            # keepalive 등 다른 스레드가 응답을 가로채지 않도록 키프레임마다 명령 잠금을 잡습니다.
+            # Hold the command lock per keyframe so keepalives on other threads cannot steal the ack.
+            with tello.command_lock, span('choreography_keyframe', command=entry.command):
+                response = None
+                if not entry.expects_response:
+                    sent_at = time.monotonic()
+                    tello.send_command_without_return(entry.command)
+                else:
+                    # 단일 드론 명령과 같은 경로: 타임아웃 정책, 응답 검증, 메트릭
+                    # Same path as single-drone commands: timeout policy, reply validation, metrics
+                    timeout = tello.timeout_policy.timeout_for(entry.command, tello.speed)
+                    sent_at = tello._send_expecting_response(entry.command)
+                    while True:
+                        packet = tello._poll_response(entry.command, sent_at)
+                        if packet is not None:
+                            received_at, response = packet
+                            tello._record_response(entry.command, response, received_at - sent_at)
+                            break
+                        if time.monotonic() - sent_at > timeout:
+                            tello._record_timeout(entry.command, timeout)
+                            response = ''
+                            break
+                        time.sleep(self.RESPONSE_POLL_INTERVAL)
+
+                    if response == 'ok' and entry.command in TelloSwarm.FLIGHT_STATE_COMMANDS:
+                        tello.is_flying = TelloSwarm.FLIGHT_STATE_COMMANDS[entry.command]
+
+                # 드론 도착 시각은 알 수 없으므로 (전송 시각 + 측정한 편도 지연) - 계획 시각을 기록합니다.
+                # 잠듦 지터와 잠금 대기 시간을 나타내며, 실제 도착 오차는 지연 시간의 변동만큼 더 클 수 있습니다
+                # The arrival time cannot be observed, so this is (send time + measured one-way
+                # latency) - planned time: it captures sleep jitter and lock waits only.
+                error = sent_at + lookahead - at
+
+            records.append(TimingRecord(entry.at, entry.command, error, response))
+
+    def _sleep_until(self, deadline: float):
+        """대부분은 sleep하고 마지막 SPIN_THRESHOLD 동안만 다른 스레드에 양보하며 기다립니다.
+        Sleep for most of the wait and only spin, yielding to other threads, for the last SPIN_THRESHOLD.
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if remaining > self.SPIN_THRESHOLD:
+                time.sleep(remaining - self.SPIN_THRESHOLD)
+            else:
+                time.sleep(0)
@@ -0,0 +1,229 @@
+"""여러 대의 Tello가 보내는 UDP 패킷을 드론별로 분배하는 모듈.
+Demultiplexes UDP packets from many Tellos into per-drone ring buffers.
+"""
+
+import logging
+import socket
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from threading import Thread, Lock
+from types import MappingProxyType
+from typing import Optional
+
+from .events import EVENTS
+
+LOGGER = logging.getLogger('djitellopy')
+
+# 드론 한 대당 보관하는 패킷 수 / packets kept per drone and channel
+RESPONSE_RING_SIZE = 64
+STATE_RING_SIZE = 8
+
+# 수신 스레드가 종료 요청을 확인하는 주기 (초) / how often receivers check for stop()
+RECEIVE_POLL_INTERVAL = 0.5
+
+# 50대 이상의 드론이 동시에 보내는 패킷을 견딜 수 있도록 커널 버퍼를 키웁니다
+# Enlarge the kernel buffer so bursts from 50+ drones are not dropped
+SOCKET_RECEIVE_BUFFER = 4 * 1024 * 1024
+PACKET_BUFFER_SIZE = 2048
+
+
+class PacketRing:
+    """고정 크기의 패킷 링 버퍼. 수신 스레드 하나가 쓰고 소비자 하나가 읽습니다.
+    Fixed size ring of raw packets with a single producer and a single consumer.
+
+    `deque.append`와 `deque.popleft`는 원자적이므로 락이 필요하지 않습니다.
+    When the ring is full the oldest packet is overwritten and counted in `dropped`.
+    """
+
+    __slots__ = ('_packets', 'capacity', 'received', 'dropped')
+
+    def __init__(self, capacity: int):
+        self._packets = deque(maxlen=capacity)
+        self.capacity = capacity
+        self.received = 0
+        self.dropped = 0
+
+    def push(self, data: bytes, received_at: float):
+        """패킷과 수신 시각(time.monotonic)을 추가합니다.
+        Append a packet together with its monotonic receive timestamp.
+        """
+        if len(self._packets) == self.capacity:
+            self.dropped += 1
+        self.received += 1
+        self._packets.append((received_at, data))
+
+    def pop(self) -> Optional[tuple]:
+        """가장 오래된 `(received_at, data)`를 꺼냅니다. 비어 있으면 None.
+        Remove and return the oldest `(received_at, data)` or None if empty.
+        """
+        try:
+            return self._packets.popleft()
+        except IndexError:
+            return None
+
+    def pop_since(self, since: float) -> Optional[tuple]:
+        """`since` 이후에 수신된 가장 오래된 패킷을 꺼냅니다. 그보다 오래된 패킷은 버립니다.
+        Pop the oldest packet received at or after `since`, discarding older ones.
+        """
+        while True:
+            packet = self.pop()
+            if packet is None or packet[0] >= since:
+                return packet
+
+    def latest(self) -> Optional[tuple]:
+        """가장 최근 패킷을 제거하지 않고 반환합니다.
+        Return the newest packet without removing it.
+        """
+        try:
+            return self._packets[-1]
+        except IndexError:
+            return None
+
+    def clear(self):
+        self._packets.clear()
+
+    def __len__(self):
+        return len(self._packets)
+
+    def __bool__(self):
+        return bool(self._packets)
+
+
+class DroneSlot:
+    """드론 한 대의 응답 링과 상태 링.
+    Response and state rings of a single drone.
+
+    상태 패킷은 수신 스레드에서 파싱하지 않고 원본 그대로 저장합니다.
+    파싱은 `get_current_state`가 호출될 때 최신 패킷에 대해서만 한 번 수행됩니다.
+    State packets are stored raw; parsing happens lazily and only for the newest packet.
+    """
+
+    __slots__ = ('host', 'responses', 'states', '_parsed_at', '_parsed_state')
+
+    def __init__(self, host: str):
+        self.host = host
+        self.responses = PacketRing(RESPONSE_RING_SIZE)
+        self.states = PacketRing(STATE_RING_SIZE)
+        self._parsed_at = None
+        self._parsed_state = {}
+
+    def parsed_state(self, parse) -> dict:
+        """최신 상태 패킷을 `parse`로 변환한 dict를 반환합니다 (캐시됨).
+        Return the newest state packet converted by `parse`, cached per packet.
+        """
+        latest = self.states.latest()
+        if latest is None:
+            return self._parsed_state
+
+        received_at, data = latest
+        if received_at != self._parsed_at:
+            state = parse(data.decode('ASCII', errors='ignore'))
+            state['received_at'] = datetime.now() - timedelta(seconds=time.monotonic() - received_at)
+            self._parsed_state = state
+            self._parsed_at = received_at
+
+        return self._parsed_state
+
+
+class DroneRegistry:
+    """호스트 주소 → DroneSlot 인덱스. 멤버가 바뀔 때마다 불변 매핑을 통째로 교체합니다.
+    Host address → DroneSlot index. The mapping is immutable and swapped
+    atomically on every membership change, so receiver threads read it without locking.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.index = MappingProxyType({})
+
+    def register(self, host: str) -> DroneSlot:
+        with self._lock:
+            slot = DroneSlot(host)
+            index = dict(self.index)
+            index[host] = slot
+            self.index = MappingProxyType(index)
+            return slot
+
+    def unregister(self, host: str, slot: Optional[DroneSlot] = None):
+        """드론을 제거합니다. `slot`이 주어지면 그 슬롯이 아직 등록된 경우에만 제거합니다.
+        Remove a drone. If `slot` is given it is only removed while it is still the registered one.
+        """
+        with self._lock:
+            current = self.index.get(host)
+            if current is None or (slot is not None and current is not slot):
+                return
+            index = dict(self.index)
+            del index[host]
+            self.index = MappingProxyType(index)
+
+    def __contains__(self, host):
+        return host in self.index
+
+    def __getitem__(self, host) -> DroneSlot:
+        return self.index[host]
+
+
+class Demultiplexer:
+    """UDP 소켓 하나를 읽어 패킷을 드론별 링에 넣는 수신 스레드.
+    Receiver thread that reads one UDP socket into the per-drone rings.
+
+    미리 할당한 버퍼에 `recvfrom_into`로 받아 패킷당 할당을 최소화합니다.
+    Packets are received with `recvfrom_into` into a preallocated buffer.
+    """
+
+    def __init__(self, sock: socket.socket, registry: DroneRegistry, channel: str, name: str):
+        self.sock = sock
+        self.registry = registry
+        self.channel = channel
+        self.unknown_packets = 0
+        self.stopped = False
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RECEIVE_BUFFER)
+        except OSError as e:
+            LOGGER.debug('Could not enlarge receive buffer of %s: %s', name, e)
+        sock.settimeout(RECEIVE_POLL_INTERVAL)
+
+        self.thread = Thread(target=self.run, name=name, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, timeout: float = RECEIVE_POLL_INTERVAL * 2):
+        """수신 스레드를 멈추고 종료될 때까지 기다립니다.
+        Stop the receiver thread and wait for it to exit.
+        """
+        self.stopped = True
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+    def run(self):
+        """수신 루프. 내부 메서드로, 일반적으로 직접 호출하지 않습니다.
+        Receive loop. Internal method, you normally wouldn't call this yourself.
+        """
+        buffer = bytearray(PACKET_BUFFER_SIZE)
+        view = memoryview(buffer)
+        recvfrom_into = self.sock.recvfrom_into
+        registry = self.registry
+        channel = self.channel
+        monotonic = time.monotonic
+        emit = EVENTS.emit
+
+        while not self.stopped:
+            try:
+                size, address = recvfrom_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                # 소켓이 닫히면 스레드를 종료합니다 / socket was closed
+                LOGGER.debug('%s stopped: %s', self.thread.name, e)
+                break
+
+            slot = registry.index.get(address[0])
+            if slot is None:
+                self.unknown_packets += 1
+                continue
+
+            emit('packet', 'Data received from %s at %s', address[0], self.thread.name)
+
+            getattr(slot, channel).push(bytes(view[:size]), monotonic())
@@ -2,14 +2,32 @@
 이 파일은 @301_Moved_Permanently의 StackOverflow 게시물을 기반으로 합니다.
 참조: https://stackoverflow.com/a/50622643
 
-이 코드는 클래스 자체에 데코레이터를 추가하여 
+이 코드는 클래스 자체에 데코레이터를 추가하여
 클래스의 모든 메서드를 래핑할 수 있도록 수정되었습니다.
+
+타입 검사기는 함수가 처음 호출될 때 한 번만 컴파일되며, 어노테이션이 있는 매개변수만 검사합니다.
+어노테이션이 있는 매개변수가 없는 함수는 래핑하지 않습니다.
+Checkers are compiled once, on the first call of each function, and only cover
+annotated parameters; functions without annotated parameters are not wrapped at all.
+
+타입 검사 끄기 / disabling type checks:
+- `python -O` 또는 환경 변수 `DJITELLOPY_ENFORCE_TYPES=0`: 임포트 시점에 래핑하지 않음
+  (`python -O` or `DJITELLOPY_ENFORCE_TYPES=0`: nothing is wrapped at import time)
+- `set_type_checking(False)`: 실행 중에 모든 클래스의 원래 메서드로 되돌림
+  (`set_type_checking(False)`: restore the original methods of all classes at runtime)
+- `set_type_checking(False, Tello)`: 특정 클래스만 되돌림 (only one class)
 """
 
-import inspect
+import os
 import typing
-from contextlib import suppress
 from functools import wraps
+from types import FunctionType
+
+# -O 모드에서는 assert와 마찬가지로 타입 검사를 생략합니다
+# Like asserts, type checks are skipped under -O
+ENABLED = __debug__ and os.environ.get('DJITELLOPY_ENFORCE_TYPES', '1') != '0'
+
+_decorated_classes = []
 
 
 def _is_unparameterized_special_typing(type_hint):
@@ -22,48 +40,165 @@ def _is_unparameterized_special_typing(type_hint):
         return False
 
 
+def _resolve_type(type_hint):
+    """타입 힌트를 isinstance에 쓸 수 있는 타입(또는 튜플)으로 바꿉니다.
+    모든 값을 허용해야 하면 None을 반환합니다.
+    Convert a type hint into something usable with isinstance, or None to accept anything.
+    """
+    if type_hint is typing.Any or isinstance(type_hint, (str, typing.TypeVar)) \
+            or _is_unparameterized_special_typing(type_hint):
+        return None
+
+    origin = getattr(type_hint, "__origin__", None)
+    if origin is typing.Union:
+        resolved = []
+        for arg in type_hint.__args__:
+            arg_type = _resolve_type(arg)
+            if arg_type is None:
+                return None
+            resolved.extend(arg_type if isinstance(arg_type, tuple) else (arg_type,))
+        return tuple(resolved)
+
+    if origin is not None:
+        actual_type = origin
+    elif hasattr(type_hint, "__args__") and type_hint.__args__ is not None:
+        actual_type = type_hint.__args__
+    else:
+        actual_type = type_hint
+
+    # PEP 484: float 자리에는 int도 허용됩니다 / int is acceptable where float is expected
+    if actual_type is float:
+        return (int, float)
+
+    if not isinstance(actual_type, (type, tuple)):
+        return None
+
+    return actual_type
+
+
+def _compile_checker(func):
+    """함수의 인자 검사기를 만듭니다. 검사할 매개변수가 없으면 None을 반환합니다.
+    Build the argument checker of a function, or None if there is nothing to check.
+    """
+    # inspect는 임포트 비용이 크므로 필요할 때 불러옵니다 / inspect is slow to import
+    import inspect
+
+    spec = inspect.getfullargspec(func)
+    defaults = dict(zip(reversed(spec.args), reversed(spec.defaults or ())))
+    defaults.update(spec.kwonlydefaults or {})
+
+    checks = []
+    for name in spec.args + spec.kwonlyargs:
+        if name not in spec.annotations:
+            continue  # 타입 어노테이션이 없는 매개변수는 모든 타입 허용
+
+        type_hint = spec.annotations[name]
+        expected = _resolve_type(type_hint)
+        if expected is None:
+            continue
+
+        # 기본값이 None이면 None도 허용합니다 (암시적 Optional)
+        # A None default implies Optional
+        if name in defaults and defaults[name] is None:
+            expected = (expected if isinstance(expected, tuple) else (expected,)) + (type(None),)
+
+        position = spec.args.index(name) if name in spec.args else None
+        checks.append((position, name, expected, type_hint))
+
+    if not checks:
+        return None
+
+    checks = tuple(checks)
+
+    def check_types(args, kwargs):
+        for position, name, expected, type_hint in checks:
+            if position is not None and position < len(args):
+                value = args[position]
+            elif name in kwargs:
+                value = kwargs[name]
+            else:
+                continue
+
+            if not isinstance(value, expected):
+                raise TypeError("Unexpected type for '{}' (expected {} but found {})"
+                                .format(name, type_hint, type(value)))
+
+    return check_types
+
+
+def _accept_all(args, kwargs):
+    pass
+
+
+def _decorate(func):
+    if not any(name != 'return' for name in getattr(func, '__annotations__', {})):
+        return func
+
+    # 임포트 시간을 줄이기 위해 검사기는 첫 호출 때 컴파일합니다
+    # The checker is compiled on the first call to keep import time low
+    checker = []
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not checker:
+            checker.append(_compile_checker(func) or _accept_all)
+        checker[0](args, kwargs)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _decorate_class(target):
+    # 원래 메서드와 래핑된 메서드를 모두 보관하여 나중에 켜고 끌 수 있게 합니다
+    # Keep both the original and the wrapped members so checks can be toggled later
+    members = {}
+    for name, member in list(vars(target).items()):
+        if isinstance(member, (staticmethod, classmethod)):
+            wrapped_func = _decorate(member.__func__)
+            wrapped = type(member)(wrapped_func) if wrapped_func is not member.__func__ else member
+        elif isinstance(member, FunctionType):
+            wrapped = _decorate(member)
+        else:
+            continue
+
+        if wrapped is not member:
+            members[name] = (member, wrapped)
+            setattr(target, name, wrapped)
+
+    target.__enforce_types_members__ = members
+    _decorated_classes.append(target)
+    return target
+
+
+def set_type_checking(enabled: bool, target=None):
+    """실행 중에 타입 검사를 켜거나 끕니다. 끄면 원래 메서드가 복원되어 오버헤드가 없습니다.
+    Enable or disable type checks at runtime. Disabling restores the original
+    methods, so the checks cost nothing afterwards.
+
+    ```python
+    from djitellopy.enforce_types import set_type_checking
+    set_type_checking(False)         # 모든 클래스 / every decorated class
+    set_type_checking(False, Tello)  # 한 클래스만 / a single class
+    ```
+
+    `python -O` 또는 `DJITELLOPY_ENFORCE_TYPES=0`으로 임포트한 경우에는 켤 수 없습니다.
+    Has no effect if checks were disabled at import time.
+    """
+    targets = _decorated_classes if target is None else [target]
+    for cls in targets:
+        for name, (original, wrapped) in getattr(cls, '__enforce_types_members__', {}).items():
+            setattr(cls, name, wrapped if enabled else original)
+
+
 def enforce_types(target):
     """모든 멤버 함수에 타입 체크를 추가하는 클래스 데코레이터
     """
-    def check_types(spec, *args, **kwargs):
-        # 매개변수와 인자를 매핑
-        parameters = dict(zip(spec.args, args))
-        parameters.update(kwargs)
-        for name, value in parameters.items():
-            with suppress(KeyError):  # 타입 어노테이션이 없는 매개변수는 모든 타입 허용
-                type_hint = spec.annotations[name]
-                if _is_unparameterized_special_typing(type_hint):
-                    continue
-
-                if hasattr(type_hint, "__origin__") and type_hint.__origin__ is not None:
-                    actual_type = type_hint.__origin__
-                elif hasattr(type_hint, "__args__") and type_hint.__args__ is not None:
-                    actual_type = type_hint.__args__
-                else:
-                    actual_type = type_hint
-
-                if not isinstance(value, actual_type):
-                    raise TypeError("Unexpected type for '{}' (expected {} but found {})"
-                                    .format(name, type_hint, type(value)))
-
-    def decorate(func):
-        # 함수의 매개변수 정보 가져오기
-        spec = inspect.getfullargspec(func)
-
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            check_types(spec, *args, **kwargs)
-            return func(*args, **kwargs)
-
-        return wrapper
-
-    if inspect.isclass(target):
-        # 클래스인 경우 모든 메서드에 데코레이터 적용
-        members = inspect.getmembers(target, predicate=inspect.isfunction)
-        for name, func in members:
-            setattr(target, name, decorate(func))
-
+    if not ENABLED:
         return target
+
+    if isinstance(target, type):
+        # 클래스인 경우 모든 메서드에 데코레이터 적용
+        return _decorate_class(target)
     else:
         # 함수인 경우 해당 함수에만 데코레이터 적용
-        return decorate(target)
+        return _decorate(target)
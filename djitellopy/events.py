@@ -0,0 +1,113 @@
+"""명령/패킷 경로에서 사용하는 가벼운 구조화 로깅 계층.
+Cheap structured logging for the command and packet hot paths.
+
+이벤트는 카테고리(command, response, rc, state, packet)별 레벨과 샘플링 비율을 가지며,
+메시지는 실제로 출력되거나 덤프될 때만 포맷됩니다.
+Events have a per-category level and sampling rate, and messages are only
+formatted when they are actually emitted or dumped.
+
+```python
+Tello.EVENTS.set_sampling('rc', 20)      # RC 명령은 20개 중 1개만 기록
+Tello.EVENTS.enable_ring(10000)          # 메모리 링에 모든 이벤트 보관
+...
+print('\\n'.join(Tello.EVENTS.dump()))
+```
+"""
+
+import logging
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# 로그 레코드의 파일/줄 번호가 emit()이 아닌 호출한 쪽을 가리키게 합니다 (Python 3.8+)
+# Make filename/lineno of records point at the caller of emit()
+_LOG_KWARGS = {'stacklevel': 2} if sys.version_info >= (3, 8) else {}
+
+DEFAULT_LEVELS = {
+    'command': logging.INFO,
+    'response': logging.INFO,
+    'rc': logging.DEBUG,
+    'state': logging.DEBUG,
+    'packet': logging.DEBUG,
+}
+
+
+class EventLog:
+    """카테고리별 레벨 검사, 샘플링, 선택적인 메모리 링을 갖춘 이벤트 기록기.
+    Event recorder with per-category level guards, sampling and an optional in-memory ring.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.levels: Dict[str, int] = dict(DEFAULT_LEVELS)
+        self.sampling: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.ring: Optional[deque] = None
+
+    def set_level(self, category: str, level: int):
+        """카테고리의 로그 레벨을 설정합니다 / set the logging level of a category"""
+        self.levels[category] = level
+
+    def set_sampling(self, category: str, every: int):
+        """카테고리 이벤트를 `every`개 중 하나만 로거로 보냅니다. 1이면 모두 보냅니다.
+        Only pass one in `every` events of a category to the logger; 1 passes all.
+        메모리 링에는 샘플링과 관계없이 모두 기록됩니다 / the ring always records everything.
+        """
+        if every <= 1:
+            self.sampling.pop(category, None)
+        else:
+            self.sampling[category] = every
+
+    def enable_ring(self, size: int = 4096):
+        """최근 `size`개의 이벤트를 메모리에 보관합니다.
+        Keep the latest `size` events in memory.
+        """
+        self.ring = deque(maxlen=size)
+
+    def disable_ring(self):
+        self.ring = None
+
+    def emit(self, category: str, msg: str, *args, level: Optional[int] = None):
+        """이벤트를 기록합니다. `msg`는 `%` 형식이며 필요할 때만 포맷됩니다.
+        Record an event. `msg` uses `%` placeholders and is only formatted when needed.
+        """
+        ring = self.ring
+        if ring is not None:
+            # deque.append는 원자적이므로 락이 필요 없습니다 / deque.append is atomic
+            ring.append((time.time(), category, msg, args))
+
+        if level is None:
+            level = self.levels.get(category, logging.INFO)
+        if not self.logger.isEnabledFor(level):
+            return
+
+        every = self.sampling.get(category)
+        if every is not None:
+            count = self.counters.get(category, 0) + 1
+            self.counters[category] = count
+            if count % every:
+                return
+
+        self.logger.log(level, msg, *args, **_LOG_KWARGS)
+
+    def dump(self, clear: bool = False) -> List[str]:
+        """메모리 링의 이벤트를 포맷된 문자열 목록으로 반환합니다.
+        Return the events of the ring as formatted lines.
+        """
+        if self.ring is None:
+            return []
+
+        events = list(self.ring)
+        if clear:
+            self.ring.clear()
+
+        lines = []
+        for timestamp, category, msg, args in events:
+            clock = time.strftime('%H:%M:%S', time.localtime(timestamp))
+            millis = int((timestamp % 1) * 1000)
+            lines.append('{}.{:03d} [{}] {}'.format(clock, millis, category, msg % args if args else msg))
+        return lines
+
+
+EVENTS = EventLog(logging.getLogger('djitellopy'))
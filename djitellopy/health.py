@@ -0,0 +1,252 @@
+"""상태 스트림 감시와 keepalive/링크 품질 관리.
+State stream monitoring and keepalive / link quality management.
+"""
+
+import logging
+import time
+from threading import Thread, Event
+from typing import Callable, Optional
+
+from .tello import Tello, StaleStateError
+from . import metrics
+
+LOGGER = logging.getLogger('djitellopy')
+
+
+class StateStreamMonitor:
+    """백그라운드 스레드에서 드론별 상태 패킷의 나이를 확인하고, 스트림이 끊기거나 다시 살아나면
+    콜백을 호출합니다. 스레드 없이 `check()`나 `raise_if_stalled()`를 직접 호출해도 됩니다.
+    Watches the age of each drone's newest state packet from a background thread
+    and invokes callbacks when a stream stalls or recovers. `check()` and
+    `raise_if_stalled()` can also be called directly without the thread.
+
+    ```python
+    def stalled(tello, age):
+        print(tello.address[0], 'no state for', age, 'seconds')
+        tello.send_rc_control(0, 0, 0, 0)
+
+    with StateStreamMonitor(swarm.tellos, max_age=1.0, on_stall=stalled):
+        ...
+    ```
+
+    Arguments:
+        tellos: 감시할 [Tello][tello] 또는 그 목록 / a Tello or a list of them
+        max_age: 이보다 오래된 상태는 끊긴 것으로 봅니다 (초) / state older than this counts as stalled
+        on_stall: 스트림이 끊겼을 때 `(tello, age)`로 호출됩니다. 상태를 받은 적이 없으면 age는 None
+        on_recover: 스트림이 다시 살아났을 때 `(tello)`로 호출됩니다
+    """
+
+    CHECK_INTERVAL = 0.1
+
+    def __init__(self, tellos, max_age: float = 1.0,
+                 on_stall: Optional[Callable[[Tello, Optional[float]], None]] = None,
+                 on_recover: Optional[Callable[[Tello], None]] = None):
+        self.tellos = [tellos] if isinstance(tellos, Tello) else list(tellos)
+        self.max_age = max_age
+        self.on_stall = on_stall
+        self.on_recover = on_recover
+        self.stalled = []
+        self.stopped = Event()
+        self.thread: Optional[Thread] = None
+
+    def check(self) -> list:
+        """모든 드론을 한 번 확인하고, 끊긴 드론의 목록을 반환합니다.
+        Check every drone once and return the list of stalled drones.
+        """
+        stalled = []
+        for tello in self.tellos:
+            if tello.is_state_fresh(self.max_age):
+                if tello in self.stalled:
+                    LOGGER.info("State stream of %s recovered", tello.address[0])
+                    self._call(self.on_recover, tello)
+                continue
+
+            stalled.append(tello)
+            if tello not in self.stalled:
+                age = tello._state_age()
+                LOGGER.warning("State stream of %s stalled (age: %s)", tello.address[0], age)
+                metrics.STATE_STALLS.labels(tello.address[0]).inc()
+                self._call(self.on_stall, tello, age)
+
+        self.stalled = stalled
+        return stalled
+
+    def raise_if_stalled(self):
+        """끊긴 드론이 있으면 StaleStateError를 발생시킵니다.
+        Raise StaleStateError if any drone's state stream has stalled.
+        """
+        stalled = self.check()
+        if stalled:
+            hosts = ', '.join(tello.address[0] for tello in stalled)
+            raise StaleStateError('No state packets within {} seconds from: {}'.format(self.max_age, hosts))
+
+    def _call(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception:
+            LOGGER.exception("State stream callback failed")
+
+    def start(self):
+        """백그라운드 감시를 시작합니다 / start watching in the background"""
+        if self.thread is not None and self.thread.is_alive():
+            return self
+        self.stopped.clear()
+        self.thread = Thread(target=self._run, name='djitellopy-state-monitor', daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.wait(self.CHECK_INTERVAL):
+            self.check()
+
+    def stop(self, timeout: float = None):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class LinkManager:
+    """드론 한 대의 링크를 관리하는 백그라운드 스레드. 명령 채널이 `idle_time`초 동안 쉬고 있으면
+    keepalive를 보내 15초 자동 착륙을 막고, 그 응답 시간으로 RTT를 측정하며, 주기적으로 Wi-Fi SNR을
+    조회합니다. RC 명령을 보내는 중이거나 다른 명령이 진행 중(명령 잠금이 잡혀 있음)이면 건너뛰므로
+    다른 명령의 응답을 가로채지 않습니다.
+    Background thread managing the link of a single drone. When the command
+    channel has been idle for `idle_time` seconds it sends a keepalive (preventing
+    the 15 s auto-land) and measures the RTT from its response; it also samples the
+    Wi-Fi SNR periodically. It skips while RC packets are streaming or another
+    command holds the command lock, so it never steals a response.
+
+    ```python
+    link = LinkManager(tello).start()
+    ...  # 오래 걸리는 LLM 호출 중에도 드론이 착륙하지 않습니다
+    print(link.rtt, link.snr)
+    link.stop()
+    ```
+
+    Arguments:
+        tello: 관리할 [Tello][tello]
+        idle_time: keepalive를 보내기 전 명령 채널이 쉬어야 하는 시간 (초)
+        snr_interval: Wi-Fi SNR 조회 주기 (초). None이면 조회하지 않습니다
+        only_when_flying: 비행 중일 때만 keepalive를 보냅니다 / only keep a flying drone alive
+    """
+
+    CHECK_INTERVAL = 0.25
+    RC_ACTIVE_WINDOW = 1.0  # 최근 이 시간 안에 RC 명령을 보냈으면 스트리밍 중으로 봅니다 (초)
+
+    def __init__(self, tello: Tello, idle_time: float = 5.0, snr_interval: Optional[float] = 10.0,
+                 only_when_flying: bool = True):
+        self.tello = tello
+        self.idle_time = idle_time
+        self.snr_interval = snr_interval
+        self.only_when_flying = only_when_flying
+
+        self.rtt: Optional[float] = None
+        self.snr: Optional[int] = None
+        self.keepalives = 0
+        self.failures = 0
+        self.last_snr_sample = 0.0
+
+        self.stopped = Event()
+        self.thread: Optional[Thread] = None
+
+    def _last_activity(self) -> float:
+        tello = self.tello
+        return max(tello.last_received_command_timestamp, tello.last_rc_control_timestamp)
+
+    def is_idle(self) -> bool:
+        """명령 채널이 `idle_time`초 이상 쉬고 있는지 여부 / whether the command channel is idle"""
+        return time.time() - self._last_activity() >= self.idle_time
+
+    def is_rc_active(self) -> bool:
+        """최근에 RC 명령을 보냈는지 여부 / whether RC packets are currently streaming"""
+        return time.time() - self.tello.last_rc_control_timestamp < self.RC_ACTIVE_WINDOW
+
+    def tick(self):
+        """한 번의 점검. 필요하면 keepalive나 SNR 조회를 보냅니다.
+        A single check; sends a keepalive or SNR query when due.
+        """
+        tello = self.tello
+        if self.is_rc_active():
+            return
+
+        snr_due = self.snr_interval is not None and time.monotonic() - self.last_snr_sample >= self.snr_interval
+        keepalive_due = self.is_idle() and (tello.is_flying or not self.only_when_flying)
+        if not (snr_due or keepalive_due):
+            return
+
+        # 다른 명령이 진행 중이면 그 자체가 링크 활동이므로 건너뜁니다
+        # A command in flight is link activity in itself, so skip this round
+        if not tello.command_lock.acquire(blocking=False):
+            return
+        try:
+            if keepalive_due:
+                self._send_keepalive()
+            if snr_due:
+                self._sample_snr()
+        finally:
+            tello.command_lock.release()
+
+    def _send_keepalive(self):
+        host = self.tello.address[0]
+        start = time.monotonic()
+        response = self.tello.send_command_with_return('keepalive')
+        if 'ok' in response.lower():
+            self.rtt = time.monotonic() - start
+            self.keepalives += 1
+            self.failures = 0
+            metrics.KEEPALIVES.labels(host, 'ok').inc()
+            metrics.LINK_RTT.labels(host).set(self.rtt)
+        else:
+            self.failures += 1
+            metrics.KEEPALIVES.labels(host, 'failed').inc()
+            LOGGER.warning("Keepalive to %s failed (%s in a row): %s", host, self.failures, response)
+
+    def _sample_snr(self):
+        self.last_snr_sample = time.monotonic()
+        response = self.tello.send_command_with_return('wifi?')
+        try:
+            self.snr = int(response)
+        except ValueError:
+            LOGGER.debug("Unexpected Wi-Fi SNR response from %s: %s", self.tello.address[0], response)
+            return
+        metrics.WIFI_SNR.labels(self.tello.address[0]).set(self.snr)
+
+    def start(self):
+        """백그라운드 관리를 시작합니다 / start managing the link in the background"""
+        if self.thread is not None and self.thread.is_alive():
+            return self
+        self.stopped.clear()
+        self.thread = Thread(target=self._run, name='djitellopy-link-{}'.format(self.tello.address[0]),
+                             daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.wait(self.CHECK_INTERVAL):
+            try:
+                self.tick()
+            except Exception:
+                LOGGER.exception("Link manager of %s failed", self.tello.address[0])
+
+    def stop(self, timeout: float = None):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -0,0 +1,319 @@
+"""명령, 상태, 비디오 경로의 상태를 보여주는 메트릭 레지스트리.
+Metrics registry with counters, gauges and histograms for the command, state and video paths.
+
+값은 프로세스 안에서 `REGISTRY.collect()`로 읽거나, `start_http_server()`로 Prometheus
+텍스트 형식을 제공하는 엔드포인트를 열어 수집할 수 있습니다.
+Read values in-process with `REGISTRY.collect()` or serve them in the Prometheus
+text format with `start_http_server()`.
+
+```python
+from djitellopy import metrics
+metrics.start_http_server(9100)   # http://localhost:9100/metrics
+print(metrics.REGISTRY.get_sample_value('djitellopy_commands_total', {'host': '192.168.10.1'}))
+```
+"""
+
+import math
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+
+class _Value:
+    """락으로 보호되는 숫자 하나 / a single number protected by a lock"""
+
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = Lock()
+
+
+class _CounterChild(_Value):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+
+class _GaugeChild(_Value):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'lock')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = Lock()
+
+    def observe(self, value: float):
+        with self.lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+
+class Metric(ABC):
+    """레이블별 하위 값을 갖는 메트릭의 공통 부분. 하위 클래스는 `_new_child`를 구현해야 합니다.
+    Common part of metrics holding one child value per label combination.
+    Subclasses must implement `_new_child`.
+    """
+
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = Lock()
+
+    @abstractmethod
+    def _new_child(self):
+        """레이블 조합 하나의 새 하위 값 / a new child value for one label combination"""
+
+    def labels(self, *values):
+        """레이블 값에 해당하는 하위 값을 반환합니다 / return the child for the given label values"""
+        try:
+            return self._children[values]
+        except KeyError:
+            if len(values) != len(self.labelnames):
+                raise ValueError('{} expects labels {}'.format(self.name, self.labelnames))
+            with self._lock:
+                return self._children.setdefault(values, self._new_child())
+
+    def _samples(self) -> List[Sample]:
+        samples = []
+        for values, child in list(self._children.items()):
+            samples.extend(self._child_samples(dict(zip(self.labelnames, values)), child))
+        return samples
+
+    def _child_samples(self, labels, child) -> List[Sample]:
+        return [(self.name, labels, child.value)]
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    TYPE = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _child_samples(self, labels, child) -> List[Sample]:
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            samples.append((self.name + '_bucket', dict(labels, le=_format_value(bound)), cumulative))
+        samples.append((self.name + '_bucket', dict(labels, le='+Inf'), child.count))
+        samples.append((self.name + '_sum', labels, child.sum))
+        samples.append((self.name + '_count', labels, child.count))
+        return samples
+
+
+class MetricsRegistry:
+    """메트릭과 수집 시점 콜백(collector)의 모음.
+    Collection of metrics and scrape-time collector callbacks.
+
+    collector는 `(metric_name, type, help, samples)` 튜플 목록을 반환하는 함수로,
+    링 버퍼의 카운터처럼 이미 다른 곳에 있는 값을 핫 패스 비용 없이 노출할 때 사용합니다.
+    Collectors expose values that are already tracked elsewhere (e.g. ring buffer
+    counters) without any hot path cost.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], list]] = []
+        self._lock = Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], list]):
+        self._collectors.append(collector)
+
+    def _families(self) -> list:
+        families = [(metric.name, metric.TYPE, metric.documentation, metric._samples())
+                    for metric in list(self._metrics.values())]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def collect(self) -> List[Sample]:
+        """모든 샘플을 `(name, labels, value)` 목록으로 반환합니다.
+        Return every sample as a list of `(name, labels, value)`.
+        """
+        return [sample for _, _, _, samples in self._families() for sample in samples]
+
+    def get_sample_value(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """샘플 하나의 값을 반환합니다. 없으면 None / value of a single sample or None"""
+        labels = labels or {}
+        for sample_name, sample_labels, value in self.collect():
+            if sample_name == name and sample_labels == labels:
+                return value
+        return None
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (0.0.4) / Prometheus text exposition format"""
+        lines = []
+        for name, metric_type, documentation, samples in self._families():
+            lines.append('# HELP {} {}'.format(name, documentation))
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+            for sample_name, labels, value in samples:
+                if labels:
+                    label_text = ','.join('{}="{}"'.format(key, _escape(str(label)))
+                                          for key, label in labels.items())
+                    lines.append('{}{{{}}} {}'.format(sample_name, label_text, _format_value(value)))
+                else:
+                    lines.append('{} {}'.format(sample_name, _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    # Prometheus 텍스트 형식은 무한대와 NaN을 +Inf, -Inf, NaN으로 씁니다
+    # The text format spells infinities and NaN as +Inf, -Inf and NaN
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def start_http_server(port: int, addr: str = '', registry: Optional[MetricsRegistry] = None):
+    """`/metrics`에서 Prometheus 텍스트를 제공하는 HTTP 서버를 백그라운드 스레드로 시작합니다.
+    Serve the registry as Prometheus text on `/metrics` from a background thread.
+
+    Returns:
+        서버 객체. `shutdown()`으로 멈출 수 있습니다 / the server; stop it with `shutdown()`
+    """
+    # http.server는 임포트 비용이 크므로 필요할 때 불러옵니다
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from threading import Thread
+
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    class Server(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    server = Server((addr, port), Handler)
+    Thread(target=server.serve_forever, name='djitellopy-metrics', daemon=True).start()
+    return server
+
+
+REGISTRY = MetricsRegistry()
+
+COMMANDS = REGISTRY.counter(
+    'djitellopy_commands_total', 'Commands sent that expect a response', ['host'])
+COMMAND_RESULTS = REGISTRY.counter(
+    'djitellopy_command_results_total', 'Command outcomes (ok, error, timeout)', ['host', 'result'])
+COMMAND_RETRIES = REGISTRY.counter(
+    'djitellopy_command_retries_total', 'Commands sent again after a timeout or error', ['host', 'command_class'])
+COMMAND_LATE_RESPONSES = REGISTRY.counter(
+    'djitellopy_command_late_responses_total',
+    'Responses that arrived after the timeout, before a non-idempotent command was re-sent',
+    ['host', 'command_class'])
+COMMAND_LATENCY = REGISTRY.histogram(
+    'djitellopy_command_response_seconds', 'Time between sending a command and its response', ['host'])
+RESPONSES_DISCARDED = REGISTRY.counter(
+    'djitellopy_responses_discarded_total',
+    'Responses that did not answer the in-flight command (late, mismatched)', ['host', 'reason'])
+STATE_STALLS = REGISTRY.counter(
+    'djitellopy_state_stalls_total', 'Times the state stream of a drone stopped', ['host'])
+KEEPALIVES = REGISTRY.counter(
+    'djitellopy_keepalives_total', 'Keepalives sent by the link manager', ['host', 'result'])
+LINK_RTT = REGISTRY.gauge(
+    'djitellopy_link_rtt_seconds', 'Round trip time of the latest keepalive', ['host'])
+WIFI_SNR = REGISTRY.gauge(
+    'djitellopy_wifi_snr', 'Latest Wi-Fi signal to noise ratio reported by the drone', ['host'])
+RC_COMMANDS = REGISTRY.counter(
+    'djitellopy_rc_commands_total', 'RC control packets sent', ['host'])
+FRAMES_DECODED = REGISTRY.counter(
+    'djitellopy_frames_decoded_total', 'Video frames decoded', ['address'])
+FRAMES_DROPPED = REGISTRY.counter(
+    'djitellopy_frames_dropped_total', 'Decoded frames dropped because the frame queue was full', ['address'])
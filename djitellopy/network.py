@@ -0,0 +1,152 @@
+"""Tello 드론과 통신하는 UDP 소켓과 수신 스레드를 소유하는 전송 계층.
+Transport layer owning the UDP sockets and receiver threads used to talk to Tellos.
+"""
+
+import socket
+import time
+import weakref
+from threading import Lock
+from typing import Optional
+
+from .demux import Demultiplexer, DroneRegistry, DroneSlot
+from .metrics import REGISTRY
+
+DEFAULT_CONTROL_PORT = 8889
+DEFAULT_STATE_PORT = 8890
+
+_networks = weakref.WeakSet()
+
+
+class TelloNetwork:
+    """로컬 제어/상태 포트 한 쌍과 그 수신 스레드들을 묶은 객체.
+    A pair of local control/state ports together with their receiver threads.
+
+    여러 인스턴스를 만들어 서로 다른 포트에 바인딩하면 한 프로세스 또는 한 호스트에서
+    독립적인 스웜이나 테스트 하네스를 동시에 실행할 수 있습니다.
+    포트에 0을 주면 운영체제가 빈 포트를 고릅니다.
+    Create several instances bound to different ports to run independent swarms or
+    test harnesses side by side. Passing port 0 lets the OS pick a free port.
+
+    ```python
+    network = TelloNetwork(control_port=9000, state_port=9001)
+    tello = Tello('192.168.10.1', network=network)
+    ```
+
+    Arguments:
+        bind_host: 바인딩할 로컬 주소 / local address to bind to ('' for all interfaces)
+        control_port: 명령을 보내고 응답을 받는 로컬 포트 / local port for commands and responses
+        state_port: 상태 패킷을 받는 로컬 포트 / local port receiving state packets
+    """
+
+    _default: Optional['TelloNetwork'] = None
+    _default_lock = Lock()
+
+    def __init__(self, bind_host: str = '', control_port: int = DEFAULT_CONTROL_PORT,
+                 state_port: int = DEFAULT_STATE_PORT):
+        self.registry = DroneRegistry()
+
+        self.control_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.state_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.control_socket.bind((bind_host, control_port))
+            self.state_socket.bind((bind_host, state_port))
+        except OSError:
+            self.control_socket.close()
+            self.state_socket.close()
+            raise
+
+        self.response_receiver = Demultiplexer(self.control_socket, self.registry, 'responses',
+                                               'tello-response-receiver-{}'.format(self.control_port))
+        self.state_receiver = Demultiplexer(self.state_socket, self.registry, 'states',
+                                            'tello-state-receiver-{}'.format(self.state_port))
+        self.response_receiver.start()
+        self.state_receiver.start()
+        _networks.add(self)
+
+    @classmethod
+    def default(cls) -> 'TelloNetwork':
+        """기본 포트(8889/8890)에 바인딩된 공유 인스턴스를 반환합니다. 처음 호출할 때 생성됩니다.
+        Return the shared instance bound to the default ports, creating it on first use.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @property
+    def control_port(self) -> int:
+        return self.control_socket.getsockname()[1]
+
+    @property
+    def state_port(self) -> int:
+        return self.state_socket.getsockname()[1]
+
+    def register(self, host: str) -> DroneSlot:
+        """드론을 등록하고 응답/상태 링을 담은 슬롯을 반환합니다.
+        Register a drone and return the slot holding its response and state rings.
+        """
+        return self.registry.register(host)
+
+    def unregister(self, host: str, slot: Optional[DroneSlot] = None):
+        self.registry.unregister(host, slot)
+
+    def sendto(self, data: bytes, address: tuple):
+        self.control_socket.sendto(data, address)
+
+    def close(self):
+        """수신 스레드를 멈추고 소켓을 닫습니다.
+        Stop the receiver threads and close both sockets.
+        """
+        self.response_receiver.stop()
+        self.state_receiver.stop()
+        self.control_socket.close()
+        self.state_socket.close()
+
+        _networks.discard(self)
+        with TelloNetwork._default_lock:
+            if TelloNetwork._default is self:
+                TelloNetwork._default = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _collect_network_metrics() -> list:
+    """링 버퍼에 이미 있는 카운터를 수집 시점에 메트릭으로 변환합니다.
+    Turn the counters already kept by the rings into metrics at scrape time.
+    """
+    now = time.monotonic()
+    received = {'state': [], 'response': []}
+    dropped = []
+    state_age = []
+    unknown = []
+
+    for network in list(_networks):
+        for host, slot in network.registry.index.items():
+            labels = {'host': host}
+            received['state'].append(('djitellopy_state_packets_total', labels, slot.states.received))
+            received['response'].append(('djitellopy_response_packets_total', labels, slot.responses.received))
+            dropped.append(('djitellopy_response_packets_dropped_total', labels, slot.responses.dropped))
+
+            latest = slot.states.latest()
+            if latest is not None:
+                state_age.append(('djitellopy_state_age_seconds', labels, now - latest[0]))
+
+        for receiver in (network.response_receiver, network.state_receiver):
+            unknown.append(('djitellopy_unknown_packets_total', {'receiver': receiver.thread.name},
+                            receiver.unknown_packets))
+
+    return [
+        ('djitellopy_state_packets_total', 'counter', 'State packets received per drone', received['state']),
+        ('djitellopy_response_packets_total', 'counter', 'Response packets received per drone', received['response']),
+        ('djitellopy_response_packets_dropped_total', 'counter',
+         'Response packets overwritten before being read', dropped),
+        ('djitellopy_state_age_seconds', 'gauge', 'Age of the newest state packet per drone', state_age),
+        ('djitellopy_unknown_packets_total', 'counter', 'Packets from hosts that are not registered', unknown),
+    ]
+
+
+REGISTRY.add_collector(_collect_network_metrics)
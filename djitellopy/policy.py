@@ -0,0 +1,201 @@
+"""명령 종류별로 관측된 응답 시간에서 타임아웃을 학습하는 재시도/타임아웃 정책.
+Retry and timeout policy that learns per command class from observed response times.
+
+고정된 7초 대신 명령 종류(query, control, slow_control, motion, takeoff, land)마다 RTT를 추정하고
+(Jacobson/Karels 방식), 이동 명령에는 거리/속도로 계산한 예상 비행 시간을 더합니다.
+Instead of a fixed 7 s timeout, the round trip time is estimated per command class
+(Jacobson/Karels), and motion commands additionally get their expected duration
+computed from distance and speed.
+"""
+
+import math
+import re
+from threading import Lock
+from typing import Optional
+
+QUERY = 'query'
+CONTROL = 'control'
+SLOW_CONTROL = 'slow_control'
+MOTION = 'motion'
+TAKEOFF = 'takeoff'
+LAND = 'land'
+
+MOTION_WORDS = ('up', 'down', 'left', 'right', 'forward', 'back', 'cw', 'ccw', 'flip', 'go', 'curve', 'jump')
+# 응답이 'command'나 keepalive보다 훨씬 늦는 제어 명령. CONTROL의 짧은 타임아웃을 학습하지 않도록 따로 둡니다
+# Control commands that ack much later than 'command' or keepalive, kept out of
+# the CONTROL estimator so its short learned timeout does not apply to them
+SLOW_CONTROL_WORDS = ('streamon', 'streamoff', 'wifi', 'ap', 'multiwifi', 'reboot', 'port',
+                      'setfps', 'setbitrate', 'setresolution', 'downvision')
+
+# 같은 명령을 두 번 실행하면 결과가 달라지는 명령 종류
+# Command classes whose effect changes when executed twice
+NON_IDEMPOTENT_CLASSES = (MOTION, TAKEOFF)
+
+
+def classify_command(command: str) -> str:
+    """SDK 명령의 종류를 반환합니다 / return the class of an SDK command"""
+    word = command.split(' ', 1)[0]
+    if word.endswith('?'):
+        return QUERY
+    if word in ('takeoff', 'throwfly'):
+        return TAKEOFF
+    if word == 'land':
+        return LAND
+    if word in MOTION_WORDS:
+        return MOTION
+    if word in SLOW_CONTROL_WORDS:
+        return SLOW_CONTROL
+    return CONTROL
+
+
+def is_idempotent(command: str) -> bool:
+    """재전송해도 안전한 명령인지 여부 / whether the command is safe to send again"""
+    return classify_command(command) not in NON_IDEMPOTENT_CLASSES
+
+
+# 조회 명령의 응답 모양: 숫자(단위 포함) 또는 'pitch:0;roll:0;yaw:0;' 같은 키/값 목록
+# Shapes of query replies: a number with an optional unit, or a key:value list
+_QUERY_VALUE = re.compile(r'^-?\d+(\.\d+)?\s*[a-z]{0,2}$|^([a-z]+:-?[\d.]+;)+$')
+
+
+def response_matches(command: str, response: str) -> bool:
+    """응답이 명령의 종류에 맞는 모양인지 여부. 조회 명령에 대한 'ok'나 제어 명령에 대한
+    숫자 값은 다른 명령의 늦은 응답으로 봅니다.
+    Whether a response has the shape expected for the command. An 'ok' for a
+    query or a value for a control command is a stray reply to another command.
+    """
+    text = response.strip().lower()
+    if 'error' in text:
+        return True
+    if classify_command(command) == QUERY:
+        return text != 'ok'
+    return _QUERY_VALUE.match(text) is None
+
+
+class RttEstimator:
+    """평활 RTT와 RTT 편차를 추적합니다 (RFC 6298).
+    Tracks smoothed RTT and RTT variance as described in RFC 6298.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+
+    def __init__(self, initial_timeout: float):
+        self.initial_timeout = initial_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+        self._lock = Lock()
+
+    def observe(self, sample: float):
+        with self._lock:
+            if self.srtt is None:
+                self.srtt = sample
+                self.rttvar = sample / 2
+            else:
+                self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - sample)
+                self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * sample
+            self.samples += 1
+
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self.initial_timeout
+        return self.srtt + 4 * self.rttvar
+
+
+class CommandTimeoutPolicy:
+    """명령 종류별 적응형 타임아웃과 지수 백오프.
+    Adaptive per-class timeouts and exponential backoff.
+
+    ```python
+    tello.timeout_policy.MIN_TIMEOUT = 0.5
+    print(tello.timeout_policy.timeout_for('speed?'))
+    ```
+    """
+
+    MIN_TIMEOUT = 0.3
+    MAX_TIMEOUT = 60.0
+    # 첫 관측 전에 사용하는 타임아웃 (초). 이륙은 Tello.TAKEOFF_TIMEOUT과 같습니다
+    # Timeouts used before the first sample; takeoff matches Tello.TAKEOFF_TIMEOUT
+    INITIAL_TIMEOUTS = {QUERY: 1.5, CONTROL: 3.0, SLOW_CONTROL: 7.0, MOTION: 3.0, TAKEOFF: 20.0, LAND: 10.0}
+    # 학습한 값이 아무리 짧아도 이 아래로는 내려가지 않는 종류별 하한 (초).
+    # CONTROL은 keepalive와 'command'의 빠른 응답으로 학습되므로 mon/moff, motoron, EXT 같은 느린 제어 명령이
+    # 불필요하게 재시도되지 않도록, 이륙/착륙은 평소보다 느린 이륙(배터리 부족, 바람)을 놓치지 않도록 하한을 둡니다
+    # Per-class floors that a learned timeout never drops below. CONTROL is learned
+    # from fast keepalive and 'command' acks, so slower control commands (mon/moff,
+    # motoron, EXT) would otherwise be retried spuriously; takeoff and land keep room
+    # for a slower than usual takeoff (low battery, wind).
+    MIN_TIMEOUTS = {CONTROL: 2.0, SLOW_CONTROL: 3.0, TAKEOFF: 12.0, LAND: 8.0}
+
+    BACKOFF_BASE = 0.1
+    BACKOFF_MAX = 2.0
+
+    # 이동 명령의 예상 시간 계산용 / for estimating the duration of motions
+    DEFAULT_SPEED = 20         # cm/s, set_speed()를 부르기 전의 보수적인 가정
+    ROTATION_SPEED = 60        # deg/s
+    FLIP_DURATION = 2.0        # s
+    DURATION_MARGIN = 1.5      # 예상 시간에 곱하는 여유 / safety factor on the expected duration
+
+    def __init__(self):
+        self.estimators = {cls: RttEstimator(timeout) for cls, timeout in self.INITIAL_TIMEOUTS.items()}
+
+    def expected_duration(self, command: str, speed: Optional[float] = None) -> float:
+        """이동 명령이 비행하는 데 걸릴 것으로 예상되는 시간 (초). 이동 명령이 아니면 0.
+        Expected flight time of a motion command in seconds, 0 for other commands.
+        """
+        parts = command.split()
+        word = parts[0] if parts else ''
+        speed = speed or self.DEFAULT_SPEED
+
+        try:
+            if word in ('up', 'down', 'left', 'right', 'forward', 'back'):
+                return int(parts[1]) / speed
+            if word in ('cw', 'ccw'):
+                return int(parts[1]) / self.ROTATION_SPEED
+            if word == 'flip':
+                return self.FLIP_DURATION
+            if word in ('go', 'jump'):
+                x, y, z, go_speed = (int(value) for value in parts[1:5])
+                return math.sqrt(x * x + y * y + z * z) / max(go_speed, 1) + (2.0 if word == 'jump' else 0.0)
+            if word == 'curve':
+                x1, y1, z1, x2, y2, z2, curve_speed = (int(value) for value in parts[1:8])
+                # 호의 길이 대신 두 직선 구간의 합으로 근사합니다 / approximate the arc by two chords
+                length = math.sqrt(x1 * x1 + y1 * y1 + z1 * z1) + \
+                    math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2 + (z2 - z1) ** 2)
+                return length / max(curve_speed, 1)
+        except (IndexError, ValueError):
+            pass
+
+        return 0.0
+
+    def timeout_for(self, command: str, speed: Optional[float] = None) -> float:
+        """명령에 사용할 타임아웃 (초) / timeout in seconds to use for a command"""
+        cls = classify_command(command)
+        timeout = self.estimators[cls].timeout()
+        if cls == MOTION:
+            timeout += self.expected_duration(command, speed) * self.DURATION_MARGIN
+        return min(max(timeout, self.MIN_TIMEOUTS.get(cls, self.MIN_TIMEOUT)), self.MAX_TIMEOUT)
+
+    def observe(self, command: str, elapsed: float, speed: Optional[float] = None):
+        """성공한 명령의 응답 시간을 학습합니다. 이동 명령은 예상 비행 시간을 뺀 나머지를 학습합니다.
+        Learn from the response time of a successful command. For motions only the
+        part beyond the expected flight time is learned.
+        """
+        cls = classify_command(command)
+        if cls == MOTION:
+            elapsed = max(elapsed - self.expected_duration(command, speed), 0.0)
+        self.estimators[cls].observe(elapsed)
+
+    def backoff(self, attempt: int) -> float:
+        """`attempt`번째 재시도 전에 기다릴 시간 (초) / delay before retry number `attempt`"""
+        return min(self.BACKOFF_BASE * (2 ** (attempt - 1)), self.BACKOFF_MAX)
+
+    def late_response_grace(self, command: str, speed: Optional[float] = None) -> float:
+        """재전송하면 안 되는 명령의 늦은 응답을 기다려 줄 시간 (초). 이동 명령의 예상 비행 시간을
+        포함한 전체 타임아웃이므로, 비행이 끝나고 도착한 'ok'를 놓치고 다시 보내지 않습니다.
+        How long to keep listening for a late response before re-sending a
+        non-idempotent command. This is the full timeout including the expected
+        flight time, so an 'ok' sent after a long move is not missed and the
+        move is not executed twice.
+        """
+        return self.timeout_for(command, speed)
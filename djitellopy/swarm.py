@@ -2,12 +2,71 @@
 Library for controlling multiple DJI Ryze Tello drones.
 """
 
+import time
+from contextlib import ExitStack
+from concurrent.futures import Future, wait
 from threading import Thread, Barrier
 from queue import Queue
-from typing import List, Callable
+from typing import List, Callable, Optional
 
 from .tello import Tello, TelloException
+from .network import TelloNetwork
 from .enforce_types import enforce_types
+from .tracing import span
+from . import metrics
+
+
+class SwarmResult:
+    """스웜 전체에 대한 호출 결과. 드론마다 반환값 또는 예외를 하나씩 가집니다.
+    Outcome of a swarm-wide call: one return value or exception per drone.
+
+    ```python
+    result = swarm.parallel(lambda i, tello: tello.query_battery(), timeout=5)
+    if not result.ok:
+        print("failed drones:", result.failed)
+    ```
+    """
+
+    def __init__(self, results: list, exceptions: list, durations: list):
+        self.results = results
+        self.exceptions = exceptions
+        self.durations = durations
+
+    @property
+    def ok(self) -> bool:
+        """모든 드론이 성공했는지 여부 / whether every drone succeeded"""
+        return all(e is None for e in self.exceptions)
+
+    @property
+    def failed(self) -> List[int]:
+        """실패했거나 시간 내에 끝나지 않은 드론의 인덱스 / indices of drones that failed or timed out"""
+        return [i for i, e in enumerate(self.exceptions) if e is not None]
+
+    @property
+    def succeeded(self) -> List[int]:
+        """성공한 드론의 인덱스 / indices of drones that succeeded"""
+        return [i for i, e in enumerate(self.exceptions) if e is None]
+
+    def raise_for_errors(self):
+        """실패한 드론이 있으면 TelloException을 발생시킵니다.
+        Raise a TelloException summarizing all failures, if any.
+        """
+        if self.ok:
+            return
+        details = "; ".join("#{}: {}".format(i, self.exceptions[i]) for i in self.failed)
+        raise TelloException("{} of {} drones failed: {}".format(len(self.failed), len(self), details))
+
+    def __getitem__(self, i):
+        return self.results[i]
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return "SwarmResult(ok={}, failed={})".format(self.ok, self.failed)
 
 
 @enforce_types
@@ -18,37 +77,44 @@ class TelloSwarm:
 
     tellos: List[Tello]
     barrier: Barrier
-    funcBarier: Barrier
     funcQueues: List[Queue]
     threads: List[Thread]
 
+    # broadcast()가 응답 링을 확인하는 주기 (초) / how often broadcast() polls the response rings
+    BROADCAST_POLL_INTERVAL = 0.002
+
+    # 성공 시 드론의 비행 상태를 바꾸는 명령 / commands that change is_flying on success
+    FLIGHT_STATE_COMMANDS = {'takeoff': True, 'throwfly': True, 'land': False}
+
     @staticmethod
-    def fromFile(path: str):
+    def fromFile(path: str, network: TelloNetwork = None):
         """파일에서 TelloSwarm을 생성합니다. 파일은 한 줄당 하나의 IP 주소를 포함해야 합니다.
         Create TelloSwarm from file. The file should contain one IP address per line.
 
         Arguments:
             path: 파일 경로 / path to the file
+            network: 사용할 [TelloNetwork][tellonetwork] / network to use (default ports if omitted)
         """
         with open(path, 'r') as fd:
             ips = fd.readlines()
 
-        return TelloSwarm.fromIps(ips)
+        return TelloSwarm.fromIps(ips, network)
 
     @staticmethod
-    def fromIps(ips: list):
+    def fromIps(ips: list, network: TelloNetwork = None):
         """IP 주소 목록에서 TelloSwarm을 생성합니다.
         Create TelloSwarm from a list of IP addresses.
 
         Arguments:
             ips: IP 주소 목록 / list of IP Addresses
+            network: 사용할 [TelloNetwork][tellonetwork] / network to use (default ports if omitted)
         """
         if not ips:
             raise TelloException("No ips provided")
 
         tellos = []
         for ip in ips:
-            tellos.append(Tello(ip.strip()))
+            tellos.append(Tello(ip.strip(), network=network))
 
         return TelloSwarm(tellos)
 
@@ -61,18 +127,27 @@ class TelloSwarm:
         """
         self.tellos = tellos
         self.barrier = Barrier(len(tellos))
-        self.funcBarrier = Barrier(len(tellos) + 1)
         self.funcQueues = [Queue() for tello in tellos]
+        self.stragglers = []
 
         def worker(i):
             queue = self.funcQueues[i]
             tello = self.tellos[i]
 
             while True:
-                func = queue.get()
-                self.funcBarrier.wait()
-                func(i, tello)
-                self.funcBarrier.wait()
+                func, future = queue.get()
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    with span('swarm_task', category='swarm', drone=i):
+                        result = func(i, tello)
+                    future.set_result(result)
+                except BaseException as e:
+                    # 다른 드론이 sync()에서 영원히 기다리지 않도록 배리어를 깨뜨립니다
+                    # Break the barrier so the other drones don't wait forever in sync()
+                    self.barrier.abort()
+                    future.set_exception(e)
 
         self.threads = []
         for i, _ in enumerate(tellos):
@@ -95,7 +170,25 @@ class TelloSwarm:
         for i, tello in enumerate(self.tellos):
             func(i, tello)
 
-    def parallel(self, func: Callable[[int, Tello], None]):
+    def submit(self, func: Callable[[int, Tello], None]) -> List[Future]:
+        """각 Tello의 워커 스레드에 `func`를 넣고 드론별 Future 목록을 즉시 반환합니다.
+        Queue `func` on every tello's worker thread and return one Future per drone
+        without waiting.
+
+        ```python
+        futures = swarm.submit(lambda i, tello: tello.query_battery())
+        print(futures[0].result(timeout=5))
+        ```
+        """
+        futures = []
+        for queue in self.funcQueues:
+            future = Future()
+            queue.put((func, future))
+            futures.append(future)
+
+        return futures
+
+    def parallel(self, func: Callable[[int, Tello], None], timeout: float = None) -> SwarmResult:
         """각 Tello에 대해 병렬로 `func`를 호출합니다. 함수는 두 개의 인자를 받습니다:
         현재 드론의 인덱스 `i`와 현재 [Tello][tello] 인스턴스 `tello`.
         Call `func` for each tello in parallel. The function retrieves
@@ -105,16 +198,173 @@ class TelloSwarm:
         스레드 간 동기화를 위해 `swarm.sync()`를 사용할 수 있습니다.
         You can use `swarm.sync()` for syncing between threads.
 
+        한 드론이 예외를 발생시키거나 `timeout`초 안에 끝나지 않아도 다른 드론은 계속 진행되며,
+        결과는 [SwarmResult][djitellopy.swarm.SwarmResult]에 모입니다.
+        A drone raising or missing the `timeout` (seconds) deadline does not block the
+        others; all outcomes are collected into a [SwarmResult][djitellopy.swarm.SwarmResult].
+
         ```python
-        swarm.parallel(lambda i, tello: tello.move_up(50 + i * 10))
+        result = swarm.parallel(lambda i, tello: tello.move_up(50 + i * 10), timeout=10)
+        result.raise_for_errors()
         ```
         """
+        # 이전 호출에서 시간 초과된 작업이 아직 실행 중이면 배리어를 깨진 상태로 두어
+        # 그 작업이 sync()에서 멈추지 않게 합니다
+        # Keep the barrier broken while timed out jobs of a previous call are still
+        # running, so they can't get stuck in sync()
+        self.stragglers = [future for future in self.stragglers if not future.done()]
+        if self.barrier.broken and not self.stragglers:
+            self.barrier.reset()
+
+        durations = [None] * len(self.tellos)
+
+        def timed(i, tello):
+            start = time.monotonic()
+            try:
+                return func(i, tello)
+            finally:
+                durations[i] = time.monotonic() - start
+
+        with span('swarm_parallel', category='swarm', drones=len(self.tellos)):
+            futures = self.submit(timed)
+            _, not_done = wait(futures, timeout)
+
+        if not_done:
+            # 늦은 드론이 sync()에서 기다리고 있다면 풀어줍니다
+            # Release late drones that might be waiting in sync()
+            self.barrier.abort()
+            self.stragglers.extend(not_done)
+
+        results = []
+        exceptions = []
+        for i, future in enumerate(futures):
+            if future in not_done:
+                future.cancel()
+                results.append(None)
+                exceptions.append(TelloException("Drone #{} did not finish within {} seconds".format(i, timeout)))
+            elif future.exception() is not None:
+                results.append(None)
+                exceptions.append(future.exception())
+            else:
+                results.append(future.result())
+                exceptions.append(None)
+
+        # 시간 초과된 작업이 나중에 끝나며 durations를 바꾸지 않도록 복사합니다
+        # Copy durations so that timed out jobs finishing later cannot change the result
+        result = SwarmResult(results, exceptions, list(durations))
+        if not result.ok:
+            Tello.LOGGER.warning("Swarm call failed on drones %s", result.failed)
+
+        return result
+
+    def broadcast(self, command: str, timeout: float = None) -> SwarmResult:
+        """같은 명령을 모든 드론에 한 번의 송신 루프로 보내고 응답을 모읍니다.
+        Send the same command to every drone in one tight `sendto` loop, then collect
+        all responses from the shared receivers.
+
+        `swarm.takeoff()`처럼 스레드를 거치지 않으므로 드론 간 출발 시차가 송신 루프 시간으로 줄어듭니다.
+        `durations`에는 드론별 응답 지연 시간(초)이 담깁니다.
+        Unlike `swarm.takeoff()` no worker threads are involved, so the launch skew
+        between drones is only the duration of the send loop. The result's
+        `durations` hold the per-drone ack latency in seconds.
 
-        for queue in self.funcQueues:
-            queue.put(func)
+        ```python
+        result = swarm.broadcast("takeoff")
+        print(result.durations)
+        ```
+
+        Arguments:
+            command: SDK 명령 / SDK command, e.g. "takeoff" or "up 50"
+            timeout: 응답 대기 시간 (초). 생략하면 각 드론의 `timeout_policy`가 명령 종류와 이동 거리에 따라 정합니다.
+                seconds to wait for the responses; chosen per drone by its `timeout_policy` when omitted
+        """
+
+        # 브로드캐스트 동안 모든 드론의 명령 잠금을 잡아, 다른 스레드(keepalive 등)가 응답을
+        # 가져가거나 보내지 않게 합니다. 교착을 피하려고 항상 같은 순서로 잡습니다
+        # Hold every drone's command lock for the whole broadcast so other threads
+        # (keepalives, stray-response cleanup) cannot send or consume acks meanwhile.
+        # Locks are always taken in the same order to avoid deadlocks.
+        with ExitStack() as locks:
+            for tello in sorted(set(self.tellos), key=id):
+                locks.enter_context(tello.command_lock)
+            return self._broadcast_locked(command, timeout)
+
+    def _broadcast_locked(self, command: str, timeout: Optional[float]) -> SwarmResult:
+        # 명령 사이 최소 간격을 지키되, 가장 늦은 드론에 한 번만 맞춥니다
+        # Honour the minimum gap between commands once, for the slowest drone
+        last_command = max(tello.last_received_command_timestamp for tello in self.tellos)
+        wait_time = Tello.TIME_BTW_COMMANDS - (time.time() - last_command)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+        # 드론마다 명령 종류, 이동 거리, 학습된 지연 시간에 맞는 타임아웃을 씁니다
+        # Each drone waits as long as its timeout policy allows for this command
+        if timeout is None:
+            timeouts = [tello.timeout_policy.timeout_for(command, tello.speed) for tello in self.tellos]
+        else:
+            timeouts = [timeout] * len(self.tellos)
+
+        with span('swarm_broadcast', category='swarm', command=command, drones=len(self.tellos)):
+            sent_at = [tello._send_expecting_response(command) for tello in self.tellos]
+            Tello.EVENTS.emit('command', "Broadcast command to %d drones: '%s'", len(self.tellos), command)
+
+            responses = [None] * len(self.tellos)
+            durations = [None] * len(self.tellos)
+            pending = set(range(len(self.tellos)))
+            while pending:
+                now = time.monotonic()
+                for i in list(pending):
+                    tello = self.tellos[i]
+                    # 이전 명령의 늦은 응답과 명령에 맞지 않는 응답은 버립니다
+                    # Late and mismatched responses are discarded
+                    packet = tello._poll_response(command, sent_at[i])
+                    if packet is not None:
+                        received_at, responses[i] = packet
+                        durations[i] = received_at - sent_at[i]
+                        tello._record_response(command, responses[i], durations[i])
+                        pending.discard(i)
+                    elif now - sent_at[i] > timeouts[i]:
+                        tello._record_timeout(command, timeouts[i])
+                        pending.discard(i)
+
+                if pending:
+                    time.sleep(self.BROADCAST_POLL_INTERVAL)
+
+        exceptions = []
+        for i, tello in enumerate(self.tellos):
+            if responses[i] is None:
+                exceptions.append(TelloException("Drone #{} did not respond to '{}' within {} seconds"
+                                                 .format(i, command, round(timeouts[i], 3))))
+                continue
 
-        self.funcBarrier.wait()
-        self.funcBarrier.wait()
+            if 'error' in responses[i].lower():
+                metrics.COMMAND_RESULTS.labels(tello.address[0], 'error').inc()
+                exceptions.append(TelloException("Command '{}' failed on drone #{}: '{}'"
+                                                 .format(command, i, responses[i])))
+                continue
+
+            metrics.COMMAND_RESULTS.labels(tello.address[0], 'ok').inc()
+            exceptions.append(None)
+            if command in self.FLIGHT_STATE_COMMANDS:
+                tello.is_flying = self.FLIGHT_STATE_COMMANDS[command]
+
+        result = SwarmResult(responses, exceptions, durations)
+        if not result.ok:
+            Tello.LOGGER.warning("Broadcast '%s' failed on drones %s", command, result.failed)
+
+        return result
+
+    def query_many(self, names: list, max_age: float = None, timeout: float = None) -> SwarmResult:
+        """모든 드론에서 [Tello.query_many][djitellopy.tello.Tello.query_many]를 동시에 실행합니다.
+        Run `query_many` on every drone concurrently.
+
+        ```python
+        result = swarm.query_many(['battery', 'sdk_version', 'serial_number'], timeout=5)
+        for i, values in enumerate(result):
+            print(i, values.battery if values else result.exceptions[i])
+        ```
+        """
+        return self.parallel(lambda i, tello: tello.query_many(names, max_age), timeout)
 
     def sync(self, timeout: float = None):
         """병렬 Tello 스레드를 동기화합니다. 모든 스레드가 `swarm.sync`를 호출할 때까지
@@ -136,7 +386,8 @@ class TelloSwarm:
         swarm.parallel(doStuff)
         ```
         """
-        return self.barrier.wait(timeout)
+        with span('swarm_sync', category='swarm'):
+            return self.barrier.wait(timeout)
 
     def __getattr__(self, attr):
         """모든 Tello에서 표준 Tello 함수를 병렬로 호출합니다.
@@ -147,9 +398,16 @@ class TelloSwarm:
         swarm.takeoff()
         swarm.move_up(50)
         ```
+
+        한 대라도 실패하면 [SwarmResult.raise_for_errors][djitellopy.swarm.SwarmResult.raise_for_errors]처럼
+        TelloException을 발생시킵니다. 실패를 직접 처리하려면 `swarm.parallel`을 사용하세요.
+        Raises a TelloException if any drone failed; use `swarm.parallel` to handle
+        partial failures yourself.
         """
         def callAll(*args, **kwargs):
-            self.parallel(lambda i, tello: getattr(tello, attr)(*args, **kwargs))
+            result = self.parallel(lambda i, tello: getattr(tello, attr)(*args, **kwargs))
+            result.raise_for_errors()
+            return result
 
         return callAll
 
@@ -5,22 +5,19 @@ DJI Tello 드론을 제어하기 위한 라이브러리.
 
 # coding=utf-8
 import logging
-import socket
 import time
 from datetime import datetime
-from collections import deque
-from threading import Thread, Lock
+from collections import deque, namedtuple
+from threading import Thread, Lock, RLock
 from typing import Optional, Union, Type, Dict
 
 from .enforce_types import enforce_types
-
-import av
-import numpy as np
-
-
-threads_initialized = False
-drones: Optional[dict] = {}
-client_socket: socket.socket
+from .demux import DroneSlot
+from .events import EVENTS, EventLog
+from . import metrics
+from .tracing import span
+from .network import TelloNetwork
+from .policy import CommandTimeoutPolicy, classify_command, is_idempotent, response_matches
 
 
 class TelloException(Exception):
@@ -28,6 +25,24 @@ class TelloException(Exception):
     pass
 
 
+class StaleStateError(TelloException):
+    """상태 패킷이 요청한 나이보다 오래되었거나 끊겼을 때 발생합니다.
+    Raised when the state stream is older than requested or has stopped.
+    """
+    pass
+
+
+QUERY_NAMES = ('battery', 'height', 'temperature', 'flight_time', 'attitude', 'barometer', 'distance_tof',
+               'speed', 'wifi_signal_noise_ratio', 'sdk_version', 'serial_number', 'active')
+
+QueryResult = namedtuple('QueryResult', QUERY_NAMES)
+QueryResult.__doc__ = """[Tello.query_many][djitellopy.tello.Tello.query_many]의 결과. 요청하지 않은 필드는 None입니다.
+Result of `query_many`; fields that were not requested are None.
+`distance_tof`는 int (cm), `temperature`와 `barometer`는 float로, 값을 어디서 읽었든 타입이 같습니다.
+distance_tof is an int and temperature and barometer are floats regardless of the source.
+"""
+
+
 @enforce_types
 class Tello:
     """
@@ -41,12 +56,13 @@ class Tello:
     - 미션 패드 감지 (Tello EDU 전용)
     """
     # 통신 관련 상수
-    RESPONSE_TIMEOUT = 7  # 응답 대기 시간 (초)
+    RESPONSE_TIMEOUT = 7  # 응답 대기 시간 (초), timeout_policy 대신 명시적으로 사용할 때
     TAKEOFF_TIMEOUT = 20  # 이륙 대기 시간 (초)
     FRAME_GRAB_TIMEOUT = 5  # 프레임 획득 타임아웃
     TIME_BTW_COMMANDS = 0.1  # 명령어 사이의 대기 시간 (초)
     TIME_BTW_RC_CONTROL_COMMANDS = 0.001  # RC 제어 명령어 사이의 대기 시간 (초)
     RETRY_COUNT = 3  # 실패한 명령어 재시도 횟수
+    RESPONSE_POLL_INTERVAL = 0.01  # 응답 링을 확인하는 주기 (초)
     TELLO_IP = '192.168.10.1'  # Tello 드론의 IP 주소
 
     # 비디오 스트리밍 관련 상수
@@ -84,6 +100,10 @@ class Tello:
     # Use Tello.LOGGER.setLevel(logging.<LEVEL>) in YOUR CODE
     # to only receive logs of the desired level and higher
 
+    # Structured events of the command and packet paths (levels, sampling, in-memory ring)
+    # e.g. Tello.EVENTS.set_sampling('rc', 20) or Tello.EVENTS.enable_ring()
+    EVENTS: EventLog = EVENTS
+
     # Conversion functions for state protocol fields
     INT_STATE_FIELDS = (
         # Tello EDU with mission pads enabled only
@@ -104,40 +124,69 @@ class Tello:
     # VideoCapture object
     background_frame_read: Optional['BackgroundFrameRead'] = None
 
+    # 최신 상태 패킷으로 대신할 수 있는 조회와 해당 get_* 메서드
+    # Queries that can be answered from a fresh state packet, with their get_* equivalent
+    STATE_QUERIES = {
+        'battery': 'get_battery',
+        'height': 'get_height',
+        'temperature': 'get_temperature',
+        'flight_time': 'get_flight_time',
+        'barometer': 'get_barometer',
+        'distance_tof': 'get_distance_tof',
+    }
+    # 상태 패킷과 조회 명령 중 어디서 읽든 query_many가 돌려주는 타입 / type returned by query_many whatever the source
+    QUERY_TYPES = {
+        'battery': int,
+        'height': int,
+        'temperature': float,
+        'flight_time': int,
+        'barometer': float,
+        'distance_tof': int,
+    }
+    QUERY_STATE_MAX_AGE = 0.5  # query_many가 상태 패킷을 사용할 수 있는 최대 나이 (초)
+
+    # Response and state rings filled by the receiver threads
+    udp_slot: Optional[DroneSlot] = None
+
     stream_on = False
     is_flying = False
 
+    # 마지막으로 설정/조회한 이동 속도 (cm/s). 이동 명령의 예상 시간 계산에 사용됩니다
+    # Last known speed setting, used to estimate how long motions take
+    speed: Optional[int] = None
+
     def __init__(self,
                  host=TELLO_IP,
                  retry_count=RETRY_COUNT,
-                 vs_udp=VS_UDP_PORT):
-
-        global threads_initialized, client_socket, drones
-
+                 vs_udp=VS_UDP_PORT,
+                 network: TelloNetwork = None):
+        """
+        매개변수:
+            host: 드론의 IP 주소
+            retry_count: 실패한 명령어 재시도 횟수
+            vs_udp: 비디오 스트림을 받을 로컬 UDP 포트
+            network: 사용할 [TelloNetwork][tellonetwork]. 생략하면 기본 포트(8889/8890)의 공유 인스턴스를 사용합니다.
+        """
         self.address = (host, Tello.CONTROL_UDP_PORT)
         self.stream_on = False
         self.retry_count = retry_count
         self.last_received_command_timestamp = time.time()
         self.last_rc_control_timestamp = time.time()
+        self.last_command_sent_at = time.monotonic()
 
-        if not threads_initialized:
-            # Run Tello command responses UDP receiver on background
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            client_socket.bind(("", Tello.CONTROL_UDP_PORT))
-            response_receiver_thread = Thread(target=Tello.udp_response_receiver)
-            response_receiver_thread.daemon = True
-            response_receiver_thread.start()
-
-            # Run state UDP receiver on background
-            state_receiver_thread = Thread(target=Tello.udp_state_receiver)
-            state_receiver_thread.daemon = True
-            state_receiver_thread.start()
+        # 명령 종류별 응답 시간을 학습하여 타임아웃과 재시도 간격을 정합니다
+        # Learns response times per command class to pick timeouts and retry delays
+        self.timeout_policy = CommandTimeoutPolicy()
 
-            threads_initialized = True
+        # 응답을 기다리는 명령은 한 번에 하나만 진행되도록 합니다. 다른 스레드가 응답을 가로채지 않습니다
+        # Only one command awaits a response at a time, so no thread steals another's reply
+        self.command_lock = RLock()
 
-        drones[host] = {'responses': [], 'state': {}}
+        # Sockets and receiver threads are owned by the network, which may be shared
+        self.network = network if network is not None else TelloNetwork.default()
+        self.udp_slot = self.network.register(host)
 
-        self.LOGGER.info("Tello instance was initialized. Host: '{}'. Port: '{}'.".format(host, Tello.CONTROL_UDP_PORT))
+        self.LOGGER.info("Tello instance was initialized. Host: '%s'. Port: '%s'.", host, self.network.control_port)
 
         self.vs_udp_port = vs_udp
 
@@ -146,114 +195,67 @@ class Tello:
         """Change the UDP Port for sending video feed from the drone.
         """
         self.vs_udp_port = udp_port
-        self.send_control_command(f'port 8890 {self.vs_udp_port}')
+        self.send_control_command(f'port {self.network.state_port} {self.vs_udp_port}')
 
-    def get_own_udp_object(self):
-        """Get own object from the global drones dict. This object is filled
-        with responses and state information by the receiver threads.
+    def get_own_udp_object(self) -> DroneSlot:
+        """Get own slot from the network's drone registry. The slot's rings are filled
+        with responses and state packets by the receiver threads.
         Internal method, you normally wouldn't call this yourself.
         """
-        global drones
-
-        host = self.address[0]
-        return drones[host]
-
-    @staticmethod
-    def udp_response_receiver():
-        """Setup drone UDP receiver. This method listens for responses of Tello.
-        Must be run from a background thread in order to not block the main thread.
-        Internal method, you normally wouldn't call this yourself.
-        """
-        while True:
-            try:
-                data, address = client_socket.recvfrom(1024)
-
-                address = address[0]
-                Tello.LOGGER.debug('Data received from {} at client_socket'.format(address))
-
-                if address not in drones:
-                    continue
-
-                drones[address]['responses'].append(data)
-
-            except Exception as e:
-                Tello.LOGGER.error(e)
-                break
-
-    @staticmethod
-    def udp_state_receiver():
-        """Setup state UDP receiver. This method listens for state information from
-        Tello. Must be run from a background thread in order to not block
-        the main thread.
-        Internal method, you normally wouldn't call this yourself.
-        """
-        state_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        state_socket.bind(("", Tello.STATE_UDP_PORT))
-
-        while True:
-            try:
-                data, address = state_socket.recvfrom(1024)
-
-                address = address[0]
-                Tello.LOGGER.debug('Data received from {} at state_socket'.format(address))
-
-                if address not in drones:
-                    continue
-
-                data = data.decode('ASCII')
-                data = Tello.parse_state(data)
-                data['received_at'] = datetime.now()
-                drones[address]['state'] = data
-
-            except Exception as e:
-                Tello.LOGGER.error(e)
-                break
+        return self.udp_slot
 
     @staticmethod
     def parse_state(state: str) -> Dict[str, Union[int, float, str]]:
         """Parse a state line to a dictionary
         Internal method, you normally wouldn't call this yourself.
         """
-        state = state.strip()
-        Tello.LOGGER.debug('Raw state data: {}'.format(state))
-
-        if state == 'ok':
-            return {}
+        with span('parse_state'):
+            state = state.strip()
+            Tello.EVENTS.emit('state', 'Raw state data: %s', state)
 
-        state_dict = {}
-        for field in state.split(';'):
-            split = field.split(':')
-            if len(split) < 2:
-                continue
+            if state == 'ok':
+                return {}
 
-            key = split[0]
-            value: Union[int, float, str] = split[1]
-
-            if key in Tello.state_field_converters:
-                num_type = Tello.state_field_converters[key]
-                try:
-                    value = num_type(value)
-                except ValueError as e:
-                    Tello.LOGGER.debug('Error parsing state value for {}: {} to {}'
-                                       .format(key, value, num_type))
-                    Tello.LOGGER.error(e)
+            state_dict = {}
+            for field in state.split(';'):
+                split = field.split(':')
+                if len(split) < 2:
                     continue
 
-            state_dict[key] = value
+                key = split[0]
+                value: Union[int, float, str] = split[1]
+
+                if key in Tello.state_field_converters:
+                    num_type = Tello.state_field_converters[key]
+                    try:
+                        value = num_type(value)
+                    except ValueError as e:
+                        Tello.LOGGER.debug('Error parsing state value for %s: %s to %s', key, value, num_type)
+                        Tello.LOGGER.error(e)
+                        continue
 
-        return state_dict
+                state_dict[key] = value
+
+            return state_dict
 
     def get_current_state(self) -> dict:
         """Call this function to attain the state of the Tello. Returns a dict
         with all fields.
         Internal method, you normally wouldn't call this yourself.
         """
-        return self.get_own_udp_object()['state']
+        return self.udp_slot.parsed_state(Tello.parse_state)
 
-    def get_state_field(self, key: str):
+    def get_state_field(self, key: str, max_age: float = None):
         """Get a specific sate field by name.
         Internal method, you normally wouldn't call this yourself.
+        Arguments:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) StaleStateError를 발생시킵니다.
+                Raise StaleStateError if the newest state packet is older (seconds).
         """
+        if not self.is_state_fresh(max_age):
+            raise StaleStateError('State of {} is older than {} seconds (age: {})'
+                                  .format(self.address[0], max_age, self._state_age()))
+
         state = self.get_current_state()
 
         if key in state:
@@ -261,6 +263,25 @@ class Tello:
         else:
             raise TelloException('Could not get state property: {}'.format(key))
 
+    def is_state_fresh(self, max_age: float = None) -> bool:
+        """가장 최근 상태 패킷이 `max_age`초 이내에 도착했는지 여부. `max_age`가 None이면 항상 True.
+        Whether the newest state packet is at most `max_age` seconds old; always True for None.
+
+        모든 `get_*` 메서드는 `max_age`를 받습니다. 조회 명령이 있는 값(배터리, 높이, 자세 등)은
+        상태가 오래되면 조회 명령으로 대신 읽고, 나머지는 StaleStateError를 발생시킵니다.
+        Every `get_*` accessor takes `max_age`. Values with a query command fall back
+        to it when the state is stale; the others raise StaleStateError.
+
+        ```python
+        if tello.get_height(max_age=0.3) > 150:  # 0.3초보다 오래된 상태는 사용하지 않음
+            tello.move_down(50)
+        ```
+        """
+        if max_age is None:
+            return True
+        age = self._state_age()
+        return age is not None and age <= max_age
+
     def get_last_state_update(self) -> datetime:
         """Get the datetime of when the last state packet was received.
         You may use this function to check the age of values returned by all other get_* functions.
@@ -269,174 +290,216 @@ class Tello:
         """
         return self.get_state_field('received_at')
 
-    def get_mission_pad_id(self) -> int:
+    def get_mission_pad_id(self, max_age: float = None) -> int:
         """Mission pad ID of the currently detected mission pad
         Only available on Tello EDUs after calling enable_mission_pads
         Returns:
             int: -1 if none is detected, else 1-8
         """
-        return self.get_state_field('mid')
+        return self.get_state_field('mid', max_age)
 
-    def get_mission_pad_distance_x(self) -> int:
+    def get_mission_pad_distance_x(self, max_age: float = None) -> int:
         """X distance to current mission pad
         Only available on Tello EDUs after calling enable_mission_pads
         Returns:
             int: distance in cm
         """
-        return self.get_state_field('x')
+        return self.get_state_field('x', max_age)
 
-    def get_mission_pad_distance_y(self) -> int:
+    def get_mission_pad_distance_y(self, max_age: float = None) -> int:
         """Y distance to current mission pad
         Only available on Tello EDUs after calling enable_mission_pads
         Returns:
             int: distance in cm
         """
-        return self.get_state_field('y')
+        return self.get_state_field('y', max_age)
 
-    def get_mission_pad_distance_z(self) -> int:
+    def get_mission_pad_distance_z(self, max_age: float = None) -> int:
         """Z distance to current mission pad
         Only available on Tello EDUs after calling enable_mission_pads
         Returns:
             int: distance in cm
         """
-        return self.get_state_field('z')
+        return self.get_state_field('z', max_age)
 
-    def get_pitch(self) -> int:
+    def get_pitch(self, max_age: float = None) -> int:
         """Get pitch in degree
+        Arguments:
+            max_age: read with a query command instead if the state is older (seconds)
         Returns:
             int: pitch in degree
         """
+        if not self.is_state_fresh(max_age):
+            return self.query_attitude()['pitch']
         return self.get_state_field('pitch')
 
-    def get_roll(self) -> int:
+    def get_roll(self, max_age: float = None) -> int:
         """Get roll in degree
+        Arguments:
+            max_age: read with a query command instead if the state is older (seconds)
         Returns:
             int: roll in degree
         """
+        if not self.is_state_fresh(max_age):
+            return self.query_attitude()['roll']
         return self.get_state_field('roll')
 
-    def get_yaw(self) -> int:
+    def get_yaw(self, max_age: float = None) -> int:
         """Get yaw in degree
+        Arguments:
+            max_age: read with a query command instead if the state is older (seconds)
         Returns:
             int: yaw in degree
         """
+        if not self.is_state_fresh(max_age):
+            return self.query_attitude()['yaw']
         return self.get_state_field('yaw')
 
-    def get_speed_x(self) -> int:
+    def get_speed_x(self, max_age: float = None) -> int:
         """X-Axis Speed
         Returns:
             int: speed
         """
-        return self.get_state_field('vgx')
+        return self.get_state_field('vgx', max_age)
 
-    def get_speed_y(self) -> int:
+    def get_speed_y(self, max_age: float = None) -> int:
         """Y-Axis Speed
         Returns:
             int: speed
         """
-        return self.get_state_field('vgy')
+        return self.get_state_field('vgy', max_age)
 
-    def get_speed_z(self) -> int:
+    def get_speed_z(self, max_age: float = None) -> int:
         """Z-Axis Speed
         Returns:
             int: speed
         """
-        return self.get_state_field('vgz')
+        return self.get_state_field('vgz', max_age)
 
-    def get_acceleration_x(self) -> float:
+    def get_acceleration_x(self, max_age: float = None) -> float:
         """X-Axis Acceleration
         Returns:
             float: acceleration
         """
-        return self.get_state_field('agx')
+        return self.get_state_field('agx', max_age)
 
-    def get_acceleration_y(self) -> float:
+    def get_acceleration_y(self, max_age: float = None) -> float:
         """Y-Axis Acceleration
         Returns:
             float: acceleration
         """
-        return self.get_state_field('agy')
+        return self.get_state_field('agy', max_age)
 
-    def get_acceleration_z(self) -> float:
+    def get_acceleration_z(self, max_age: float = None) -> float:
         """Z-Axis Acceleration
         Returns:
             float: acceleration
         """
-        return self.get_state_field('agz')
+        return self.get_state_field('agz', max_age)
 
-    def get_lowest_temperature(self) -> int:
+    def get_lowest_temperature(self, max_age: float = None) -> int:
         """
         드론의 최저 온도를 반환합니다.
         
         반환값:
             int: 최저 온도 (°C)
         """
-        return self.get_state_field('templ')
+        return self.get_state_field('templ', max_age)
 
-    def get_highest_temperature(self) -> int:
+    def get_highest_temperature(self, max_age: float = None) -> int:
         """
         드론의 최고 온도를 반환합니다.
         
         반환값:
             float: 최고 온도 (°C)
         """
-        return self.get_state_field('temph')
+        return self.get_state_field('temph', max_age)
 
-    def get_temperature(self) -> float:
+    def get_temperature(self, max_age: float = None) -> float:
         """
         현재 드론의 평균 온도를 반환합니다.
         
+        매개변수:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) 조회 명령으로 대신 읽습니다
+        
         반환값:
             float: 온도 (°C)
         """
+        if not self.is_state_fresh(max_age):
+            return float(self.query_temperature())
         templ = self.get_lowest_temperature()
         temph = self.get_highest_temperature()
         return (templ + temph) / 2
 
-    def get_height(self) -> int:
+    def get_height(self, max_age: float = None) -> int:
         """
         현재 높이를 반환합니다.
         
+        매개변수:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) 조회 명령으로 대신 읽습니다
+        
         반환값:
             int: 높이 (cm)
         """
+        if not self.is_state_fresh(max_age):
+            return self.query_height()
         return self.get_state_field('h')
 
-    def get_distance_tof(self) -> int:
+    def get_distance_tof(self, max_age: float = None) -> int:
         """
         TOF(Time of Flight) 센서로 측정한 현재 거리를 반환합니다.
         
+        매개변수:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) 조회 명령으로 대신 읽습니다
+        
         반환값:
             int: TOF 거리 (cm)
         """
+        if not self.is_state_fresh(max_age):
+            return int(self.query_distance_tof())
         return self.get_state_field('tof')
 
-    def get_barometer(self) -> int:
+    def get_barometer(self, max_age: float = None) -> float:
         """
         현재 기압계 측정값을 반환합니다.
         절대 고도를 나타냅니다.
         
+        매개변수:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) 조회 명령으로 대신 읽습니다
+        
         반환값:
-            int: 기압계 측정값 (cm)
+            float: 기압계 측정값 (cm)
         """
+        if not self.is_state_fresh(max_age):
+            return float(self.query_barometer())
         return self.get_state_field('baro') * 100
 
-    def get_flight_time(self) -> int:
+    def get_flight_time(self, max_age: float = None) -> int:
         """
         모터가 작동한 시간을 반환합니다.
         
+        매개변수:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) 조회 명령으로 대신 읽습니다
+        
         반환값:
             int: 비행 시간 (초)
         """
+        if not self.is_state_fresh(max_age):
+            return self.query_flight_time()
         return self.get_state_field('time')
 
-    def get_battery(self) -> int:
+    def get_battery(self, max_age: float = None) -> int:
         """
         현재 배터리 잔량을 반환합니다.
         
+        매개변수:
+            max_age: 상태 패킷이 이보다 오래되었으면 (초) 조회 명령으로 대신 읽습니다
+        
         반환값:
             int: 배터리 잔량 (0-100%)
         """
+        if not self.is_state_fresh(max_age):
+            return self.query_battery()
         return self.get_state_field('bat')
 
     def get_udp_video_address(self) -> str:
@@ -460,45 +523,148 @@ class Tello:
             self.background_frame_read.start()
         return self.background_frame_read
 
-    def send_command_with_return(self, command: str, timeout: int = RESPONSE_TIMEOUT) -> str:
+    def send_command_with_return(self, command: str, timeout: float = None) -> str:
         """Send command to Tello and wait for its response.
         Internal method, you normally wouldn't call this yourself.
+
+        응답 링에 남아 있던 패킷(이전 명령의 늦은 응답이나 중복 응답)은 전송 전에 버리고,
+        명령 종류에 맞지 않는 응답(조회 명령에 대한 'ok', 제어 명령에 대한 숫자 값)도 버립니다.
+        Packets left in the response ring (late or duplicate replies to earlier
+        commands) are discarded before sending, and replies that do not fit the
+        command (an 'ok' for a query, a value for a control command) are skipped.
+        Arguments:
+            timeout: 응답 대기 시간 (초). 생략하면 `timeout_policy`가 명령 종류와 이동 거리에 따라 정합니다.
+                Seconds to wait; chosen by `timeout_policy` when omitted.
         Return:
             bool/str: str with response text on success, False when unsuccessfull.
         """
-        # Commands very consecutive makes the drone not respond to them.
-        # So wait at least self.TIME_BTW_COMMANDS seconds
-        diff = time.time() - self.last_received_command_timestamp
-        if diff < self.TIME_BTW_COMMANDS:
-            self.LOGGER.debug('Waiting {} seconds to execute command: {}...'.format(diff, command))
-            time.sleep(diff)
+        if timeout is None:
+            timeout = self.timeout_policy.timeout_for(command, self.speed)
+
+        with self.command_lock, span('send_command_with_return', command=command):
+            # Commands very consecutive makes the drone not respond to them.
+            # So wait at least self.TIME_BTW_COMMANDS seconds
+            diff = time.time() - self.last_received_command_timestamp
+            if diff < self.TIME_BTW_COMMANDS:
+                wait = self.TIME_BTW_COMMANDS - diff
+                self.EVENTS.emit('command', 'Waiting %s seconds to execute command: %s...', wait, command,
+                                 level=logging.DEBUG)
+                with span('command_throttle'):
+                    time.sleep(wait)
+
+            sent_at = self._send_expecting_response(command)
+
+            with span('await_response'):
+                packet = None
+                while packet is None:
+                    packet = self._poll_response(command, sent_at)
+                    if packet is None:
+                        if time.monotonic() - sent_at > timeout:
+                            return self._record_timeout(command, timeout)
+                        time.sleep(self.RESPONSE_POLL_INTERVAL)  # Sleep during send command
+
+            received_at, response = packet
+            self._record_response(command, response, received_at - sent_at)
 
-        self.LOGGER.info("Send command: '{}'".format(command))
-        timestamp = time.time()
+        return response
 
-        client_socket.sendto(command.encode('utf-8'), self.address)
+    def _send_expecting_response(self, command: str) -> float:
+        """응답을 기다릴 명령을 보내고 전송 시각(monotonic)을 반환합니다. 호출하는 쪽이 `command_lock`을 잡고 있어야 합니다.
+        Send a command whose response will be awaited and return the monotonic send time.
+        The caller must hold `command_lock`. Internal method shared with TelloSwarm.broadcast and Choreography.
+        """
+        self._discard_stray_responses()
 
-        responses = self.get_own_udp_object()['responses']
+        self.EVENTS.emit('command', "Send command: '%s'", command)
+        sent_at = self.last_command_sent_at = time.monotonic()
+        self.network.sendto(command.encode('utf-8'), self.address)
+        metrics.COMMANDS.labels(self.address[0]).inc()
+        return sent_at
 
-        while not responses:
-            if time.time() - timestamp > timeout:
-                message = "Aborting command '{}'. Did not receive a response after {} seconds".format(command, timeout)
-                self.LOGGER.warning(message)
-                return message
-            time.sleep(0.1)  # Sleep during send command
+    def _poll_response(self, command: str, sent_at: float) -> Optional[tuple]:
+        """기다리지 않고 `command`에 대한 응답을 찾습니다. 이전 명령의 늦은 응답과 명령 종류에 맞지 않는 응답은 버립니다.
+        Look for the response to `command` without blocking; late and mismatched packets are discarded.
+        Return:
+            (received_at, response) or None
+        """
+        responses = self.udp_slot.responses
+        while True:
+            packet = responses.pop()
+            if packet is None:
+                return None
+
+            received_at, data = packet
+            if received_at < sent_at:
+                self._discard_response(data, 'late')
+                continue
+
+            response = self._decode_response(data)
+            if not response_matches(command, response):
+                self._discard_response(data, 'mismatched')
+                continue
+            return received_at, response
 
+    def _record_response(self, command: str, response: str, elapsed: float):
+        """응답 시각, 지연 시간 메트릭, 타임아웃 정책 학습을 기록합니다.
+        Record the response time and latency metric and teach the timeout policy.
+        """
         self.last_received_command_timestamp = time.time()
+        metrics.COMMAND_LATENCY.labels(self.address[0]).observe(elapsed)
+
+        # 오류 응답은 이동 시간을 포함하지 않으므로 학습하지 않습니다
+        # Error replies return before any motion happens, so they are not learned
+        if 'error' not in response.lower():
+            self.timeout_policy.observe(command, elapsed, self.speed)
+
+        self.EVENTS.emit('response', "Response %s: '%s'", command, response)
 
-        first_response = responses.pop(0)  # first datum from socket
+    def _record_timeout(self, command: str, timeout: float) -> str:
+        """응답이 없었던 명령을 기록하고 send_command_with_return이 반환하는 메시지를 돌려줍니다.
+        Record a command that got no response and return the 'Aborting command' message.
+        """
+        message = "Aborting command '{}'. Did not receive a response after {} seconds".format(
+            command, round(timeout, 3))
+        self.EVENTS.emit('command', message, level=logging.WARNING)
+        metrics.COMMAND_RESULTS.labels(self.address[0], 'timeout').inc()
+        return message
+
+    def _decode_response(self, data: bytes) -> str:
         try:
-            response = first_response.decode("utf-8")
+            response = data.decode("utf-8")
         except UnicodeDecodeError as e:
             self.LOGGER.error(e)
             return "response decode error"
-        response = response.rstrip("\r\n")
+        return response.rstrip("\r\n")
 
-        self.LOGGER.info("Response {}: '{}'".format(command, response))
-        return response
+    def _discard_response(self, data: bytes, reason: str):
+        """현재 명령의 응답이 아닌 패킷을 기록하고 버립니다.
+        Count and log a datagram that is not the answer to the current command.
+        """
+        metrics.RESPONSES_DISCARDED.labels(self.address[0], reason).inc()
+        self.EVENTS.emit('response', "Discarded %s response: %r", reason, data, level=logging.WARNING)
+
+    def _discard_stray_responses(self):
+        """전송 전에 응답 링에 남아 있는 패킷을 모두 버립니다 / drop everything left in the response ring"""
+        responses = self.udp_slot.responses
+        while True:
+            packet = responses.pop()
+            if packet is None:
+                return
+            self._discard_response(packet[1], 'late')
+
+    def _wait_for_late_response(self, command: str, duration: float) -> Optional[str]:
+        """타임아웃된 마지막 명령의 늦은 응답을 `duration`초 동안 기다립니다.
+        Listen for a late response to the last, timed out command for `duration` seconds.
+        """
+        deadline = time.monotonic() + duration
+        while True:
+            packet = self._poll_response(command, self.last_command_sent_at)
+            if packet is not None:
+                self.last_received_command_timestamp = time.time()
+                return packet[1]
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.RESPONSE_POLL_INTERVAL)
 
     def send_command_without_return(self, command: str):
         """Send command to Tello without expecting a response.
@@ -506,21 +672,59 @@ class Tello:
         """
         # Commands very consecutive makes the drone not respond to them. So wait at least self.TIME_BTW_COMMANDS seconds
 
-        self.LOGGER.info("Send command (no response expected): '{}'".format(command))
-        client_socket.sendto(command.encode('utf-8'), self.address)
+        if command.startswith('rc '):
+            metrics.RC_COMMANDS.labels(self.address[0]).inc()
+            self.EVENTS.emit('rc', "Send command (no response expected): '%s'", command)
+        else:
+            self.EVENTS.emit('command', "Send command (no response expected): '%s'", command)
+        self.network.sendto(command.encode('utf-8'), self.address)
 
-    def send_control_command(self, command: str, timeout: int = RESPONSE_TIMEOUT) -> bool:
+    def send_control_command(self, command: str, timeout: float = None) -> bool:
         """Send control command to Tello and wait for its response.
         Internal method, you normally wouldn't call this yourself.
+
+        재시도 사이에는 지수 백오프로 기다립니다. 이동이나 이륙처럼 두 번 실행되면 안 되는 명령은
+        타임아웃 후 바로 재전송하지 않고, 그 사이에 늦게 도착한 'ok'를 성공으로 처리합니다.
+        Retries are spaced with exponential backoff. Non-idempotent commands
+        (motions, takeoff) first listen for a late 'ok' and treat it as success
+        instead of sending the command a second time.
         """
+        host = self.address[0]
+        command_class = classify_command(command)
+        idempotent = is_idempotent(command)
         response = "max retries exceeded"
-        for i in range(0, self.retry_count):
-            response = self.send_command_with_return(command, timeout=timeout)
-
-            if 'ok' in response.lower():
-                return True
-
-            self.LOGGER.debug("Command attempt #{} failed for command: '{}'".format(i, command))
+        # 재시도와 늦은 응답 대기 사이에 다른 스레드의 명령이 끼어들지 않게 합니다
+        # Keep other threads' commands out of the retry and late-response window
+        with self.command_lock:
+            for i in range(0, self.retry_count):
+                if i > 0:
+                    delay = self.timeout_policy.backoff(i)
+                    if not idempotent and response.startswith('Aborting command'):
+                        delay = max(delay, self.timeout_policy.late_response_grace(command, self.speed))
+                        late_response = self._wait_for_late_response(command, delay)
+                        if late_response is not None:
+                            metrics.COMMAND_LATE_RESPONSES.labels(host, command_class).inc()
+                            self.EVENTS.emit('response', "Late response %s: '%s'", command, late_response)
+                            if 'ok' in late_response.lower():
+                                metrics.COMMAND_RESULTS.labels(host, 'ok').inc()
+                                return True
+                            response = late_response
+                    else:
+                        time.sleep(delay)
+
+                    metrics.COMMAND_RETRIES.labels(host, command_class).inc()
+
+                response = self.send_command_with_return(command, timeout=timeout)
+
+                if 'ok' in response.lower():
+                    metrics.COMMAND_RESULTS.labels(host, 'ok').inc()
+                    return True
+
+                if not response.startswith('Aborting command'):
+                    metrics.COMMAND_RESULTS.labels(host, 'error').inc()
+
+                self.EVENTS.emit('command', "Command attempt #%s failed for command: '%s'", i, command,
+                                 level=logging.DEBUG)
 
         self.raise_result_error(command, response)
         return False # never reached
@@ -528,9 +732,21 @@ class Tello:
     def send_read_command(self, command: str) -> str:
         """Send given command to Tello and wait for its response.
         Internal method, you normally wouldn't call this yourself.
-        """
 
-        response = self.send_command_with_return(command)
+        조회 명령은 다시 보내도 안전하므로 응답이 없으면 백오프 후 `retry_count`번까지 재시도합니다.
+        Queries are idempotent, so a lost response is retried up to `retry_count` times.
+        """
+        host = self.address[0]
+        response = "max retries exceeded"
+        with self.command_lock:
+            for i in range(0, self.retry_count):
+                if i > 0:
+                    time.sleep(self.timeout_policy.backoff(i))
+                    metrics.COMMAND_RETRIES.labels(host, classify_command(command)).inc()
+
+                response = self.send_command_with_return(command)
+                if not response.startswith('Aborting command'):
+                    break
 
         try:
             response = str(response)
@@ -538,9 +754,12 @@ class Tello:
             self.LOGGER.error(e)
 
         if any(word in response for word in ('error', 'ERROR', 'False')):
+            metrics.COMMAND_RESULTS.labels(host, 'error').inc()
             self.raise_result_error(command, response)
             return "Error: this code should never be reached"
 
+        if not response.startswith('Aborting command'):
+            metrics.COMMAND_RESULTS.labels(host, 'ok').inc()
         return response
 
     def send_read_command_int(self, command: str) -> int:
@@ -549,7 +768,7 @@ class Tello:
         Internal method, you normally wouldn't call this yourself.
         """
         response = self.send_read_command(command)
-        return int(response)
+        return int(Tello._strip_unit(response))
 
     def send_read_command_float(self, command: str) -> float:
         """Send given command to Tello and wait for its response.
@@ -557,7 +776,14 @@ class Tello:
         Internal method, you normally wouldn't call this yourself.
         """
         response = self.send_read_command(command)
-        return float(response)
+        return float(Tello._strip_unit(response))
+
+    @staticmethod
+    def _strip_unit(response: str) -> str:
+        """'10dm', '0s', '801mm' 처럼 단위가 붙은 응답에서 숫자만 남깁니다.
+        Strip the unit suffix of replies such as '10dm', '0s' or '801mm'.
+        """
+        return response.strip().rstrip('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
 
     def raise_result_error(self, command: str, response: str) -> bool:
         """Used to reaise an error after an unsuccessful command
@@ -576,12 +802,16 @@ class Tello:
         """
         self.send_control_command("command")
 
+        # 기본 포트가 아닌 상태 포트를 사용하는 경우 드론에 알려줍니다
+        if self.network.state_port != Tello.STATE_UDP_PORT:
+            self.set_network_ports(self.network.state_port, self.vs_udp_port)
+
         if wait_for_state:
             REPS = 20
             for i in range(REPS):
                 if self.get_current_state():
                     t = i / REPS
-                    Tello.LOGGER.debug("'.connect()' 첫 상태 패킷 수신 ({}초 후)".format(t))
+                    Tello.LOGGER.debug("'.connect()' 첫 상태 패킷 수신 (%s초 후)", t)
                     break
                 time.sleep(1 / REPS)
 
@@ -619,7 +849,7 @@ class Tello:
         자동 이륙을 수행합니다.
         이륙이 완료될 때까지 대기합니다.
         """
-        self.send_control_command("takeoff", timeout=Tello.TAKEOFF_TIMEOUT)
+        self.send_control_command("takeoff")
         self.is_flying = True
 
     def land(self):
@@ -892,6 +1122,7 @@ class Tello:
             x: 속도 (10-100cm/s)
         """
         self.send_control_command("speed {}".format(x))
+        self.speed = x
 
     def send_rc_control(self, left_right_velocity: int, forward_backward_velocity: int, up_down_velocity: int,
                         yaw_velocity: int):
@@ -937,11 +1168,15 @@ class Tello:
 
     def set_network_ports(self, state_packet_port: int, video_stream_port: int):
         """상태 패킷과 비디오 스트리밍을 위한 포트를 설정합니다.
-        이 명령어로 텔로를 재구성할 수 있지만 현재 이 라이브러리는
-        기본 포트가 아닌 포트는 지원하지 않습니다 (TODO!)
+        상태 포트는 이 드론의 [TelloNetwork][tellonetwork]가 바인딩한 상태 포트와 같아야 합니다.
+        기본 포트가 아닌 네트워크를 사용하면 connect()가 자동으로 호출합니다.
         """
+        if state_packet_port != self.network.state_port:
+            self.LOGGER.warning("State port %s differs from the network's state port %s; "
+                                "state packets will not be received", state_packet_port, self.network.state_port)
         cmd = 'port {} {}'.format(state_packet_port, video_stream_port)
         self.send_control_command(cmd)
+        self.vs_udp_port = video_stream_port
 
     def reboot(self):
         """드론을 재부팅합니다
@@ -1003,7 +1238,8 @@ class Tello:
         반환값:
             int: 1-100
         """
-        return self.send_read_command_int('speed?')
+        self.speed = self.send_read_command_int('speed?')
+        return self.speed
 
     def query_battery(self) -> int:
         """쿼리 명령을 통해 현재 배터리 잔량을 가져옵니다
@@ -1027,7 +1263,10 @@ class Tello:
         반환값:
             int: 0-3000
         """
-        return self.send_read_command_int('height?')
+        # 응답 예시: 10dm
+        response = self.send_read_command('height?')
+        height = int(Tello._strip_unit(response))
+        return height * 10 if response.strip().endswith('dm') else height
 
     def query_temperature(self) -> int:
         """온도를 조회합니다 (°C).
@@ -1035,7 +1274,10 @@ class Tello:
         반환값:
             int: 0-90
         """
-        return self.send_read_command_int('temp?')
+        # 응답 예시: 60~62C (최저~최고). 평균을 반환합니다 / the mean of the range is returned
+        response = Tello._strip_unit(self.send_read_command('temp?'))
+        values = [int(value) for value in response.split('~')]
+        return round(sum(values) / len(values))
 
     def query_attitude(self) -> dict:
         """IMU 자세 데이터를 조회합니다.
@@ -1052,8 +1294,8 @@ class Tello:
         반환값:
             int: 0-100
         """
-        baro = self.send_read_command_int('baro?')
-        return baro * 100
+        baro = self.send_read_command_float('baro?')
+        return int(baro * 100)
 
     def query_distance_tof(self) -> float:
         """TOF 센서로부터 거리 값을 가져옵니다 (cm)
@@ -1093,6 +1335,65 @@ class Tello:
         """
         return self.send_read_command('active?')
 
+    def query_many(self, names: list, max_age: float = None) -> QueryResult:
+        """여러 값을 한 번에 조회합니다. `get_*` 메서드로 얻을 수 있는 값(배터리, 높이, 온도 등)은
+        상태 패킷이 `max_age`초보다 새로우면 상태 스트림에서 바로 읽고, 나머지는 명령 잠금을 잡은 채로
+        연달아 조회하여 다른 스레드의 명령이 끼어들지 않게 합니다.
+        Fetch many values at once. Values with a `get_*` equivalent are read from
+        the state stream when the newest state packet is younger than `max_age`
+        seconds; the remaining queries run back-to-back while holding the command lock.
+
+        ```python
+        result = tello.query_many(['battery', 'sdk_version', 'serial_number', 'wifi_signal_noise_ratio'])
+        print(result.battery, result.serial_number)
+        ```
+
+        Arguments:
+            names: `QUERY_NAMES`의 이름 목록 ('battery' 또는 'query_battery' 형식)
+            max_age: 상태 패킷을 사용할 최대 나이 (초). 0이면 항상 조회 명령을 보냅니다.
+                Maximum state age in seconds; 0 always sends query commands.
+        Returns:
+            QueryResult: 요청한 필드만 채워진 결과
+        """
+        if max_age is None:
+            max_age = self.QUERY_STATE_MAX_AGE
+
+        requested = []
+        for name in names:
+            name = name[len('query_'):] if name.startswith('query_') else name
+            if name not in QUERY_NAMES:
+                raise TelloException("Unknown query '{}'. Expected one of {}".format(name, QUERY_NAMES))
+            if name not in requested:
+                requested.append(name)
+
+        values = {}
+        if self.is_state_fresh(max_age):
+            for name in requested:
+                if name == 'attitude':
+                    values[name] = {'pitch': self.get_pitch(), 'roll': self.get_roll(), 'yaw': self.get_yaw()}
+                elif name in self.STATE_QUERIES:
+                    values[name] = getattr(self, self.STATE_QUERIES[name])()
+
+        with self.command_lock, span('query_many', queries=len(requested) - len(values)):
+            for name in requested:
+                if name not in values:
+                    values[name] = getattr(self, 'query_' + name)()
+
+        for name, cast in self.QUERY_TYPES.items():
+            if values.get(name) is not None:
+                values[name] = cast(values[name])
+
+        return QueryResult(*(values.get(name) for name in QUERY_NAMES))
+
+    def _state_age(self) -> Optional[float]:
+        """가장 최근 상태 패킷의 나이 (초). 아직 받지 못했으면 None.
+        Age of the newest state packet in seconds, or None if none was received.
+        """
+        latest = self.udp_slot.states.latest()
+        if latest is None:
+            return None
+        return time.monotonic() - latest[0]
+
     def end(self):
         """
         드론과의 연결을 안전하게 종료합니다.
@@ -1110,9 +1411,9 @@ class Tello:
             self.background_frame_read.stop()
             self.background_frame_read = None
 
-        host = self.address[0]
-        if host in drones:
-            del drones[host]
+        if self.udp_slot is not None:
+            self.network.unregister(self.address[0], self.udp_slot)
+            self.udp_slot = None
 
     def __del__(self):
         self.end()
@@ -1122,9 +1423,15 @@ class BackgroundFrameRead:
     """
     이 클래스는 백그라운드에서 PyAV를 사용하여 프레임을 읽습니다.
     현재 프레임을 가져오려면 backgroundFrameRead.frame을 사용하세요.
+
+    PyAV와 numpy는 임포트 비용이 크므로 이 클래스를 처음 사용할 때 불러옵니다.
+    비행과 텔레메트리만 사용하는 스크립트는 이 비용을 치르지 않습니다.
     """
 
     def __init__(self, tello, address, with_queue = False, maxsize = 32):
+        import av
+        import numpy as np
+
         self.address = address
         self.lock = Lock()
         self.frame = np.zeros([300, 400, 3], dtype=np.uint8)
@@ -1153,12 +1460,30 @@ class BackgroundFrameRead:
         """PyAV를 사용하여 프레임을 가져오는 스레드 워커 함수
         내부 메서드로, 일반적으로 직접 호출하지 않습니다.
         """
+        import av
+
+        decoded = metrics.FRAMES_DECODED.labels(self.address)
+        dropped = metrics.FRAMES_DROPPED.labels(self.address)
+
         try:
-            for frame in self.container.decode(video=0):
+            frames = self.container.decode(video=0)
+            while True:
+                with span('decode_frame', category='video'):
+                    frame = next(frames, None)
+                if frame is None:
+                    break
+
+                decoded.inc()
+                # PIL 이미지를 거치지 않고 바로 RGB 배열로 변환합니다
+                with span('convert_frame', category='video'):
+                    image = frame.to_ndarray(format='rgb24')
+
                 if self.with_queue:
-                    self.frames.append(np.array(frame.to_image()))
+                    if len(self.frames) == self.frames.maxlen:
+                        dropped.inc()
+                    self.frames.append(image)
                 else:
-                    self.frame = np.array(frame.to_image())
+                    self.frame = image
 
                 if self.stopped:
                     self.container.close()
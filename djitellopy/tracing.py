@@ -0,0 +1,134 @@
+"""파이프라인 단계별 시간을 재는 선택적 타이밍 스팬.
+Opt-in timing spans for the stages of Tello pipelines.
+
+꺼져 있을 때 `span()`은 미리 만들어 둔 빈 컨텍스트 매니저를 반환하므로 비용이 거의 없습니다.
+켜면 각 스팬이 메모리 링에 기록되며, Chrome trace-event JSON으로 내보내
+chrome://tracing 이나 Perfetto에서 볼 수 있습니다.
+When disabled, `span()` returns a shared no-op context manager. When enabled,
+spans are recorded into an in-memory ring and can be exported as Chrome
+trace-event JSON for chrome://tracing or Perfetto.
+
+```python
+from djitellopy import tracing
+tracing.TRACER.enable()
+...
+tracing.TRACER.export_chrome_trace('mission.json')
+```
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """진행 중인 스팬 하나 / a single span being timed"""
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, end - self.start, self.args)
+        return False
+
+
+class Tracer:
+    """스팬 기록기 / span recorder"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: Optional[deque] = None
+        self.thread_names = {}
+        self._origin = time.perf_counter()
+
+    def enable(self, max_events: int = 100000):
+        """기록을 시작합니다. 최근 `max_events`개의 스팬만 보관합니다.
+        Start recording, keeping the latest `max_events` spans.
+        """
+        self.events = deque(maxlen=max_events)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name: str, category: str = 'djitellopy', **args):
+        """`with` 블록의 실행 시간을 기록하는 컨텍스트 매니저를 반환합니다.
+        Return a context manager timing the body of a `with` block.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, args)
+
+    def record(self, name: str, category: str, start: float, duration: float, args: dict):
+        events = self.events
+        if events is None:
+            return
+
+        thread = threading.current_thread()
+        self.thread_names[thread.ident] = thread.name
+        events.append((name, category, start, duration, thread.ident, args))
+
+    def clear(self):
+        if self.events is not None:
+            self.events.clear()
+
+    def chrome_trace(self) -> dict:
+        """기록된 스팬을 Chrome trace-event 형식의 dict로 반환합니다.
+        Return the recorded spans as a Chrome trace-event dict.
+        """
+        pid = os.getpid()
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in list(self.thread_names.items())
+        ]
+        for name, category, start, duration, tid, args in list(self.events or ()):
+            trace_events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - self._origin) * 1e6,
+                'dur': duration * 1e6,
+                'pid': pid,
+                'tid': tid,
+                'args': args,
+            })
+
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path: str):
+        """Chrome trace-event JSON 파일로 저장합니다 / write a Chrome trace-event JSON file"""
+        with open(path, 'w') as fd:
+            json.dump(self.chrome_trace(), fd, default=str)
+
+
+TRACER = Tracer()
+span = TRACER.span
@@ -0,0 +1,187 @@
+"""웹 UI 예제용 에이전트 풀.
+Agent pool for the web UI examples.
+
+에이전트(LLM 클라이언트, 도구 스키마, 시스템 프롬프트)를 에이전트 유형마다 한 번만 만들어 재사용하고,
+운영자(operator)마다 최근 대화 몇 개만 기억하는 세션을 유지합니다. 에이전트 자체는 운영자 상태를 갖지 않고
+세션의 최근 대화를 호출마다 넘겨받으므로, 한 에이전트를 여러 운영자가 공유할 수 있습니다.
+호출마다 걸린 시간을 기록하여 `/agents/stats`로 보여줍니다.
+
+```python
+agents = AgentPool(max_history=6)
+agents.register('drone', create_drone_agent,
+                lambda agent, command, history: agent.run(with_history(command, history)))
+agents.warm()  # 첫 명령이 에이전트 생성 시간을 기다리지 않도록 미리 만들어 둡니다
+agents.register_routes(app)
+
+result, latency = agents.run('drone', "이륙해줘", operator=current_operator())
+```
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+from flask import jsonify, request
+
+
+def with_history(command, history):
+    """최근 대화를 명령 앞에 붙인 프롬프트. 대화가 없으면 명령 그대로 반환합니다."""
+    if not history:
+        return command
+    lines = ["이전 대화 (참고용):"]
+    for previous_command, result in history:
+        lines.append(f"- 명령: {previous_command}")
+        lines.append(f"  결과: {result}")
+    lines.append("")
+    lines.append(f"현재 명령: {command}")
+    return "\n".join(lines)
+
+
+def current_operator():
+    """요청한 운영자. 요청 본문의 'operator'가 없으면 클라이언트 주소를 사용합니다."""
+    body = request.get_json(silent=True) or {}
+    return body.get('operator') or request.remote_addr
+
+
+class AgentStats:
+    """에이전트 유형 하나의 호출 시간 통계"""
+
+    def __init__(self):
+        self.build_time = None
+        self.calls = 0
+        self.errors = 0
+        self.last_latency = None
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency, failed):
+        self.calls += 1
+        self.errors += failed
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self):
+        return {
+            'build_time': None if self.build_time is None else round(self.build_time, 3),
+            'calls': self.calls,
+            'errors': self.errors,
+            'last_latency': None if self.last_latency is None else round(self.last_latency, 3),
+            'average_latency': round(self.total_latency / self.calls, 3) if self.calls else None,
+            'max_latency': round(self.max_latency, 3),
+        }
+
+
+class AgentPool:
+    """에이전트를 유형별로 한 번만 만들고, 운영자별로 최근 대화를 보관합니다.
+
+    Args:
+        max_history: 세션마다 기억하는 최근 (명령, 결과) 수
+        max_sessions: 보관하는 세션 수. 넘으면 가장 오래 쓰지 않은 세션부터 버립니다
+    """
+
+    def __init__(self, max_history=6, max_sessions=64):
+        self.max_history = max_history
+        self.max_sessions = max_sessions
+        self.factories = {}
+        self.runners = {}
+        self.agents = {}
+        self.locks = {}
+        self.stats = {}
+        self.sessions = OrderedDict()  # (운영자, 에이전트 유형) -> 최근 대화
+        self.lock = threading.Lock()
+
+    def register(self, agent_type, factory, run):
+        """에이전트 유형을 등록합니다.
+
+        Args:
+            agent_type: 에이전트 이름 (예: 'drone')
+            factory: 인자 없이 에이전트를 만드는 함수. 처음 쓸 때 한 번만 호출됩니다
+            run: `run(agent, command, history)` 형태로 에이전트를 실행하고 결과를 반환하는 함수.
+                history는 이 세션의 최근 (명령, 결과) 목록입니다
+        """
+        self.factories[agent_type] = factory
+        self.runners[agent_type] = run
+        self.locks[agent_type] = threading.Lock()
+        self.stats[agent_type] = AgentStats()
+
+    def __contains__(self, agent_type):
+        return agent_type in self.factories
+
+    def get(self, agent_type):
+        """에이전트를 반환합니다. 아직 없으면 만듭니다."""
+        with self.locks[agent_type]:
+            return self._get(agent_type)
+
+    def _get(self, agent_type):
+        agent = self.agents.get(agent_type)
+        if agent is None:
+            started = time.monotonic()
+            agent = self.factories[agent_type]()
+            self.stats[agent_type].build_time = time.monotonic() - started
+            self.agents[agent_type] = agent
+        return agent
+
+    def warm(self, *agent_types):
+        """백그라운드에서 에이전트를 미리 만듭니다. 유형을 생략하면 모두 만듭니다."""
+        def build():
+            for agent_type in agent_types or list(self.factories):
+                try:
+                    self.get(agent_type)
+                except Exception as e:
+                    print(f"{agent_type} 에이전트 준비 오류: {str(e)}")
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def history(self, agent_type, operator):
+        with self.lock:
+            return list(self.sessions.get((operator, agent_type), ()))
+
+    def reset(self, operator):
+        """운영자의 대화 기록을 모두 지웁니다"""
+        with self.lock:
+            for key in [key for key in self.sessions if key[0] == operator]:
+                del self.sessions[key]
+
+    def _remember(self, agent_type, operator, command, result):
+        with self.lock:
+            key = (operator, agent_type)
+            session = self.sessions.pop(key, None) or deque(maxlen=self.max_history)
+            session.append((command, result))
+            self.sessions[key] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def run(self, agent_type, command, operator='default'):
+        """에이전트로 명령을 실행합니다. 같은 에이전트는 한 번에 하나의 명령만 실행합니다.
+
+        Returns:
+            (결과, 걸린 시간(초)). 에이전트 생성 시간은 포함하지 않습니다
+        """
+        history = self.history(agent_type, operator)
+        with self.locks[agent_type]:
+            agent = self._get(agent_type)
+            started = time.monotonic()
+            failed = True
+            try:
+                result = self.runners[agent_type](agent, command, history)
+                failed = False
+            finally:
+                latency = time.monotonic() - started
+                self.stats[agent_type].record(latency, failed)
+                print(f"{agent_type} 에이전트 응답 시간: {latency:.2f}초")
+
+        self._remember(agent_type, operator, command, result)
+        return result, latency
+
+    def register_routes(self, app):
+        """/agents/stats 라우트를 등록합니다"""
+        app.add_url_rule('/agents/stats', 'agents_stats', self._stats_view)
+
+    def _stats_view(self):
+        with self.lock:
+            sessions = len(self.sessions)
+        return jsonify({
+            'agents': {agent_type: stats.as_dict() for agent_type, stats in self.stats.items()},
+            'sessions': sessions,
+        })
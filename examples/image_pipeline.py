@@ -0,0 +1,190 @@
+"""비전 LLM에 보낼 이미지의 메모리 내 전처리.
+In-memory image preprocessing for vision-LLM uploads.
+
+사진을 원본 해상도로 디스크에 저장했다가 다시 읽어 업로드하는 대신, 프레임을 메모리에서 바로
+긴 변 기준으로 줄이고 JPEG/WebP로 인코딩합니다. 인코딩 결과가 바이트 예산을 넘으면 품질을, 그래도 넘으면
+크기를 낮춥니다. 비디오와 같은 Wi-Fi로 보내는 업로드 크기가 작아져 분석 지연이 줄어듭니다.
+
+`SceneAnalyzer`는 프레임의 지각 해시(dHash)를 비교하여, 장면이 바뀌지 않았으면 LLM을 다시 부르지 않고
+이전 분석을 재사용합니다.
+
+```python
+vision = SceneAnalyzer(lambda image: ask_vision_llm(data_url(image)))
+analysis = vision.analyze(frame_read.frame)   # 처음에는 LLM 호출
+analysis = vision.analyze(frame_read.frame)   # 장면이 같으면 이전 분석 재사용
+print(vision.stats())
+```
+"""
+
+import base64
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+FORMATS = {
+    'jpeg': ('.jpg', 'image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', 'image/webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+MIN_EDGE = 160  # 바이트 예산을 맞추려고 이보다 작게 줄이지는 않습니다
+
+EncodedImage = namedtuple('EncodedImage', ['data', 'mime_type', 'size', 'quality'])
+
+
+def resize_long_edge(frame, max_edge):
+    """긴 변이 max_edge를 넘으면 비율을 유지하며 줄입니다"""
+    height, width = frame.shape[:2]
+    scale = max_edge / max(height, width)
+    if scale >= 1:
+        return frame
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_image(frame, max_edge=768, max_bytes=120 * 1024, image_format='jpeg', quality=85, min_quality=40,
+                 rgb=True):
+    """프레임을 크기와 바이트 예산에 맞춰 메모리에서 인코딩합니다.
+
+    Args:
+        frame: 이미지 배열 (Tello 프레임은 RGB)
+        max_edge: 긴 변의 최대 픽셀 수
+        max_bytes: 인코딩 결과의 최대 바이트 수
+        image_format: 'jpeg' 또는 'webp'
+        quality: 처음 시도할 품질 (0-100)
+        min_quality: 예산을 맞추려고 낮출 수 있는 최저 품질. 그래도 크면 해상도를 줄입니다
+        rgb: 프레임이 RGB이면 True (OpenCV 인코더는 BGR을 기대합니다)
+
+    Returns:
+        EncodedImage(data, mime_type, size, quality)
+    """
+    extension, mime_type, quality_flag = FORMATS[image_format]
+    image = resize_long_edge(frame, max_edge)
+    if rgb and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+    while True:
+        ok, buffer = cv2.imencode(extension, image, [quality_flag, quality])
+        if not ok:
+            raise ValueError(f"이미지를 {image_format} 형식으로 인코딩할 수 없습니다")
+        long_edge = max(image.shape[:2])
+        if len(buffer) <= max_bytes or (quality <= min_quality and long_edge <= MIN_EDGE):
+            height, width = image.shape[:2]
+            return EncodedImage(buffer.tobytes(), mime_type, (width, height), quality)
+        if quality > min_quality:
+            quality = max(min_quality, quality - 10)
+        else:
+            image = resize_long_edge(image, max(MIN_EDGE, int(long_edge * 0.75)))
+
+
+def to_base64(image):
+    return base64.b64encode(image.data).decode('ascii')
+
+
+def data_url(image):
+    """OpenAI image_url에 넣을 수 있는 data URL"""
+    return f"data:{image.mime_type};base64,{to_base64(image)}"
+
+
+def perceptual_hash(frame, hash_size=8):
+    """프레임의 차이 해시(dHash). 비슷한 장면은 비트가 조금만 다릅니다"""
+    small = cv2.resize(frame, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class SceneAnalyzer:
+    """프레임을 전처리하여 비전 LLM으로 분석하고, 장면이 같으면 이전 분석을 재사용합니다.
+
+    Args:
+        analyze: EncodedImage를 받아 분석 결과(문자열 또는 텍스트 조각의 iterable)를 반환하는 함수
+        max_edge: 업로드할 이미지의 긴 변 최대 픽셀 수
+        max_bytes: 업로드할 이미지의 최대 바이트 수
+        image_format: 'jpeg' 또는 'webp'
+        quality: 처음 시도할 인코딩 품질
+        threshold: 이전 장면과 같다고 볼 해시 비트 차이 (64비트 중)
+        max_age: 이전 분석을 재사용할 최대 시간 (초). None이면 제한 없음
+    """
+
+    def __init__(self, analyze, max_edge=768, max_bytes=120 * 1024, image_format='jpeg', quality=85,
+                 threshold=5, max_age=120):
+        self.analyze_image = analyze
+        self.max_edge = max_edge
+        self.max_bytes = max_bytes
+        self.image_format = image_format
+        self.quality = quality
+        self.threshold = threshold
+        self.max_age = max_age
+
+        self.lock = threading.Lock()
+        self.last = None  # (해시, 분석 결과, 분석 시각)
+        self.reused = 0
+        self.analyzed = 0
+        self.bytes_sent = 0
+        self.encode_time = 0.0
+        self.analyze_time = 0.0
+
+    def cached(self, frame_hash):
+        """같은 장면의 이전 분석. 없으면 None"""
+        with self.lock:
+            if self.last is None:
+                return None
+            last_hash, analysis, analyzed_at = self.last
+            if self.max_age is not None and time.monotonic() - analyzed_at > self.max_age:
+                return None
+            if hamming_distance(frame_hash, last_hash) > self.threshold:
+                return None
+            self.reused += 1
+            return analysis
+
+    def analyze(self, frame, reuse=True):
+        """프레임을 분석합니다. 실패하면 예외를 그대로 전달하며 결과를 저장하지 않습니다"""
+        return ''.join(self.analyze_stream(frame, reuse))
+
+    def analyze_stream(self, frame, reuse=True):
+        """프레임을 분석하며 결과를 조각 단위로 내보냅니다.
+        분석 함수가 문자열 대신 텍스트 조각의 iterable(LLM 스트림)을 반환하면 받는 대로 전달하고,
+        끝까지 받은 결과만 저장합니다. 이전 분석을 재사용할 때는 한 번에 내보냅니다.
+        """
+        frame_hash = perceptual_hash(frame)
+        if reuse:
+            analysis = self.cached(frame_hash)
+            if analysis is not None:
+                print("장면이 바뀌지 않아 이전 분석을 재사용합니다.")
+                yield analysis
+                return
+
+        started = time.perf_counter()
+        image = encode_image(frame, self.max_edge, self.max_bytes, self.image_format, self.quality)
+        encoded = time.perf_counter()
+        print(f"업로드 이미지: {image.size[0]}x{image.size[1]}, {len(image.data) / 1024:.0f}KB (품질 {image.quality})")
+        result = self.analyze_image(image)
+        chunks = []
+        for chunk in [result] if isinstance(result, str) else result:
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+        finished = time.perf_counter()
+
+        with self.lock:
+            self.last = (frame_hash, ''.join(chunks), time.monotonic())
+            self.analyzed += 1
+            self.bytes_sent += len(image.data)
+            self.encode_time += encoded - started
+            self.analyze_time += finished - encoded
+
+    def stats(self):
+        with self.lock:
+            return {
+                'analyzed': self.analyzed,
+                'reused': self.reused,
+                'average_upload_kb': round(self.bytes_sent / self.analyzed / 1024, 1) if self.analyzed else None,
+                'average_encode_ms': round(self.encode_time / self.analyzed * 1000, 1) if self.analyzed else None,
+                'average_analyze_s': round(self.analyze_time / self.analyzed, 2) if self.analyzed else None,
+            }
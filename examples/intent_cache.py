@@ -0,0 +1,149 @@
+"""자연어 명령 → 드론 명령 캐시.
+Cache mapping natural-language instructions to drone commands.
+
+운영자는 같은 말을 여러 번 반복하는데, 그때마다 LLM이 같은 `tello.move_forward(100)`을 만들어 냅니다.
+정규화한 문장을 키로 LLM의 해석 결과를 저장해 두고, 같은 문장이 다시 오면 LLM 없이 바로 돌려줍니다.
+가장 오래 쓰지 않은 항목부터 버리고(LRU), 오래된 항목은 만료시키며(TTL), 파일에 저장하여 다음 실행에서도
+사용할 수 있습니다. 도구 스키마(명령 목록, 프롬프트 등)가 바뀌면 저장된 항목은 모두 버립니다.
+
+```python
+cache = IntentCache(schema=TelloController.available_functions, path='voice_intent_cache.json')
+command = cache.resolve(text, interpret_with_llm)  # 처음에는 LLM 호출, 다음부터는 캐시
+```
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from intent_parser import normalize
+
+# 이전 대화에 따라 뜻이 달라지는 말. 이런 문장은 캐시하지 않습니다
+CONTEXT_WORDS = ["다시", "한 번 더", "한번 더", "아까", "방금", "그만큼", "again", "same", "that", "previous"]
+
+
+def fingerprint(schema):
+    """도구 스키마의 해시. 스키마가 바뀌면 값이 달라집니다"""
+    data = json.dumps(schema, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+class IntentCache:
+    """정규화한 문장 → 명령 캐시 (LRU + TTL, 선택적 파일 저장).
+
+    Args:
+        schema: 해석 결과에 영향을 주는 도구 스키마. 바뀌면 저장된 캐시를 버립니다
+        max_size: 보관할 항목 수
+        ttl: 항목의 유효 시간 (초). None이면 만료되지 않습니다
+        path: 캐시를 저장할 JSON 파일. None이면 메모리에만 보관합니다
+    """
+
+    def __init__(self, schema=None, max_size=256, ttl=24 * 3600, path=None):
+        self.schema = fingerprint(schema)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()  # 키 -> (명령, 저장 시각)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def key(text):
+        return normalize(text).strip()
+
+    def cacheable(self, text):
+        return not any(word in self.key(text) for word in CONTEXT_WORDS)
+
+    def get(self, text):
+        """캐시된 명령을 반환합니다. 없거나 만료되었으면 None"""
+        key = self.key(text)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[1] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text, command):
+        """해석 결과를 저장합니다. 이전 대화에 의존하는 문장은 저장하지 않습니다"""
+        if not self.cacheable(text):
+            return
+        with self.lock:
+            self.entries[self.key(text)] = (command, time.time())
+            self.entries.move_to_end(self.key(text))
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        self.save()
+
+    def discard(self, text):
+        """잘못된 항목을 지웁니다 (예: 캐시된 명령의 실행이 실패했을 때)"""
+        with self.lock:
+            removed = self.entries.pop(self.key(text), None) is not None
+        if removed:
+            self.save()
+
+    def resolve(self, text, fallback):
+        """캐시에 있으면 바로 반환하고, 없으면 `fallback(text)`(LLM)의 결과를 저장하고 반환합니다"""
+        command = self.get(text)
+        if command is not None:
+            print(f"캐시된 해석: {command}")
+            return command
+        command = fallback(text)
+        if command:
+            self.put(text, command)
+        return command
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+        }
+
+    def load(self):
+        """파일에서 캐시를 읽습니다. 스키마가 다르거나 파일이 손상되었으면 무시합니다"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"명령 캐시를 읽을 수 없습니다: {str(e)}")
+            return
+        if data.get('schema') != self.schema:
+            print("도구 스키마가 바뀌어 명령 캐시를 초기화합니다.")
+            return
+        now = time.time()
+        with self.lock:
+            for key, command, stored_at in data.get('entries', [])[-self.max_size:]:
+                if self.ttl is None or now - stored_at <= self.ttl:
+                    self.entries[key] = (command, stored_at)
+
+    def save(self):
+        """캐시를 파일에 저장합니다. 임시 파일에 쓴 뒤 교체하므로 도중에 끊겨도 파일이 깨지지 않습니다"""
+        if not self.path:
+            return
+        with self.lock:
+            data = {
+                'schema': self.schema,
+                'entries': [[key, command, stored_at] for key, (command, stored_at) in self.entries.items()],
+            }
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"명령 캐시를 저장할 수 없습니다: {str(e)}")
@@ -0,0 +1,275 @@
+"""음성/텍스트 명령의 규칙 기반 빠른 해석기.
+Deterministic fast-path parser for spoken and typed drone commands.
+
+"이륙해줘", "착륙", "앞으로 1미터", "오른쪽으로 90도 돌아", "go up 50 cm" 같은 간단한 명령은
+LLM을 거치지 않고 바로 명령으로 바꿉니다 (수십 마이크로초). 명령이 여러 개 섞여 있거나, 부정문이거나,
+숫자/방향이 모호하면 None을 반환하여 LLM으로 넘깁니다. 결과 형식은 음성 제어 예제의
+Function calling 결과와 같습니다.
+
+```python
+parser = IntentParser(keywords={"detect_objects": ["뭐가 보이", "물체"]})
+parser.parse("앞으로 1미터 가줘")
+# {"command": "move", "parameters": {"direction": "forward", "distance": 100}}
+
+command = parser.resolve(text, process_with_llm)  # 해석하지 못하면 LLM 호출
+print(parser.stats())  # 빠른 경로 적중률, 평균 처리 시간
+```
+"""
+
+import functools
+import re
+import time
+
+# Tello SDK가 허용하는 범위. 벗어나면 해석하지 않고 LLM에 넘깁니다
+MIN_DISTANCE, MAX_DISTANCE = 20, 500
+MIN_ANGLE, MAX_ANGLE = 1, 360
+
+TAKEOFF_WORDS = ["이륙", "take off", "takeoff", "lift off"]
+LAND_WORDS = ["착륙", "내려앉", "land"]
+ROTATE_WORDS = ["회전", "돌아", "돌려", "돌기", "rotate", "turn", "spin"]
+MOVE_WORDS = {
+    "up": ["위로", "위쪽", "올라", "상승", "up", "ascend", "rise"],
+    "down": ["아래로", "아래쪽", "내려", "하강", "down", "descend", "lower"],
+    "left": ["왼쪽", "좌측", "왼편", "left"],
+    "right": ["오른쪽", "우측", "오른편", "right"],
+    "forward": ["앞으로", "앞쪽", "전진", "forward", "ahead"],
+    "back": ["뒤로", "뒤쪽", "후진", "backward", "back"],
+}
+COUNTER_CLOCKWISE_WORDS = ["반시계", "counterclockwise", "counter clockwise", "anticlockwise", "anti clockwise"]
+CLOCKWISE_WORDS = ["시계", "clockwise"]
+# normalize() 뒤의 문장과 비교합니다 (아포스트로피는 공백이 되므로 "don't"는 "don t")
+NEGATION_WORDS = ["말고", "금지", "그만", "멈춰", "멈추지",
+                  "don t", "dont", "do not", "not", "never", "cancel", "no", "later", "wait"]
+# 한국어 부정은 고정된 말이 아니라 어미이므로 정규식으로 찾습니다:
+# "가지 마세요", "이륙하지는 마", "회전하지 않아도", 띄어 쓴 "안"/"못" ("이륙 안 해", "못 가")
+NEGATION_PATTERN = re.compile(r'지\s*(?:는\s*)?(?:마|말|않)|\s(?:안|못)\s|안\s*(?:해|돼|되|하)')
+# 두 가지 이상의 명령을 잇는 말. 순서 있는 명령은 LLM이 처리합니다
+SEQUENCE_WORDS = ["하고", "한 다음", "한 뒤", "후에", "그리고", "다음에", " then ", " and then", " after "]
+
+NATIVE_NUMBERS = {
+    "한": 1, "두": 2, "세": 3, "네": 4, "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+}
+SINO_DIGITS = {"일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "칠": 7, "팔": 8, "구": 9}
+ENGLISH_NUMBERS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70,
+    "eighty": 80, "ninety": 90, "hundred": 100, "a hundred": 100, "half a": 0.5, "half": 0.5,
+}
+
+UNITS = {
+    "센티미터": ("distance", 1), "센티": ("distance", 1), "cm": ("distance", 1),
+    "centimeters": ("distance", 1), "centimeter": ("distance", 1),
+    "미터": ("distance", 100), "meters": ("distance", 100), "meter": ("distance", 100),
+    "metres": ("distance", 100), "metre": ("distance", 100), "m": ("distance", 100),
+    "도": ("angle", 1), "degrees": ("angle", 1), "degree": ("angle", 1), "deg": ("angle", 1),
+}
+
+_WORD_NUMBER = '|'.join(sorted(list(NATIVE_NUMBERS) + list(ENGLISH_NUMBERS), key=len, reverse=True))
+_UNIT = '|'.join(sorted(UNITS, key=len, reverse=True))
+QUANTITY = re.compile(
+    r'(?P<number>\d+(?:\.\d+)?|' + _WORD_NUMBER + r'|[일이삼사오육칠팔구십백]+|반)'
+    r'\s*(?P<unit>' + _UNIT + r')(?![a-z])'
+    r'(?:\s*(?P<half>반))?'
+)
+BARE_NUMBER = re.compile(r'(?<![\d.])(\d+(?:\.\d+)?)(?![\d.])')
+
+
+def _sino_korean(text):
+    """'백오십' 같은 한자어 수를 정수로 변환"""
+    total, current = 0, 0
+    for char in text:
+        if char in SINO_DIGITS:
+            current = SINO_DIGITS[char]
+        elif char == '십':
+            total += (current or 1) * 10
+            current = 0
+        elif char == '백':
+            total += (current or 1) * 100
+            current = 0
+    return total + current
+
+
+def _number(text):
+    if text[0].isdigit():
+        return float(text)
+    if text == '반':
+        return 0.5
+    if text in NATIVE_NUMBERS:
+        return NATIVE_NUMBERS[text]
+    if text in ENGLISH_NUMBERS:
+        return ENGLISH_NUMBERS[text]
+    return _sino_korean(text)
+
+
+def normalize(text):
+    """소문자로 바꾸고 문장 부호와 겹친 공백을 정리합니다"""
+    text = re.sub(r'[!?,~"\'“”‘’]', ' ', text.lower())
+    text = re.sub(r'\.(?!\d)', ' ', text)
+    return ' ' + re.sub(r'\s+', ' ', text).strip() + ' '
+
+
+def _contains(text, words):
+    return [word for word in words if word in text]
+
+
+@functools.lru_cache(maxsize=None)
+def _word_pattern(word):
+    return re.compile(r'(?<![a-z])' + re.escape(word) + r'(?![a-z])')
+
+
+def _contains_word(text, words):
+    """영어 단어는 단어 경계로, 한국어는 부분 문자열로 찾습니다"""
+    found = []
+    for word in words:
+        if word.isascii():
+            if word in text and _word_pattern(word).search(text):
+                found.append(word)
+        elif word in text:
+            found.append(word)
+    return found
+
+
+def describe(intent):
+    """명령을 'move(direction=forward, distance=100)' 형태의 문자열로 표시"""
+    parameters = ', '.join(f"{key}={value}" for key, value in intent.get("parameters", {}).items())
+    return f"{intent['command']}({parameters})"
+
+
+class IntentParser:
+    """간단한 드론 명령을 규칙으로 해석하고, 빠른 경로 적중률을 기록합니다.
+
+    Args:
+        keywords: 추가 명령과 그 명령을 뜻하는 키워드 목록. 예: {"detect_objects": ["뭐가 보이"]}
+        commands: 허용할 명령 이름. 지정하면 이 밖의 명령은 해석하지 않고 LLM에 넘깁니다
+        default_distance: 거리 없이 "앞으로 가"라고 했을 때 이동 거리 (cm). None이면 LLM에 넘깁니다
+        default_angle: 각도 없이 "회전해"라고 했을 때 회전 각도. None이면 LLM에 넘깁니다
+    """
+
+    def __init__(self, keywords=None, commands=None, default_distance=30, default_angle=90):
+        self.keywords = keywords or {}
+        self.commands = commands
+        self.default_distance = default_distance
+        self.default_angle = default_angle
+        self.parsed = 0
+        self.escalated = 0
+        self.parse_time = 0.0
+        self.fallback_time = 0.0
+        self.fallback_calls = 0
+
+    def parse(self, text):
+        """명령을 해석합니다. 확실하지 않으면 None을 반환합니다.
+
+        Returns:
+            {"command": ..., "parameters": {...}} 또는 None
+        """
+        started = time.perf_counter()
+        intent = self._parse(normalize(text))
+        self.parse_time += time.perf_counter() - started
+        if intent is None:
+            self.escalated += 1
+        else:
+            self.parsed += 1
+        return intent
+
+    def resolve(self, text, fallback):
+        """빠른 경로로 해석하고, 실패하면 `fallback(text)`(LLM)를 호출합니다"""
+        intent = self.parse(text)
+        if intent is not None:
+            print(f"빠른 해석: {intent}")
+            return intent
+
+        started = time.perf_counter()
+        try:
+            return fallback(text)
+        finally:
+            self.fallback_time += time.perf_counter() - started
+            self.fallback_calls += 1
+
+    def stats(self):
+        total = self.parsed + self.escalated
+        return {
+            'parsed': self.parsed,
+            'escalated': self.escalated,
+            'hit_rate': round(self.parsed / total, 3) if total else None,
+            'average_parse_ms': round(self.parse_time / total * 1000, 3) if total else None,
+            'average_fallback_ms': round(self.fallback_time / self.fallback_calls * 1000, 1)
+            if self.fallback_calls else None,
+        }
+
+    def _parse(self, text):
+        if (_contains_word(text, NEGATION_WORDS) or NEGATION_PATTERN.search(text)
+                or _contains(text, SEQUENCE_WORDS)):
+            return None
+
+        intents = []
+        for command, words in self.keywords.items():
+            if _contains_word(text, words):
+                intents.append({"command": command})
+        if _contains_word(text, TAKEOFF_WORDS):
+            intents.append({"command": "takeoff"})
+        if _contains_word(text, LAND_WORDS):
+            intents.append({"command": "land"})
+
+        quantities = list(QUANTITY.finditer(text))
+        # 단위와 함께 해석하지 못한 수가 남아 있으면 ("one hundred fifty cm") 모호한 것으로 봅니다
+        rest = QUANTITY.sub(' ', text)
+        if quantities and (BARE_NUMBER.search(rest) or _contains_word(rest, ENGLISH_NUMBERS)):
+            return None
+        if _contains_word(text, ROTATE_WORDS) or any(UNITS[q.group('unit')][0] == 'angle' for q in quantities):
+            intents.append(self._rotation(text, quantities))
+        elif any(_contains_word(text, words) for words in MOVE_WORDS.values()):
+            intents.append(self._movement(text, quantities))
+
+        # 명령이 하나로 정해지지 않으면 LLM에 넘깁니다
+        if len(intents) != 1 or intents[0] is None:
+            return None
+        if self.commands is not None and intents[0]["command"] not in self.commands:
+            return None
+        return intents[0]
+
+    def _amount(self, text, quantities, kind, default):
+        """단위가 붙은 수 하나(또는 단위 없는 수 하나)를 찾습니다. 여러 개면 모호하므로 None"""
+        if len(quantities) > 1:
+            return None
+        if quantities:
+            match = quantities[0]
+            unit_kind, scale = UNITS[match.group('unit')]
+            if unit_kind != kind:
+                return None
+            value = _number(match.group('number'))
+            if match.group('half'):
+                value += 0.5
+            return round(value * scale)
+
+        numbers = BARE_NUMBER.findall(text)
+        if len(numbers) > 1:
+            return None
+        if numbers:
+            return round(float(numbers[0]))
+        return default
+
+    def _movement(self, text, quantities):
+        directions = [direction for direction, words in MOVE_WORDS.items() if _contains_word(text, words)]
+        if len(directions) != 1:
+            return None
+        distance = self._amount(text, quantities, 'distance', self.default_distance)
+        if distance is None or not MIN_DISTANCE <= distance <= MAX_DISTANCE:
+            return None
+        return {"command": "move", "parameters": {"direction": directions[0], "distance": distance}}
+
+    def _rotation(self, text, quantities):
+        if _contains_word(text, COUNTER_CLOCKWISE_WORDS):
+            direction = "counter_clockwise"
+        elif _contains_word(text, CLOCKWISE_WORDS):
+            direction = "clockwise"
+        else:
+            sides = [side for side in ("left", "right") if _contains_word(text, MOVE_WORDS[side])]
+            others = [side for side in ("up", "down", "forward", "back") if _contains_word(text, MOVE_WORDS[side])]
+            if len(sides) != 1 or others:
+                return None
+            direction = "clockwise" if sides[0] == "right" else "counter_clockwise"
+
+        angle = self._amount(text, quantities, 'angle', self.default_angle)
+        if angle is None or not MIN_ANGLE <= angle <= MAX_ANGLE:
+            return None
+        return {"command": "rotate", "parameters": {"direction": direction, "angle": angle}}
@@ -0,0 +1,313 @@
+"""웹 UI 예제용 비동기 작업 실행기.
+Asynchronous job runner for the web UI examples.
+
+스캔, 파노라마, 에이전트 실행, 음성 녹음처럼 수십 초 걸리는 작업을 HTTP 요청 스레드에서 실행하지 않고,
+크기가 제한된 스레드 풀에서 실행합니다. POST 요청은 작업 ID를 바로 반환하고, 진행 상황과 결과는
+`/jobs/<id>/events` (Server-Sent Events) 또는 `/jobs/<id>` (폴링)로 받습니다.
+같은 드론을 움직이는 작업은 같은 `key`로 제출하면 순서대로 하나씩 실행됩니다.
+LLM 호출처럼 드론과 상관없는 단계가 긴 작업은 key 없이 제출하고, 드론에 명령하는 부분만
+`jobs.hold(key)`로 감싸면 그동안에만 같은 key의 작업과 겹치지 않습니다.
+
+```python
+jobs = JobRunner(max_workers=2)
+jobs.register_routes(app)
+
+@app.route('/scan', methods=['POST'])
+@jobs.background(key='drone')
+def scan_surroundings():
+    report_progress("주변 스캔 중...")
+    ...
+    return jsonify({"status": "success", ...})
+
+@app.route('/agent_control', methods=['POST'])
+@jobs.background()
+def agent_control():
+    plan = ask_llm(request.json['command'])   # 드론 작업을 막지 않습니다
+    with jobs.hold('drone'):
+        result = execute(plan)
+    return jsonify({"status": "success", "message": result})
+```
+"""
+
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, copy_current_request_context, jsonify, request
+
+_current = threading.local()
+
+
+def report_progress(message):
+    """현재 스레드에서 실행 중인 작업에 진행 메시지를 남깁니다. 작업 밖에서는 출력만 합니다."""
+    print(message)
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        job.add_event({'type': 'progress', 'message': message})
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 너무 많을 때 발생"""
+    pass
+
+
+class Job:
+    """실행기에 제출된 작업 하나"""
+
+    def __init__(self, job_id, name, func, key):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.key = key
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.condition = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ('succeeded', 'failed')
+
+    def add_event(self, event):
+        with self.condition:
+            event.setdefault('time', time.time())
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def set_status(self, status):
+        self.status = status
+        self.add_event({'type': 'status', 'status': status})
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'progress': [event['message'] for event in self.events if event['type'] == 'progress'],
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobRunner:
+    """크기가 제한된 스레드 풀에서 작업을 실행하고, 같은 key의 작업은 순서대로 실행합니다.
+
+    Args:
+        max_workers: 동시에 실행할 작업 수
+        max_pending: 끝나지 않은 작업의 최대 수. 넘으면 JobQueueFull
+        keep_finished: 결과를 보관할 끝난 작업 수
+    """
+
+    SSE_KEEPALIVE = 15.0
+
+    def __init__(self, max_workers=2, max_pending=16, keep_finished=100):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.jobs = OrderedDict()
+        self.waiting = {}      # key -> 실행을 기다리는 작업들
+        self.busy_keys = set()
+        self.key_locks = {}    # key -> 그 key의 작업 또는 hold()만 잡는 잠금
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def submit(self, name, func, key=None):
+        """작업을 제출하고 Job을 바로 반환합니다.
+
+        Args:
+            name: 작업 이름
+            func: 인자 없이 호출되는 함수. 반환값이 작업 결과가 됩니다
+            key: 같은 key(예: 드론)의 작업은 하나씩 순서대로 실행됩니다
+        """
+        with self.lock:
+            pending = sum(1 for job in self.jobs.values() if not job.done)
+            if pending >= self.max_pending:
+                raise JobQueueFull("대기 중인 작업이 너무 많습니다 ({}개)".format(pending))
+
+            job = Job(str(next(self.ids)), name, func, key)
+            self.jobs[job.id] = job
+            self._forget_finished()
+
+            if key is not None and key in self.busy_keys:
+                self.waiting.setdefault(key, deque()).append(job)
+                return job
+            if key is not None:
+                self.busy_keys.add(key)
+
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+    def hold(self, key):
+        """key를 독점하는 잠금을 반환합니다. `with jobs.hold('drone'):` 안의 코드는 같은 key의 작업이나
+        다른 hold()와 겹치지 않습니다. key가 있는 작업은 실행되는 동안 이 잠금을 잡고 있으므로,
+        그 작업 안에서 다시 hold()해도 기다리지 않습니다.
+
+        작업 대기열에 들어가지 않고 잠금만 기다리므로, 스레드 풀이 모두 사용 중이어도 교착되지 않습니다.
+        """
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.RLock())
+
+    def _run(self, job):
+        _current.job = job
+        job.started_at = time.time()
+        job.set_status('running')
+        key_lock = self.hold(job.key) if job.key is not None else None
+        try:
+            if key_lock is not None:
+                key_lock.acquire()
+            job.result = job.func()
+            failed = isinstance(job.result, dict) and job.result.get('status') == 'error'
+            if failed:
+                job.error = job.result.get('message')
+            job.finished_at = time.time()
+            job.set_status('failed' if failed else 'succeeded')
+        except Exception as e:
+            job.error = str(e)
+            job.result = {"status": "error", "message": str(e)}
+            job.finished_at = time.time()
+            job.set_status('failed')
+        finally:
+            if key_lock is not None:
+                key_lock.release()
+            _current.job = None
+            self._start_next(job.key)
+
+    def _start_next(self, key):
+        if key is None:
+            return
+        with self.lock:
+            waiting = self.waiting.get(key)
+            next_job = waiting.popleft() if waiting else None
+            if next_job is None:
+                self.busy_keys.discard(key)
+                self.waiting.pop(key, None)
+                return
+        self.executor.submit(self._run, next_job)
+
+    def background(self, key=None):
+        """Flask 뷰 함수를 작업으로 실행하는 데코레이터.
+        요청은 202와 작업 ID를 바로 반환하고, 뷰가 반환한 JSON은 작업 결과가 됩니다.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                # 요청 본문을 미리 읽어 두어 작업 스레드에서도 request.json을 쓸 수 있게 합니다
+                request.get_json(silent=True)
+                run_view = copy_current_request_context(view)
+
+                def run():
+                    return _response_data(run_view(*args, **kwargs))
+
+                try:
+                    job = self.submit(view.__name__, run, key=key)
+                except JobQueueFull as e:
+                    return jsonify({"status": "error", "message": str(e)}), 429
+                return jsonify({
+                    "status": "accepted",
+                    "message": "작업이 시작되었습니다.",
+                    "job_id": job.id,
+                    "events_url": "/jobs/{}/events".format(job.id),
+                }), 202
+            return wrapper
+        return decorator
+
+    def register_routes(self, app):
+        """/jobs, /jobs/<id>, /jobs/<id>/events, /jobs/jobs.js 라우트를 등록합니다"""
+        app.add_url_rule('/jobs', 'jobs_list', self._list_view)
+        app.add_url_rule('/jobs/<job_id>', 'jobs_get', self._get_view)
+        app.add_url_rule('/jobs/<job_id>/events', 'jobs_events', self._events_view)
+        app.add_url_rule('/jobs/jobs.js', 'jobs_js', lambda: Response(JOBS_JS, mimetype='application/javascript'))
+
+    def _list_view(self):
+        with self.lock:
+            return jsonify([job.to_dict() for job in self.jobs.values()])
+
+    def _get_view(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+        return jsonify(job.to_dict())
+
+    def _events_view(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+
+        def stream():
+            index = 0
+            while True:
+                with job.condition:
+                    job.condition.wait_for(lambda: len(job.events) > index or job.done, self.SSE_KEEPALIVE)
+                    events = job.events[index:]
+                    index = len(job.events)
+                    done = job.done
+                for event in events:
+                    yield "data: {}\n\n".format(json.dumps(event, ensure_ascii=False))
+                if done:
+                    yield "event: done\ndata: {}\n\n".format(json.dumps(job.to_dict(), ensure_ascii=False))
+                    return
+                if not events:
+                    yield ": keepalive\n\n"
+
+        return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+def _response_data(response):
+    """뷰의 반환값(Response, (Response, status), dict)을 JSON dict로 변환"""
+    if isinstance(response, tuple):
+        response = response[0]
+    if isinstance(response, Response):
+        return response.get_json(silent=True)
+    return response
+
+
+JOBS_JS = r"""
+// 응답에 job_id가 있으면 작업이 끝날 때까지 진행 메시지를 보여주고 작업 결과를 반환합니다.
+async function followJob(data) {
+    if (!data || !data.job_id) return data;
+    const report = (typeof updateStatus === 'function') ? updateStatus : function () {};
+    return new Promise(function (resolve) {
+        const source = new EventSource('/jobs/' + data.job_id + '/events');
+        source.onmessage = function (event) {
+            const e = JSON.parse(event.data);
+            if (e.type === 'progress') report(e.message);
+        };
+        source.addEventListener('done', function (event) {
+            source.close();
+            const job = JSON.parse(event.data);
+            resolve(job.result || {status: 'error', message: job.error});
+        });
+        source.onerror = function () {
+            // SSE를 쓸 수 없으면 폴링으로 전환합니다
+            source.close();
+            const poll = setInterval(async function () {
+                const job = await (await fetch('/jobs/' + data.job_id)).json();
+                if (job.status === 'succeeded' || job.status === 'failed') {
+                    clearInterval(poll);
+                    resolve(job.result || {status: 'error', message: job.error});
+                }
+            }, 1000);
+        };
+    });
+}
+"""
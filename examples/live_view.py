@@ -0,0 +1,215 @@
+"""웹 UI 예제용 저지연 WebSocket 라이브 뷰.
+Low-latency WebSocket live view for the web UI examples.
+
+[VideoBroadcaster](video_broadcast.py)가 인코딩한 최신 JPEG을 WebSocket 바이너리 메시지로 보냅니다.
+클라이언트가 프레임을 화면에 그린 뒤 ack를 보내야 다음 프레임을 보내므로(흐름 제어),
+느린 클라이언트는 중간 프레임을 건너뛰고 브라우저 버퍼에 프레임이 쌓여 지연이 늘어나지 않습니다.
+클라이언트마다 지연 시간(인코딩부터 ack까지), 비트레이트, fps를 측정하여 `/live/stats`와
+각 클라이언트에 1초마다 보냅니다.
+
+필요 패키지: pip install flask-sock
+
+메시지 형식 / message format:
+    서버 -> 클라이언트 (binary): 4바이트 시퀀스 번호(big endian) + 8바이트 인코딩 시각(ms, float64) + JPEG
+    서버 -> 클라이언트 (text):   {"latency_ms": ..., "kbps": ..., "fps": ..., "skipped": ...}
+    클라이언트 -> 서버 (text):   {"ack": 시퀀스 번호}
+"""
+
+import json
+import struct
+import threading
+import time
+
+from flask import Response, jsonify, request
+from flask_sock import Sock
+
+HEADER = struct.Struct('!Id')
+
+LIVE_VIEW_JS = r"""
+(function () {
+    // MJPEG <img id="video">를 WebSocket 라이브 뷰로 교체합니다. 연결에 실패하면 MJPEG을 그대로 사용합니다.
+    const img = document.getElementById('video');
+    const stats = document.getElementById('video-stats');
+    if (!img || !window.WebSocket) return;
+    const mjpegSrc = img.getAttribute('src');
+
+    function connect() {
+        const ws = new WebSocket((location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + '/ws/video');
+        ws.binaryType = 'arraybuffer';
+        let lastUrl = null;
+
+        ws.onmessage = function (event) {
+            if (typeof event.data === 'string') {
+                const s = JSON.parse(event.data);
+                if (stats) {
+                    stats.textContent = '지연 ' + s.latency_ms + ' ms · ' + s.kbps + ' kbps · ' +
+                        s.fps + ' fps · 건너뜀 ' + s.skipped;
+                }
+                return;
+            }
+            const seq = new DataView(event.data).getUint32(0);
+            const url = URL.createObjectURL(new Blob([event.data.slice(12)], {type: 'image/jpeg'}));
+            img.onload = function () {
+                if (lastUrl) URL.revokeObjectURL(lastUrl);
+                lastUrl = url;
+                // 화면에 그린 뒤에만 다음 프레임을 요청합니다 (흐름 제어)
+                if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ack: seq}));
+            };
+            img.src = url;
+        };
+        ws.onclose = function () {
+            // 연결이 끊기면 다시 연결될 때까지 MJPEG(/video_feed)으로 되돌립니다
+            img.onload = null;
+            if (img.src.startsWith('blob:')) img.src = mjpegSrc;
+            if (lastUrl) URL.revokeObjectURL(lastUrl);
+            lastUrl = null;
+            if (stats) stats.textContent = '';
+            setTimeout(connect, 2000);
+        };
+    }
+    connect();
+})();
+"""
+
+
+class ClientStats:
+    """클라이언트 한 명의 지연/비트레이트 측정값"""
+
+    def __init__(self, address):
+        self.address = address
+        self.connected_at = time.time()
+        self.latency_ms = None
+        self.frames = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.window_start = time.monotonic()
+        self.window_frames = 0
+        self.window_bytes = 0
+        self.kbps = 0.0
+        self.fps = 0.0
+
+    def on_send(self, size, skipped):
+        self.frames += 1
+        self.skipped += skipped
+        self.bytes += size
+        self.window_frames += 1
+        self.window_bytes += size
+
+    def on_ack(self, encoded_at):
+        latency = (time.time() - encoded_at) * 1000
+        # 지수 이동 평균 / exponential moving average
+        self.latency_ms = latency if self.latency_ms is None else 0.8 * self.latency_ms + 0.2 * latency
+
+    def roll_window(self):
+        """1초 창의 비트레이트와 fps를 갱신"""
+        now = time.monotonic()
+        elapsed = now - self.window_start
+        if elapsed <= 0:
+            return
+        self.kbps = self.window_bytes * 8 / 1000 / elapsed
+        self.fps = self.window_frames / elapsed
+        self.window_start = now
+        self.window_frames = 0
+        self.window_bytes = 0
+
+    def as_dict(self):
+        return {
+            'address': self.address,
+            'latency_ms': None if self.latency_ms is None else round(self.latency_ms, 1),
+            'kbps': round(self.kbps, 1),
+            'fps': round(self.fps, 1),
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'connected_for': round(time.time() - self.connected_at, 1),
+        }
+
+
+class LiveView:
+    """Flask 앱에 WebSocket 라이브 뷰 라우트를 등록합니다.
+
+    등록되는 라우트:
+        /ws/video           WebSocket 프레임 스트림
+        /live/live_view.js  템플릿의 <img id="video">를 라이브 뷰로 바꾸는 스크립트
+        /live/stats         클라이언트별 지연/비트레이트 (JSON)
+
+    Args:
+        app: Flask 앱
+        broadcaster_source: 현재 VideoBroadcaster(또는 None)를 반환하는 함수
+        window: ack 없이 보낼 수 있는 프레임 수. 1이면 화면에 그린 뒤에만 다음 프레임을 보냅니다
+    """
+
+    ACK_TIMEOUT = 1.0
+    STALL_TIMEOUT = 5.0  # 이 시간 동안 ack가 없으면 보낸 프레임을 잃어버린 것으로 봅니다
+    STATS_INTERVAL = 1.0
+
+    def __init__(self, app, broadcaster_source, window=1):
+        self.broadcaster_source = broadcaster_source
+        self.window = window
+        self.clients = {}
+        self.lock = threading.Lock()
+
+        sock = Sock(app)
+        sock.route('/ws/video')(self._serve)
+        app.add_url_rule('/live/live_view.js', 'live_view_js',
+                         lambda: Response(LIVE_VIEW_JS, mimetype='application/javascript'))
+        app.add_url_rule('/live/stats', 'live_view_stats', self._stats)
+
+    def _stats(self):
+        with self.lock:
+            return jsonify([client.as_dict() for client in self.clients.values()])
+
+    def _serve(self, ws):
+        client = ClientStats(request.remote_addr)
+        with self.lock:
+            self.clients[id(ws)] = client
+
+        in_flight = {}  # 시퀀스 번호 -> 인코딩 시각
+        sequence = 0
+        last_sent = time.monotonic()
+        next_stats = time.monotonic() + self.STATS_INTERVAL
+        try:
+            while True:
+                # 창이 가득 차면 ack를 기다립니다. 그동안 새 프레임은 보내지 않고 건너뜁니다.
+                timeout = self.ACK_TIMEOUT if len(in_flight) >= self.window else 0
+                message = ws.receive(timeout=timeout)
+                while message is not None:
+                    self._handle_ack(message, in_flight, client)
+                    message = ws.receive(timeout=0)
+                if len(in_flight) >= self.window:
+                    if time.monotonic() - last_sent > self.STALL_TIMEOUT:
+                        in_flight.clear()
+                    continue
+
+                if time.monotonic() >= next_stats:
+                    client.roll_window()
+                    ws.send(json.dumps(client.as_dict()))
+                    next_stats = time.monotonic() + self.STATS_INTERVAL
+
+                broadcaster = self.broadcaster_source()
+                if broadcaster is None:
+                    time.sleep(0.5)
+                    continue
+
+                new_sequence, jpeg = broadcaster.wait_for_frame(sequence, timeout=0.5)
+                if jpeg is None:
+                    continue
+
+                encoded_at = broadcaster.encoded_at
+                skipped = new_sequence - sequence - 1 if sequence else 0
+                ws.send(HEADER.pack(new_sequence, encoded_at * 1000) + jpeg)
+                client.on_send(len(jpeg), max(skipped, 0))
+                in_flight[new_sequence] = encoded_at
+                last_sent = time.monotonic()
+                sequence = new_sequence
+        finally:
+            with self.lock:
+                self.clients.pop(id(ws), None)
+
+    def _handle_ack(self, message, in_flight, client):
+        try:
+            ack = json.loads(message)['ack']
+        except (ValueError, KeyError, TypeError):
+            return
+        encoded_at = in_flight.pop(ack, None)
+        if encoded_at is not None:
+            client.on_ack(encoded_at)
@@ -7,7 +7,11 @@ swarm = TelloSwarm.fromIps([
 ])
 
 swarm.connect()
-swarm.takeoff()
+
+# send the same command to all tellos in one loop for minimal launch skew
+# 같은 명령을 한 번에 보내 드론 간 출발 시차를 최소화
+result = swarm.broadcast("takeoff")
+print("takeoff ack latency per drone:", result.durations)
 
 # run in parallel on all tellos
 # Execute simultaneously on all Tellos
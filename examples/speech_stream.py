@@ -0,0 +1,161 @@
+"""LLM 응답을 문장 단위로 바로 읽어 주는 스트리밍 TTS.
+Streaming TTS that speaks LLM output sentence by sentence.
+
+LLM 응답이 모두 끝난 뒤 전체 문장을 한 번에 합성하고 재생하면, 첫 마디를 듣기까지 분석 시간 + 합성 시간이
+모두 걸립니다. `StreamingSpeaker`는 토큰 스트림을 받으면서 문장이 끝날 때마다 합성 스레드에 넘기고,
+첫 문장의 음성이 준비되는 즉시 재생을 시작합니다. 다음 문장은 앞 문장이 재생되는 동안 합성합니다.
+새 명령이 들어오면 `cancel()`로 남은 문장과 재생 중인 음성을 모두 멈춥니다.
+
+```python
+speaker = StreamingSpeaker(lang='ko')
+text = speaker.speak_stream(chunk.text for chunk in model.generate_content(parts, stream=True))
+speaker.say("이륙합니다.")   # 말하던 내용을 멈추고 새로 말합니다
+speaker.wait()               # 모두 재생될 때까지 대기
+```
+"""
+
+import io
+import queue
+import re
+import threading
+import time
+
+import pygame
+from gtts import gTTS
+
+# 문장 끝: 마침표/물음표/느낌표(와 닫는 따옴표, 괄호) 뒤에 공백이 오거나 줄바꿈
+SENTENCE_END = re.compile(r'[.!?…。]+["\')\]]*\s+|\n+')
+# 문장이 끝나지 않고 이보다 길어지면 쉼표나 공백에서 끊습니다
+MAX_SENTENCE_CHARS = 150
+
+
+def split_sentences(chunks, max_chars=MAX_SENTENCE_CHARS):
+    """텍스트 조각 스트림을 완성된 문장 스트림으로 바꿉니다"""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            match = SENTENCE_END.search(buffer)
+            if match:
+                sentence, buffer = buffer[:match.end()], buffer[match.end():]
+            elif len(buffer) > max_chars:
+                cut = max(buffer.rfind(', ', 0, max_chars), buffer.rfind(' ', 0, max_chars))
+                if cut <= 0:
+                    cut = max_chars
+                sentence, buffer = buffer[:cut + 1], buffer[cut + 1:]
+            else:
+                break
+            if sentence.strip():
+                yield sentence.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class StreamingSpeaker:
+    """문장 단위로 합성하고 재생하는 TTS. 합성과 재생은 각각 백그라운드 스레드에서 수행합니다.
+    pygame.mixer는 미리 초기화되어 있어야 합니다.
+
+    Args:
+        lang: gTTS 언어 코드
+    """
+
+    def __init__(self, lang='ko'):
+        self.lang = lang
+        self.generation = 0  # cancel()할 때마다 증가. 이전 세대의 문장과 음성은 버립니다
+        self.pending = 0     # 합성 또는 재생을 기다리는 문장 수
+        self.condition = threading.Condition()
+        self.started_at = None
+        self.first_audio_latency = None
+
+        self.sentences = queue.Queue()
+        self.audio = queue.Queue()
+        threading.Thread(target=self._synthesize_loop, daemon=True).start()
+        threading.Thread(target=self._playback_loop, daemon=True).start()
+
+    def cancel(self):
+        """대기 중인 문장과 재생 중인 음성을 모두 취소합니다"""
+        with self.condition:
+            self.generation += 1
+            self.pending = 0
+            self.condition.notify_all()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+
+    def say(self, text):
+        """말하던 내용을 취소하고 text를 문장 단위로 읽습니다"""
+        return self.speak_stream([text])
+
+    def speak_stream(self, chunks):
+        """말하던 내용을 취소하고, 텍스트 조각 스트림을 받는 대로 문장 단위로 읽습니다.
+        스트림이 끝나면 (재생이 끝나기 전에) 전체 텍스트를 반환합니다.
+        읽는 도중 cancel()되면 나머지 텍스트는 읽지 않고 모으기만 합니다.
+        """
+        self.cancel()
+        with self.condition:
+            generation = self.generation
+            self.started_at = time.monotonic()
+            self.first_audio_latency = None
+
+        text = []
+
+        def collect():
+            for chunk in chunks:
+                if chunk:
+                    text.append(chunk)
+                    yield chunk
+
+        for sentence in split_sentences(collect()):
+            with self.condition:
+                if generation != self.generation:
+                    continue
+                self.pending += 1
+            self.sentences.put((generation, sentence))
+        return ''.join(text)
+
+    def wait(self, timeout=None):
+        """대기 중인 문장이 모두 재생될 때까지 기다립니다. 끝났으면 True"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending == 0, timeout)
+
+    def _current(self, generation):
+        with self.condition:
+            return generation == self.generation
+
+    def _done(self, generation):
+        with self.condition:
+            if generation == self.generation:
+                self.pending = max(0, self.pending - 1)
+                self.condition.notify_all()
+
+    def _synthesize_loop(self):
+        while True:
+            generation, sentence = self.sentences.get()
+            if not self._current(generation):
+                continue
+            try:
+                # 임시 파일 없이 메모리에서 MP3를 만듭니다
+                data = io.BytesIO()
+                gTTS(text=sentence, lang=self.lang).write_to_fp(data)
+                self.audio.put((generation, data.getvalue()))
+            except Exception as e:
+                print(f"TTS 오류: {str(e)}")
+                self._done(generation)
+
+    def _playback_loop(self):
+        while True:
+            generation, data = self.audio.get()
+            if not self._current(generation):
+                continue
+            try:
+                with self.condition:
+                    if self.first_audio_latency is None and self.started_at is not None:
+                        self.first_audio_latency = time.monotonic() - self.started_at
+                        print(f"첫 음성까지 {self.first_audio_latency:.2f}초")
+                pygame.mixer.music.load(io.BytesIO(data), 'mp3')
+                pygame.mixer.music.play()
+                while pygame.mixer.music.get_busy() and self._current(generation):
+                    time.sleep(0.02)
+            except Exception as e:
+                print(f"TTS 재생 오류: {str(e)}")
+            finally:
+                self._done(generation)
@@ -0,0 +1,196 @@
+"""웹 UI 예제용 실시간 텔레메트리 발행기 (Server-Sent Events).
+Live telemetry publisher for the web UI examples (Server-Sent Events).
+
+샘플링 스레드 하나가 드론마다 최신 상태 패킷을 읽어(이미 수신된 패킷을 읽을 뿐 드론에 명령을 보내지 않습니다)
+필드를 반올림하고, 값이 바뀌었을 때만 새 스냅샷을 만듭니다. 접속한 대시보드는 각자 원하는 주기로
+이전에 받은 값과 달라진 필드만 받습니다. 따라서 드론 쪽 I/O는 접속자 수와 관계없이 일정합니다.
+
+등록되는 라우트:
+    /telemetry                  현재 스냅샷 (JSON)
+    /telemetry/stream?rate=5    변경분 스트림 (SSE). rate는 초당 최대 메시지 수
+    /telemetry/telemetry.js     <div id="telemetry">에 드론별 상태를 표시하는 스크립트
+
+메시지 형식 / message format:
+    {"드론 이름": {"bat": 87, "h": 120, ...}, "사라진 드론": null}
+"""
+
+import json
+import threading
+import time
+
+from flask import Response, jsonify, request
+
+# 표시할 상태 필드와 반올림 자릿수. 자잘한 떨림은 변경으로 보지 않습니다
+FIELDS = {
+    'bat': 0, 'h': 0, 'tof': 0, 'baro': 1,
+    'templ': 0, 'temph': 0,
+    'pitch': 0, 'roll': 0, 'yaw': 0,
+    'vgx': 0, 'vgy': 0, 'vgz': 0,
+    'time': 0,
+}
+
+
+def _quantize(value, digits):
+    if not isinstance(value, (int, float)):
+        return value
+    return round(value) if digits == 0 else round(value, digits)
+
+
+def delta(old, new):
+    """두 스냅샷의 차이. 바뀐 필드만 담고, 사라진 드론은 None으로 표시합니다."""
+    changes = {}
+    for name, fields in new.items():
+        previous = old.get(name, {})
+        changed = {key: value for key, value in fields.items() if previous.get(key) != value or key not in previous}
+        if changed:
+            changes[name] = changed
+    for name in old:
+        if name not in new:
+            changes[name] = None
+    return changes
+
+
+class TelemetryPublisher:
+    """Flask 앱에 텔레메트리 라우트를 등록하고, 접속자가 있는 동안 상태를 샘플링합니다.
+
+    Args:
+        app: Flask 앱
+        drones_source: 현재 드론들을 {이름: Tello}로 반환하는 함수
+        sample_rate: 상태를 샘플링하는 주기 (Hz). 클라이언트 rate의 상한이기도 합니다
+        fields: {상태 필드: 반올림 자릿수}
+    """
+
+    DEFAULT_RATE = 5.0
+    MIN_RATE = 0.2
+    STALE_AFTER = 1.0  # 이보다 오래된 상태는 'stale'로 표시합니다 (초)
+    KEEPALIVE = 15.0
+
+    def __init__(self, app, drones_source, sample_rate=10.0, fields=None):
+        self.drones_source = drones_source
+        self.sample_rate = sample_rate
+        self.fields = FIELDS if fields is None else fields
+
+        self.condition = threading.Condition()
+        self.snapshot = {}
+        self.sequence = 0
+        self.clients = 0
+        self.thread = None
+
+        app.add_url_rule('/telemetry', 'telemetry', self._snapshot_view)
+        app.add_url_rule('/telemetry/stream', 'telemetry_stream', self._stream_view)
+        app.add_url_rule('/telemetry/telemetry.js', 'telemetry_js',
+                         lambda: Response(TELEMETRY_JS, mimetype='application/javascript'))
+
+    def sample(self):
+        """모든 드론의 최신 상태를 한 번 읽어 스냅샷을 갱신합니다. 바뀐 것이 있으면 True"""
+        snapshot = {}
+        for name, tello in (self.drones_source() or {}).items():
+            state = tello.get_current_state()
+            fields = {key: _quantize(state[key], digits) for key, digits in self.fields.items() if key in state}
+            fields['stale'] = not tello.is_state_fresh(self.STALE_AFTER)
+            snapshot[name] = fields
+
+        with self.condition:
+            if snapshot == self.snapshot:
+                return False
+            self.snapshot = snapshot
+            self.sequence += 1
+            self.condition.notify_all()
+            return True
+
+    def _ensure_sampling(self):
+        with self.condition:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self.thread.start()
+
+    def _sample_loop(self):
+        interval = 1.0 / self.sample_rate
+        while True:
+            started = time.monotonic()
+            # 보는 사람이 없으면 샘플링하지 않습니다
+            if self.clients:
+                try:
+                    self.sample()
+                except Exception as e:
+                    print(f"텔레메트리 샘플링 오류: {str(e)}")
+            remaining = interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _snapshot_view(self):
+        self._ensure_sampling()
+        if not self.clients:
+            self.sample()
+        with self.condition:
+            return jsonify(self.snapshot)
+
+    def _stream_view(self):
+        rate = request.args.get('rate', self.DEFAULT_RATE, type=float)
+        interval = 1.0 / max(self.MIN_RATE, min(rate, self.sample_rate))
+        self._ensure_sampling()
+        return Response(self._stream(interval), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    def _stream(self, interval):
+        with self.condition:
+            self.clients += 1
+        try:
+            sent = {}
+            sequence = -1
+            while True:
+                started = time.monotonic()
+                with self.condition:
+                    self.condition.wait_for(lambda: self.sequence != sequence, self.KEEPALIVE)
+                    sequence = self.sequence
+                    snapshot = self.snapshot
+
+                changes = delta(sent, snapshot)
+                if changes:
+                    yield "data: {}\n\n".format(json.dumps(changes))
+                    sent = snapshot
+                else:
+                    yield ": keepalive\n\n"
+
+                # 클라이언트 주기보다 자주 보내지 않습니다. 그 사이의 변경은 다음 메시지에 합쳐집니다
+                remaining = interval - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+        finally:
+            with self.condition:
+                self.clients -= 1
+
+
+TELEMETRY_JS = r"""
+(function () {
+    // /telemetry/stream의 변경분을 합쳐 <div id="telemetry">에 드론별 상태를 표시합니다.
+    const panel = document.getElementById('telemetry');
+    if (!panel || !window.EventSource) return;
+    const rate = panel.dataset.rate || 5;
+    const drones = {};
+
+    function render() {
+        panel.innerHTML = '';
+        Object.keys(drones).sort().forEach(function (name) {
+            const s = drones[name];
+            const line = document.createElement('div');
+            line.textContent = name + (s.stale ? ' (상태 수신 끊김)' : '') +
+                ' · 배터리 ' + s.bat + '% · 높이 ' + s.h + ' cm · ToF ' + s.tof + ' cm · 온도 ' +
+                s.templ + '~' + s.temph + '°C · 자세 ' + s.pitch + '/' + s.roll + '/' + s.yaw +
+                ' · 속도 ' + s.vgx + '/' + s.vgy + '/' + s.vgz + ' · 비행 ' + s.time + ' s';
+            line.style.color = s.stale ? '#a94442' : '';
+            panel.appendChild(line);
+        });
+    }
+
+    const source = new EventSource('/telemetry/stream?rate=' + rate);
+    source.onmessage = function (event) {
+        const changes = JSON.parse(event.data);
+        Object.keys(changes).forEach(function (name) {
+            if (changes[name] === null) delete drones[name];
+            else drones[name] = Object.assign(drones[name] || {}, changes[name]);
+        });
+        render();
+    };
+})();
+"""
@@ -11,11 +11,11 @@ from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QImage, QPixmap
 import sys
-import base64
 import threading
-from gtts import gTTS
 import pygame
-import tempfile
+from intent_parser import IntentParser
+from image_pipeline import SceneAnalyzer, data_url
+from speech_stream import StreamingSpeaker
 
 # .env 파일 로드
 load_dotenv()
@@ -68,8 +68,12 @@ class TelloScanner:
             }
         }
         
-        # TTS 초기화
+        # 비전 LLM에는 줄인 이미지를 메모리에서 바로 보내고, 장면이 그대로면 이전 분석을 재사용합니다
+        self.vision = SceneAnalyzer(self._describe_image)
+        
+        # TTS 초기화. 분석 결과는 문장 단위로 합성하여 첫 문장부터 바로 재생합니다
         pygame.mixer.init()
+        self.speaker = StreamingSpeaker(lang='ko')
 
     def connect(self):
         """드론 연결 및 상태 확인"""
@@ -131,12 +135,13 @@ class TelloScanner:
         print(f"사진 저장됨: {filename}")
         return filename, frame
 
-    def analyze_image(self, image_path: str) -> str:
-        """GPT Vision을 사용하여 이미지 분석"""
-        with open(image_path, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-            
-        response = client.chat.completions.create(
+    def analyze_image(self, frame) -> str:
+        """GPT Vision을 사용하여 이미지 분석. 장면이 바뀌지 않았으면 이전 분석을 재사용합니다"""
+        return self.vision.analyze(frame)
+
+    def _describe_image(self, image):
+        """분석 결과를 받는 대로 조각 단위로 내보냅니다"""
+        stream = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -149,53 +154,38 @@ class TelloScanner:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
+                                "url": data_url(image)
                             }
                         }
                     ]
                 }
             ],
-            max_tokens=500
+            max_tokens=500,
+            stream=True
         )
         
-        return response.choices[0].message.content
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
     def speak(self, text: str):
-        """텍스트를 음성으로 변환하여 재생"""
-        try:
-            # gTTS를 사용하여 음성 파일 생성
-            tts = gTTS(text=text, lang='ko')
-            
-            # 임시 파일로 저장
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_filename = fp.name
-                tts.save(temp_filename)
-            
-            # pygame으로 재생
-            pygame.mixer.music.load(temp_filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            # 임시 파일 삭제
-            os.unlink(temp_filename)
-            
-        except Exception as e:
-            print(f"TTS 오류: {str(e)}")
+        """텍스트를 음성으로 변환하여 재생 (마이크가 음성을 듣지 않도록 끝날 때까지 대기)"""
+        self.speaker.say(text)
+        self.speaker.wait()
 
     def scan_current_view(self):
         """현재 보이는 장면을 촬영하고 분석"""
         try:
             # 사진 촬영
-            filename, _ = self.take_photo()
+            filename, frame = self.take_photo()
             
-            # 이미지 분석
+            # 이미지 분석. 결과를 받는 대로 문장 단위로 읽어 줍니다
             print("이미지 분석 중...")
-            analysis = self.analyze_image(filename)
+            analysis = self.speaker.speak_stream(self.vision.analyze_stream(frame))
             print(f"분석 결과: {analysis}")
             
-            # TTS로 결과 읽기
-            self.speak(analysis)
+            # 마이크가 음성을 듣지 않도록 다 읽을 때까지 대기
+            self.speaker.wait()
             
         except Exception as e:
             print(f"오류 발생: {str(e)}")
@@ -203,8 +193,16 @@ class TelloScanner:
             print(error_msg)
             self.speak(error_msg)
 
+# "장면 분석해줘", "사진 찍고 설명해줘" 같은 명령은 LLM 없이 바로 해석합니다
+intent_parser = IntentParser(keywords={"scan": ["분석", "설명", "사진", "뭐가 보이", "scan", "describe"]},
+                             commands={"scan"})
+
 def process_voice_command(audio_text: str) -> dict:
-    """음성 명령을 Function calling 형식으로 변환"""
+    """음성 명령을 Function calling 형식으로 변환. 간단한 명령은 LLM을 거치지 않습니다"""
+    return intent_parser.resolve(audio_text, interpret_with_llm)
+
+def interpret_with_llm(audio_text: str) -> dict:
+    """GPT Function calling으로 음성 명령을 해석"""
     system_prompt = """
     당신은 드론 제어 시스템입니다. 사용자의 자연어 명령을 드론 제어 명령으로 변환합니다.
     
@@ -275,6 +273,8 @@ def main():
                     
                     # 종료 명령 확인
                     if "종료" in text:
+                        print(f"빠른 해석 통계: {intent_parser.stats()}")
+                        print(f"이미지 분석 통계: {scanner.vision.stats()}")
                         print("프로그램을 종료합니다.")
                         break
                     
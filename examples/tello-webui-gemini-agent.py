@@ -1,9 +1,16 @@
 from flask import Flask, render_template, Response, jsonify, request, send_from_directory
 import cv2
-import threading
-from queue import Queue
 import os
-import json
+from video_broadcast import VideoBroadcaster
+from live_view import LiveView
+from job_runner import JobRunner, report_progress
+from telemetry import TelemetryPublisher
+from speech_stream import StreamingSpeaker
+from image_pipeline import SceneAnalyzer
+from intent_parser import IntentParser, describe
+from intent_cache import IntentCache
+from agent_pool import AgentPool, current_operator
+from tool_dispatcher import ToolDispatcher, UnsafeCommandError, format_call, is_query
 from djitellopy import Tello
 import time
 from datetime import datetime
@@ -11,7 +18,6 @@ import numpy as np
 from openai import OpenAI
 from dotenv import load_dotenv
 import base64
-from gtts import gTTS
 import pygame
 import tempfile
 from smolagents import CodeAgent, ToolCallingAgent, LiteLLMModel, tool, TOOL_CALLING_SYSTEM_PROMPT
@@ -47,16 +53,26 @@ model = genai.GenerativeModel(
 
 app = Flask(__name__)
 
+# 웹 UI 비디오 설정 (JPEG 품질, 해상도)
+VIDEO_QUALITY = 80
+VIDEO_SIZE = (640, 480)
+
+# 비전 LLM 업로드 설정 (긴 변 픽셀 수, 최대 바이트 수)
+VISION_MAX_EDGE = 768
+VISION_MAX_BYTES = 120 * 1024
+
 class TelloController:
     def __init__(self):
         self.tello = Tello()
         self.frame_reader = None
         self.is_streaming = False
-        self.frame_queue = Queue(maxsize=10)
-        self.stream_thread = None
+        # 프레임을 한 번만 인코딩하여 모든 클라이언트에 나눠줍니다
+        self.broadcaster = VideoBroadcaster(self._latest_frame, quality=VIDEO_QUALITY, size=VIDEO_SIZE)
+        # 비전 LLM에는 줄인 이미지를 메모리에서 바로 보내고, 장면이 그대로면 이전 분석을 재사용합니다
+        self.vision = SceneAnalyzer(self._describe_image, max_edge=VISION_MAX_EDGE, max_bytes=VISION_MAX_BYTES)
         self.is_flying = False
         pygame.mixer.init()
-        self.chat_session = model.start_chat(history=[])
+        self.speaker = StreamingSpeaker(lang='ko')
 
     def connect(self):
         """드론 연결 및 상태 확인"""
@@ -84,18 +100,11 @@ class TelloController:
         """비디오 스트리밍 중지"""
         print("비디오 스트림 정지 중...")
         self.is_streaming = False
-        if self.stream_thread:
-            self.stream_thread.join(timeout=2)
+        self.broadcaster.stop()
         try:
             self.tello.streamoff()
         except:
             pass
-        # 큐 비우기
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except:
-                pass
 
     def start_video_stream(self):
         """비디오 스트리밍 시작"""
@@ -104,32 +113,14 @@ class TelloController:
             time.sleep(2)  # 스트림 초기화 대기
             self.frame_reader = self.tello.get_frame_read()
             self.is_streaming = True
-            
-            self.stream_thread = threading.Thread(target=self._stream_loop)
-            self.stream_thread.daemon = True
-            self.stream_thread.start()
+            self.broadcaster.start()
             print("비디오 스트리밍 시작됨")
 
-    def _stream_loop(self):
-        """비디오 스트리밍 루프"""
-        while self.is_streaming:
-            if self.frame_reader:
-                frame = self.frame_reader.frame
-                if frame is not None:
-                    frame = cv2.resize(frame, (640, 480))
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                    if self.frame_queue.full():
-                        try:
-                            self.frame_queue.get_nowait()
-                        except:
-                            pass
-                    
-                    try:
-                        self.frame_queue.put_nowait(frame.copy())
-                    except:
-                        pass
-            time.sleep(0.03)
+    def _latest_frame(self):
+        """브로드캐스터가 인코딩할 최신 RGB 프레임"""
+        if self.frame_reader:
+            return self.frame_reader.frame
+        return None
 
     def take_photo(self):
         """사진 촬영"""
@@ -147,24 +138,26 @@ class TelloController:
     def create_panorama(self):
         """파노라마 촬영"""
         try:
-            print("파노라마 촬영 시작...")
+            report_progress("파노라마 촬영 시작...")
             images = []
             
-            # 360도 회전하면서 사진 촬영 (90도씩 4장)
-            for i in range(4):
-                print(f"사진 {i+1}/4 촬영 중...")
-                frame = self.frame_reader.frame
-                if frame is not None:
-                    images.append(frame.copy())
-                else:
-                    raise Exception("프레임을 가져올 수 없습니다")
-                
-                if i < 3:  # 마지막 사진 후에는 회전하지 않음
-                    print(f"{90}도 회전 중...")
-                    self.tello.rotate_clockwise(90)
-                    time.sleep(2)  # 회전 후 안정화 대기
+            # 360도 회전하면서 사진 촬영 (90도씩 4장). 회전하는 동안에만 드론을 독점하고,
+            # 스티칭과 분석은 다른 드론 명령을 막지 않습니다
+            with jobs.hold('drone'):
+                for i in range(4):
+                    report_progress(f"사진 {i+1}/4 촬영 중...")
+                    frame = self.frame_reader.frame
+                    if frame is not None:
+                        images.append(frame.copy())
+                    else:
+                        raise Exception("프레임을 가져올 수 없습니다")
+
+                    if i < 3:  # 마지막 사진 후에는 회전하지 않음
+                        report_progress(f"{90}도 회전 중...")
+                        self.tello.rotate_clockwise(90)
+                        time.sleep(2)  # 회전 후 안정화 대기
             
-            print("파노라마 이미지 생성 중...")
+            report_progress("파노라마 이미지 생성 중...")
             stitcher = cv2.Stitcher.create()
             status, panorama = stitcher.stitch(images)
             
@@ -176,7 +169,7 @@ class TelloController:
                 filename = f'panoramas/tello_panorama_{timestamp}.jpg'
                 cv2.imwrite(filename, panorama)
                 print(f"파노라마 저장됨: {filename}")
-                return filename
+                return filename, panorama
             else:
                 raise Exception(f"파노라마 스티칭 실패 (status: {status})")
                 
@@ -184,31 +177,24 @@ class TelloController:
             print(f"파노라마 촬영 오류: {str(e)}")
             raise
 
-    def analyze_image(self, image_path: str) -> str:
-        """Gemini로 이미지 분석"""
+    def analyze_image(self, frame) -> str:
+        """Gemini로 이미지 분석. 장면이 바뀌지 않았으면 이전 분석을 재사용합니다"""
         try:
-            with open(image_path, "rb") as image_file:
-                image_data = image_file.read()
-            
-            image_parts = [
-                {
-                    "mime_type": "image/jpeg",
-                    "data": image_data
-                }
-            ]
-            
-            prompt_parts = [
-                "이 이미지에서 보이는 것을 자세히 설명해주세요.",
-                image_parts[0]
-            ]
-            
-            response = self.chat_session.send_message(prompt_parts)
-            
-            return response.text
+            return self.vision.analyze(frame)
         except Exception as e:
             print(f"이미지 분석 오류: {str(e)}")
             return f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
 
+    def _describe_image(self, image):
+        # 대화 기록 없이 보내므로 이전 이미지를 매번 다시 업로드하지 않습니다.
+        # 결과는 받는 대로 조각 단위로 내보냅니다
+        response = model.generate_content([
+            "이 이미지에서 보이는 것을 자세히 설명해주세요.",
+            {"mime_type": image.mime_type, "data": image.data}
+        ], stream=True)
+        for chunk in response:
+            yield chunk.text
+
 
     # def analyze_image(self, image_path: str) -> str:
     #     """GPT Vision으로 이미지 분석"""
@@ -241,36 +227,24 @@ class TelloController:
     #         return f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
 
     def speak(self, text: str):
-        """텍스트를 음성으로 변환하여 재생"""
-        try:
-            tts = gTTS(text=text, lang='ko')
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_filename = fp.name
-                tts.save(temp_filename)
-            
-            pygame.mixer.music.load(temp_filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            os.unlink(temp_filename)
-        except Exception as e:
-            print(f"TTS 오류: {str(e)}")
+        """텍스트를 문장 단위로 음성 변환하여 재생. 재생이 끝나기를 기다리지 않습니다"""
+        self.speaker.say(text)
 
     def scan_surroundings(self):
         """현재 보이는 장면을 촬영하고 분석"""
         try:
-            print("사진 촬영 중...")
-            filename, _ = self.take_photo()
-            
-            print("이미지 분석 중...")
-            analysis = self.analyze_image(filename)
-            print(f"분석 결과: {analysis}")
+            report_progress("사진 촬영 중...")
+            filename, frame = self.take_photo()
             
+            report_progress("이미지 분석 중...")
             try:
-                self.speak(analysis)
+                # 분석 결과를 받는 대로 문장 단위로 읽어 줍니다 (첫 문장이 끝나면 바로 재생)
+                analysis = self.speaker.speak_stream(self.vision.analyze_stream(frame))
             except Exception as e:
-                print(f"TTS 오류: {str(e)}")
+                print(f"이미지 분석 오류: {str(e)}")
+                analysis = f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
+                self.speak(analysis)
+            print(f"분석 결과: {analysis}")
             
             return filename, analysis
         except Exception as e:
@@ -342,109 +316,126 @@ class TelloController:
             raise Exception(f"알 수 없는 회전 방향입니다: {direction}")
 
 # 드론 제어를 위한 도구 함수들
+def chat_history(history):
+    """에이전트 풀의 최근 (명령, 결과) 목록을 Gemini 대화 기록 형식으로 변환"""
+    contents = []
+    for command, result in history:
+        contents.append({"role": "user", "parts": [command]})
+        contents.append({"role": "model", "parts": [str(result)]})
+    return contents
+
+DRONE_AGENT_PROMPT = """당신은 Tello 드론을 제어하는 전문가입니다.
+주어진 자연어 명령을 이해하고, djitellopy 라이브러리를 사용하여 드론을 제어하는 파이썬 코드를 생성해야 합니다.
+생성된 코드는 반드시 실행 가능한 형태여야 합니다.
+다음과 같은 명령어를 이해하고 실행할 수 있습니다:
+1. 이륙/착륙 명령
+2. 상하좌우/전진/후진 이동 (거리 단위: cm)
+3. 시계/반시계 방향 회전 (각도 단위: 도)
+
+예시:
+- "이륙해줘" -> `tello.takeoff()`
+- "착륙해줘" -> `tello.land()`
+- "3미터 앞으로 가줘" -> `tello.move_forward(300)`
+- "90도 시계방향으로 회전해줘" -> `tello.rotate_clockwise(90)`
+
+생성된 코드는 반드시 다음과 같은 형식으로 반환해야 합니다:
+```
+tello.takeoff()
+```
+또는
+```
+tello.land()
+```
+또는
+```
+tello.move_forward(300)
+```
+또는
+```
+tello.rotate_clockwise(90)
+```
+등등"""
+
 class DroneAgent:
-    def __init__(self, controller):
+    def __init__(self, controller, cache=None):
         self.controller = controller
-        self.chat_session = model.start_chat(history=[])
-        self.chat_session.send_message("""
-                당신은 Tello 드론을 제어하는 전문가입니다.
-                주어진 자연어 명령을 이해하고, djitellopy 라이브러리를 사용하여 드론을 제어하는 파이썬 코드를 생성해야 합니다.
-                생성된 코드는 반드시 실행 가능한 형태여야 합니다.
-                다음과 같은 명령어를 이해하고 실행할 수 있습니다:
-                1. 이륙/착륙 명령
-                2. 상하좌우/전진/후진 이동 (거리 단위: cm)
-                3. 시계/반시계 방향 회전 (각도 단위: 도)
-
-                예시:
-                - "이륙해줘" -> `tello.takeoff()`
-                - "착륙해줘" -> `tello.land()`
-                - "3미터 앞으로 가줘" -> `tello.move_forward(300)`
-                - "90도 시계방향으로 회전해줘" -> `tello.rotate_clockwise(90)`
-
-                생성된 코드는 반드시 다음과 같은 형식으로 반환해야 합니다:
-                ```
-                tello.takeoff()
-                ```
-                또는
-                ```
-                tello.land()
-                ```
-                또는
-                ```
-                tello.move_forward(300)
-                ```
-                또는
-                ```
-                tello.rotate_clockwise(90)
-                ```
-                등등""")
+        # 한 번 해석한 문장은 생성된 코드를 저장해 두고 Gemini 없이 재사용합니다
+        self.cache = cache
+        # 시스템 프롬프트는 모델 설정으로 한 번만 전달합니다 (매번 LLM 왕복을 하지 않습니다)
+        self.model = genai.GenerativeModel(
+            model_name="gemini-2.0-flash-exp",
+            generation_config=generation_config,
+            system_instruction=DRONE_AGENT_PROMPT,
+        )
 
     
-    def process_command(self, command: str) -> str:
+    def process_command(self, command: str, history=()) -> str:
         try:
-            # 명령어 생성 요청
-            response = self.chat_session.send_message(command)
-            generated_code = response.text.strip()
-            
-            # 불필요한 텍스트나 마크다운 제거
-            command_line = generated_code.replace('```python', '').replace('```', '').strip()
-            
-            # tello. 으로 시작하는지 확인
-            if not command_line.startswith('tello.'):
-                return "유효한 드론 명령이 아닙니다."
-            
-            # 명령어와 인자 분리
-            func_name = command_line.split('(')[0].replace('tello.', '')
-            args_str = command_line.split('(')[1].rstrip(')')
-            
-            # 인자가 있는 경우 처리
-            if args_str:
-                args = [int(arg.strip()) for arg in args_str.split(',') if arg.strip()]
+            cached = self.cache.get(command) if self.cache else None
+            if cached is not None:
+                command_line = cached
             else:
-                args = []
+                # 명령어 생성 요청. 세션의 최근 대화만 기록으로 넘깁니다
+                chat_session = self.model.start_chat(history=chat_history(history))
+                response = chat_session.send_message(command)
+                generated_code = response.text.strip()
+                
+                # 불필요한 텍스트나 마크다운 제거
+                command_line = generated_code.replace('```python', '').replace('```', '').strip()
             
-            # 명령 실행
-            print(f"Executing command: {func_name} with args: {args}")
-            command_func = getattr(self.controller.tello, func_name)
-            command_func(*args)
+            # 명령 표로 검증합니다. 여러 줄이면 모두 검증한 뒤 한 번에 실행합니다
+            dispatcher = ToolDispatcher(self.controller.tello)
+            try:
+                calls = dispatcher.plan(command_line)
+            except UnsafeCommandError as e:
+                if self.cache:
+                    self.cache.discard(command)
+                return f"유효한 드론 명령이 아닙니다: {str(e)}"
+
+            print(f"Executing commands: {', '.join(format_call(call) for call in calls)}")
+            with jobs.hold('drone'):
+                dispatcher.execute(calls)
             
+            # 상태 조회(get_*/query_*)는 결과가 그때그때 다르므로 캐시하지 않습니다
+            if self.cache and cached is None and not any(is_query(call) for call in calls):
+                self.cache.put(command, "\n".join(format_call(call) for call in calls))
             return f"명령이 실행되었습니다: {command_line}"
             
         except Exception as e:
+            if self.cache:
+                self.cache.discard(command)
             return f"명령 처리 중 오류가 발생했습니다: {str(e)}"
 
 class CameraAgent:
     def __init__(self):
-        self.chat_session = model.start_chat(history=[
-            {
-                "role": "system",
-                "content": """당신은 드론의 카메라 제어와 영상 분석을 담당하는 전문가입니다.
-                사진 촬영과 장면 분석을 수행할 수 있습니다.
-                """
-            }
-        ])
-
-    def process_command(self, command: str) -> str:
+        self.model = genai.GenerativeModel(
+            model_name="gemini-2.0-flash-exp",
+            generation_config=generation_config,
+            system_instruction="""당신은 드론의 카메라 제어와 영상 분석을 담당하는 전문가입니다.
+            사진 촬영과 장면 분석을 수행할 수 있습니다.
+            """,
+        )
+
+    def process_command(self, command: str, history=()) -> str:
         try:
-            response = self.chat_session.send_message(command)
+            response = self.model.start_chat(history=chat_history(history)).send_message(command)
             return response.text
         except Exception as e:
             return f"명령 처리 중 오류가 발생했습니다: {str(e)}"
 
 class CodeAgent:
     def __init__(self):
-        self.chat_session = model.start_chat(history=[
-            {
-                "role": "system",
-                "content": """당신은 파이썬 코드를 작성하고 실행할 수 있는 전문가입니다.
-                주어진 명령을 수행하는 파이썬 코드를 작성하고 실행하세요.
-                """
-            }
-        ])
-
-    def process_command(self, command: str) -> str:
+        self.model = genai.GenerativeModel(
+            model_name="gemini-2.0-flash-exp",
+            generation_config=generation_config,
+            system_instruction="""당신은 파이썬 코드를 작성하고 실행할 수 있는 전문가입니다.
+            주어진 명령을 수행하는 파이썬 코드를 작성하고 실행하세요.
+            """,
+        )
+
+    def process_command(self, command: str, history=()) -> str:
         try:
-            response = self.chat_session.send_message(command)
+            response = self.model.start_chat(history=chat_history(history)).send_message(command)
             return response.text
         except Exception as e:
             return f"명령 처리 중 오류가 발생했습니다: {str(e)}"
@@ -453,6 +444,50 @@ class CodeAgent:
 # 전역 컨트롤러 인스턴스
 controller = None
 
+# 비전 분석 업로드 크기와 재사용 통계 (/vision/stats)
+app.add_url_rule('/vision/stats', 'vision_stats', lambda: jsonify(controller.vision.stats() if controller else {}))
+
+# WebSocket 저지연 라이브 뷰 (/ws/video). 연결되지 않는 브라우저는 /video_feed MJPEG을 사용합니다
+live_view = LiveView(app, lambda: controller.broadcaster if controller else None)
+
+# 스캔, 파노라마, 에이전트 실행, 음성 명령처럼 오래 걸리는 작업은 백그라운드에서 실행하고 작업 ID를 바로 반환합니다.
+# 드론을 움직이는 작업은 key='drone'으로 한 번에 하나씩 실행됩니다. 녹음, 비전 분석, LLM 호출처럼 드론과 상관없는 단계가 긴
+# 작업은 key 없이 실행하고, 드론에 명령하는 부분만 jobs.hold('drone')으로 감쌉니다.
+jobs = JobRunner(max_workers=2)
+jobs.register_routes(app)
+
+# 드론 상태를 한 번만 읽어 접속한 모든 대시보드에 변경분만 보냅니다 (/telemetry/stream)
+telemetry = TelemetryPublisher(
+    app, lambda: {controller.tello.address[0]: controller.tello} if controller and controller.is_streaming else {})
+
+# Gemini가 만든 드론 명령 캐시. 드론 에이전트 프롬프트가 바뀌면 초기화됩니다
+command_cache = IntentCache(schema={"model": "gemini-2.0-flash-exp", "prompt": DRONE_AGENT_PROMPT},
+                            path='webui_command_cache_gemini.json')
+app.add_url_rule('/commands/stats', 'commands_stats', lambda: jsonify(command_cache.stats()))
+
+# 에이전트는 유형마다 한 번만 만들고, 운영자별로 최근 대화를 기억합니다 (/agents/stats)
+# 드론 에이전트는 드론이 연결된 뒤 처음 명령할 때 만들어집니다
+agents = AgentPool(max_history=6)
+agents.register('drone', lambda: DroneAgent(controller, command_cache),
+                lambda agent, command, history: agent.process_command(command, history))
+agents.register('camera', CameraAgent, lambda agent, command, history: agent.process_command(command, history))
+agents.register('code', CodeAgent, lambda agent, command, history: agent.process_command(command, history))
+agents.register_routes(app)
+
+# "이륙해줘", "앞으로 1미터" 같은 간단한 명령은 에이전트(LLM)를 거치지 않고 바로 실행합니다 (/intents/stats)
+intent_parser = IntentParser()
+app.add_url_rule('/intents/stats', 'intents_stats', lambda: jsonify(intent_parser.stats()))
+
+def run_drone_command(command, operator):
+    """빠른 해석에 성공하면 바로 실행하고, 아니면 드론 에이전트에 넘깁니다. (결과, 걸린 시간) 반환"""
+    intent = intent_parser.parse(command)
+    if intent is None:
+        return agents.run('drone', command, operator=operator)
+    started = time.monotonic()
+    with jobs.hold('drone'):
+        getattr(controller, intent["command"])(**intent.get("parameters", {}))
+    return f"명령이 실행되었습니다: {describe(intent)}", time.monotonic() - started
+
 # 드론 제어를 위한 도구 함수들 정의
 def tool_takeoff() -> str:
     if controller and not controller.is_flying:
@@ -600,27 +635,9 @@ tello.rotate_clockwise(90)
         if not controller:
             return "드론이 연결되지 않았습니다."
             
-        tello = controller.tello
         try:
-            # JSON 파싱 시도
-            try:
-                parsed = json.loads(command)
-                if "command" in parsed:
-                    command = parsed["command"]  # "takeoff" 같은 순수 문자열로 치환
-            except json.JSONDecodeError:
-                pass  # JSON이 아닌 경우 원래 command 사용
-            
-            # tello. 접두사가 있다면 제거
-            if command.startswith('tello.'):
-                command = command[6:]
-                
-            # 괄호가 없는 경우 추가
-            if '(' not in command:
-                command = f"{command}()"
-                
-            # 명령어 실행
-            getattr(tello, command.split('(')[0])(*eval(f"[{command.split('(')[1][:-1]}]" if '(' in command else "[]"))
-            return f"명령 실행 완료: {command}"
+            with jobs.hold('drone'):
+                return f"명령 실행 완료: {ToolDispatcher(controller.tello).run(command)}"
         except Exception as e:
             return f"명령 실행 실패: {str(e)}"
             
@@ -683,6 +700,7 @@ def connect_drone():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/scan', methods=['POST'])
+@jobs.background()  # 비전 LLM을 기다리는 동안 드론 명령을 막지 않습니다
 def scan_surroundings():
     try:
         if controller:
@@ -699,11 +717,13 @@ def scan_surroundings():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/panorama', methods=['POST'])
+@jobs.background()  # 회전하는 동안에만 jobs.hold('drone')으로 드론을 독점합니다
 def create_panorama():
     try:
         if controller:
-            panorama_path = controller.create_panorama()
-            analysis = controller.analyze_image(panorama_path)
+            panorama_path, panorama = controller.create_panorama()
+            report_progress("파노라마 분석 중...")
+            analysis = controller.analyze_image(panorama)
             return jsonify({
                 "status": "success",
                 "message": "파노라마 촬영이 완료되었습니다.",
@@ -718,9 +738,11 @@ def serve_photo(filename):
     return send_from_directory('photos', filename)
 
 @app.route('/control', methods=['POST'])
+@jobs.background(key='drone')
 def control_drone():
     try:
         if controller:
+            controller.speaker.cancel()  # 새 명령이 오면 읽던 분석을 멈춥니다
             command = request.json.get('command')
             params = request.json.get('parameters', {})
             
@@ -742,39 +764,42 @@ def control_drone():
 #
 # AI 에이전트에 자연어로 명령 전송
 @app.route('/agent_control', methods=['POST'])
+@jobs.background()  # LLM을 기다리는 동안 드론 작업을 막지 않도록 드론 명령만 jobs.hold('drone')으로 실행합니다
 def agent_control():
     try:
         if controller:
+            controller.speaker.cancel()  # 새 명령이 오면 읽던 분석을 멈춥니다
             command = request.json.get('command')
             agent_type = request.json.get('agent_type')
             
-            if agent_type == "drone":
-                agent = DroneAgent(controller)
-                result = agent.process_command(command)
-                return jsonify({"status": "success", "message": result})
-            elif agent_type == "camera":
-                agent = CameraAgent()
-            elif agent_type == "code":
-                agent = CodeAgent()
-            else:
+            if agent_type not in agents:
                 return jsonify({"status": "error", "message": "알 수 없는 에이전트 유형입니다."})
             
-            result = agent.process_command(command)
-            return jsonify({"status": "success", "message": result})
+            report_progress(f"{agent_type} 에이전트 실행 중...")
+            if agent_type == "drone":
+                result, latency = run_drone_command(command, current_operator())
+            else:
+                result, latency = agents.run(agent_type, command, operator=current_operator())
+            return jsonify({"status": "success", "message": result, "latency": round(latency, 2)})
         return jsonify({"status": "error", "message": "드론이 연결되지 않았습니다."})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 #
 # 음성 제어 버튼 클릭시 동작 설정
 @app.route('/start_recording', methods=['POST'])
+@jobs.background()  # 녹음과 음성 인식 동안에는 드론 작업을 막지 않습니다
 def start_recording():
     try:
+        if not controller:
+            return jsonify({"status": "error", "message": "드론이 연결되지 않았습니다."})
+        controller.speaker.cancel()  # 녹음에 분석 음성이 섞이지 않도록 멈춥니다
+
         # 음성 녹음 설정
         duration = 5  # 녹음 시간 (초)
         fs = 44100  # 샘플링 레이트
         channels = 1  # 모노 녹음
         
-        print("음성 녹음 시작...")
+        report_progress("음성 녹음 시작...")
         recording = sd.rec(int(duration * fs), samplerate=fs, channels=channels)
         sd.wait()  # 녹음이 끝날 때까지 대기
         
@@ -794,16 +819,16 @@ def start_recording():
             ])
             
             command = response.text
-            print(f"인식된 명령: {command}")
+            report_progress(f"인식된 명령: {command}")
             
             # 드론 에이전트로 명령 처리
-            agent = DroneAgent(controller)
-            result = agent.process_command(command)
+            result, latency = run_drone_command(command, current_operator())
             
             return jsonify({
                 "status": "success",
                 "command": command,
-                "result": result
+                "result": result,
+                "latency": round(latency, 2)
             })
 
             
@@ -820,15 +845,9 @@ def start_recording():
 
 def get_frame():
     """프레임 스트리밍을 위한 제너레이터 함수"""
-    while True:
-        if controller and not controller.frame_queue.empty():
-            frame = controller.frame_queue.get()
-            _, buffer = cv2.imencode('.jpg', frame)
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        else:
-            time.sleep(0.03)
+    while controller is None:
+        time.sleep(0.5)
+    yield from controller.broadcaster.mjpeg_stream()
 
 def ensure_template_exists():
     """템플릿 디렉토리와 파일이 존재하는지 확인하고 생성"""
@@ -988,7 +1007,12 @@ def ensure_template_exists():
         <div class="section">
             <h2 class="section-title">드론 카메라</h2>
             <div class="video-container">
-                <img src="{{ url_for('video_feed') }}" width="640" height="480">
+                <img id="video" src="{{ url_for('video_feed') }}" width="640" height="480">
+                <div id="video-stats" style="color: #ccc; font-size: 12px;"></div>
+                <div id="telemetry" data-rate="5" style="color: #ccc; font-size: 12px;"></div>
+                <script src="/telemetry/telemetry.js"></script>
+                <script src="/live/live_view.js"></script>
+                <script src="/jobs/jobs.js"></script>
             </div>
         </div>
 
@@ -1063,7 +1087,7 @@ def ensure_template_exists():
                 const response = await fetch('/scan', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
                 if (data.analysis) {
                     updateAnalysis(data.analysis);
@@ -1079,7 +1103,7 @@ def ensure_template_exists():
                 const response = await fetch('/panorama', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
                 if (data.analysis) {
                     updateAnalysis(data.analysis);
@@ -1110,7 +1134,7 @@ def ensure_template_exists():
                         command: command
                     })
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
             } catch (error) {
                 updateStatus('명령 실행 중 오류가 발생했습니다: ' + error, true);
@@ -1128,7 +1152,7 @@ def ensure_template_exists():
                 const response = await fetch('/start_recording', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 
                 if (data.status === 'success') {
                     updateStatus(`명령 실행 완료: ${data.command}`);
@@ -1,17 +1,23 @@
 from flask import Flask, render_template, Response, jsonify, request, send_from_directory
 import cv2
 import threading
-from queue import Queue
 import os
-import json
-from djitellopy import Tello
+from video_broadcast import VideoBroadcaster
+from live_view import LiveView
+from job_runner import JobRunner, report_progress
+from telemetry import TelemetryPublisher
+from speech_stream import StreamingSpeaker
+from image_pipeline import SceneAnalyzer, data_url
+from intent_parser import IntentParser, describe
+from intent_cache import IntentCache
+from agent_pool import AgentPool, current_operator, with_history
+from tool_dispatcher import ToolDispatcher, UnsafeCommandError, command_table, format_call, is_query, summarize
+from djitellopy import Tello, LinkManager
 import time
 from datetime import datetime
 import numpy as np
 from openai import OpenAI
 from dotenv import load_dotenv
-import base64
-from gtts import gTTS
 import pygame
 import tempfile
 from smolagents import CodeAgent, ToolCallingAgent, LiteLLMModel, tool, TOOL_CALLING_SYSTEM_PROMPT
@@ -29,15 +35,28 @@ client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 app = Flask(__name__)
 
+# 웹 UI 비디오 설정 (JPEG 품질, 해상도)
+VIDEO_QUALITY = 80
+VIDEO_SIZE = (640, 480)
+
+# 비전 LLM 업로드 설정 (긴 변 픽셀 수, 최대 바이트 수)
+VISION_MAX_EDGE = 768
+VISION_MAX_BYTES = 120 * 1024
+
 class TelloController:
     def __init__(self):
         self.tello = Tello()
+        # LLM 호출이 길어져도 15초 자동 착륙이 일어나지 않도록 쉬는 동안 keepalive를 보냅니다
+        self.link = LinkManager(self.tello)
         self.frame_reader = None
         self.is_streaming = False
-        self.frame_queue = Queue(maxsize=10)
-        self.stream_thread = None
+        # 프레임을 한 번만 인코딩하여 모든 클라이언트에 나눠줍니다
+        self.broadcaster = VideoBroadcaster(self._latest_frame, quality=VIDEO_QUALITY, size=VIDEO_SIZE)
+        # 비전 LLM에는 줄인 이미지를 메모리에서 바로 보내고, 장면이 그대로면 이전 분석을 재사용합니다
+        self.vision = SceneAnalyzer(self._describe_image, max_edge=VISION_MAX_EDGE, max_bytes=VISION_MAX_BYTES)
         self.is_flying = False
         pygame.mixer.init()
+        self.speaker = StreamingSpeaker(lang='ko')
 
     def connect(self):
         """드론 연결 및 상태 확인"""
@@ -48,6 +67,7 @@ class TelloController:
             
             print("드론에 연결 중...")
             self.tello.connect()
+            self.link.start()
             print("✓ 연결 성공!")
             
             battery = self.tello.get_battery()
@@ -65,18 +85,11 @@ class TelloController:
         """비디오 스트리밍 중지"""
         print("비디오 스트림 정지 중...")
         self.is_streaming = False
-        if self.stream_thread:
-            self.stream_thread.join(timeout=2)
+        self.broadcaster.stop()
         try:
             self.tello.streamoff()
         except:
             pass
-        # 큐 비우기
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except:
-                pass
 
     def start_video_stream(self):
         """비디오 스트리밍 시작"""
@@ -85,31 +98,14 @@ class TelloController:
             time.sleep(2)  # 스트림 초기화 대기
             self.frame_reader = self.tello.get_frame_read()
             self.is_streaming = True
-            
-            self.stream_thread = threading.Thread(target=self._stream_loop)
-            self.stream_thread.daemon = True
-            self.stream_thread.start()
+            self.broadcaster.start()
             print("비디오 스트리밍 시작됨")
 
-    def _stream_loop(self):
-        """비디오 스트리밍 루프"""
-        while self.is_streaming:
-            if self.frame_reader:
-                frame = self.frame_reader.frame
-                if frame is not None:
-                    frame = cv2.resize(frame, (640, 480))
-                    
-                    if self.frame_queue.full():
-                        try:
-                            self.frame_queue.get_nowait()
-                        except:
-                            pass
-                    
-                    try:
-                        self.frame_queue.put_nowait(frame.copy())
-                    except:
-                        pass
-            time.sleep(0.03)
+    def _latest_frame(self):
+        """브로드캐스터가 인코딩할 최신 RGB 프레임"""
+        if self.frame_reader:
+            return self.frame_reader.frame
+        return None
 
     def take_photo(self):
         """사진 촬영"""
@@ -127,24 +123,26 @@ class TelloController:
     def create_panorama(self):
         """파노라마 촬영"""
         try:
-            print("파노라마 촬영 시작...")
+            report_progress("파노라마 촬영 시작...")
             images = []
             
-            # 360도 회전하면서 사진 촬영 (90도씩 4장)
-            for i in range(4):
-                print(f"사진 {i+1}/4 촬영 중...")
-                frame = self.frame_reader.frame
-                if frame is not None:
-                    images.append(frame.copy())
-                else:
-                    raise Exception("프레임을 가져올 수 없습니다")
-                
-                if i < 3:  # 마지막 사진 후에는 회전하지 않음
-                    print(f"{90}도 회전 중...")
-                    self.tello.rotate_clockwise(90)
-                    time.sleep(2)  # 회전 후 안정화 대기
+            # 360도 회전하면서 사진 촬영 (90도씩 4장). 회전하는 동안에만 드론을 독점하고,
+            # 스티칭과 분석은 다른 드론 명령을 막지 않습니다
+            with jobs.hold('drone'):
+                for i in range(4):
+                    report_progress(f"사진 {i+1}/4 촬영 중...")
+                    frame = self.frame_reader.frame
+                    if frame is not None:
+                        images.append(frame.copy())
+                    else:
+                        raise Exception("프레임을 가져올 수 없습니다")
+
+                    if i < 3:  # 마지막 사진 후에는 회전하지 않음
+                        report_progress(f"{90}도 회전 중...")
+                        self.tello.rotate_clockwise(90)
+                        time.sleep(2)  # 회전 후 안정화 대기
             
-            print("파노라마 이미지 생성 중...")
+            report_progress("파노라마 이미지 생성 중...")
             stitcher = cv2.Stitcher.create()
             status, panorama = stitcher.stitch(images)
             
@@ -156,7 +154,7 @@ class TelloController:
                 filename = f'panoramas/tello_panorama_{timestamp}.jpg'
                 cv2.imwrite(filename, panorama)
                 print(f"파노라마 저장됨: {filename}")
-                return filename
+                return filename, panorama
             else:
                 raise Exception(f"파노라마 스티칭 실패 (status: {status})")
                 
@@ -164,67 +162,53 @@ class TelloController:
             print(f"파노라마 촬영 오류: {str(e)}")
             raise
 
-    def analyze_image(self, image_path: str) -> str:
-        """GPT Vision으로 이미지 분석"""
+    def analyze_image(self, frame) -> str:
+        """GPT Vision으로 이미지 분석. 장면이 바뀌지 않았으면 이전 분석을 재사용합니다"""
         try:
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-                
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": "이 이미지에서 보이는 것을 자세히 설명해주세요."},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500
-            )
-            
-            return response.choices[0].message.content
+            return self.vision.analyze(frame)
         except Exception as e:
             print(f"이미지 분석 오류: {str(e)}")
             return f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
 
+    def _describe_image(self, image):
+        """분석 결과를 받는 대로 조각 단위로 내보냅니다"""
+        stream = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": "이 이미지에서 보이는 것을 자세히 설명해주세요."},
+                        {"type": "image_url", "image_url": {"url": data_url(image)}}
+                    ]
+                }
+            ],
+            max_tokens=500,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     def speak(self, text: str):
-        """텍스트를 음성으로 변환하여 재생"""
-        try:
-            tts = gTTS(text=text, lang='ko')
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_filename = fp.name
-                tts.save(temp_filename)
-            
-            pygame.mixer.music.load(temp_filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            os.unlink(temp_filename)
-        except Exception as e:
-            print(f"TTS 오류: {str(e)}")
+        """텍스트를 문장 단위로 음성 변환하여 재생. 재생이 끝나기를 기다리지 않습니다"""
+        self.speaker.say(text)
 
     def scan_surroundings(self):
         """현재 보이는 장면을 촬영하고 분석"""
         try:
-            print("사진 촬영 중...")
-            filename, _ = self.take_photo()
-            
-            print("이미지 분석 중...")
-            analysis = self.analyze_image(filename)
-            print(f"분석 결과: {analysis}")
+            report_progress("사진 촬영 중...")
+            filename, frame = self.take_photo()
             
+            report_progress("이미지 분석 중...")
             try:
-                self.speak(analysis)
+                # 분석 결과를 받는 대로 문장 단위로 읽어 줍니다 (첫 문장이 끝나면 바로 재생)
+                analysis = self.speaker.speak_stream(self.vision.analyze_stream(frame))
             except Exception as e:
-                print(f"TTS 오류: {str(e)}")
+                print(f"이미지 분석 오류: {str(e)}")
+                analysis = f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
+                self.speak(analysis)
+            print(f"분석 결과: {analysis}")
             
             return filename, analysis
         except Exception as e:
@@ -298,6 +282,22 @@ class TelloController:
 # 전역 컨트롤러 인스턴스
 controller = None
 
+# 비전 분석 업로드 크기와 재사용 통계 (/vision/stats)
+app.add_url_rule('/vision/stats', 'vision_stats', lambda: jsonify(controller.vision.stats() if controller else {}))
+
+# WebSocket 저지연 라이브 뷰 (/ws/video). 연결되지 않는 브라우저는 /video_feed MJPEG을 사용합니다
+live_view = LiveView(app, lambda: controller.broadcaster if controller else None)
+
+# 스캔, 파노라마, 에이전트 실행, 음성 명령처럼 오래 걸리는 작업은 백그라운드에서 실행하고 작업 ID를 바로 반환합니다.
+# 드론을 움직이는 작업은 key='drone'으로 한 번에 하나씩 실행됩니다. 녹음, 비전 분석, LLM 호출처럼 드론과 상관없는 단계가 긴
+# 작업은 key 없이 실행하고, 드론에 명령하는 부분만 jobs.hold('drone')으로 감쌉니다.
+jobs = JobRunner(max_workers=2)
+jobs.register_routes(app)
+
+# 드론 상태를 한 번만 읽어 접속한 모든 대시보드에 변경분만 보냅니다 (/telemetry/stream)
+telemetry = TelemetryPublisher(
+    app, lambda: {controller.tello.address[0]: controller.tello} if controller and controller.is_streaming else {})
+
 # 드론 제어를 위한 도구 함수들 정의
 def tool_takeoff() -> str:
     if controller and not controller.is_flying:
@@ -398,6 +398,31 @@ tool_analyze_view.name = "analyze_view"
 tool_analyze_view.description = "드론 카메라의 현재 시야를 분석합니다."
 tool_analyze_view.inputs = {}
 
+# 모든 에이전트가 공유하는 LLM 클라이언트. 한 번만 만들어 연결을 재사용합니다
+llm_model = LiteLLMModel(model_id="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
+
+# 에이전트가 실행한 드론 명령을 기록합니다 (명령 캐시용)
+tool_calls = threading.local()
+
+def execute_drone_command(command: str) -> str:
+    """'move_forward(100)' 형태(또는 JSON)의 명령을 검증한 뒤 드론에서 실행"""
+    if not controller:
+        return "드론이 연결되지 않았습니다."
+
+    try:
+        # eval 없이 명령 표로 검증합니다. 여러 줄이면 모두 검증한 뒤 한 번에 실행합니다
+        dispatcher = ToolDispatcher(controller.tello)
+        calls = dispatcher.plan(command)
+        with jobs.hold('drone'):
+            results = dispatcher.execute(calls)
+        if getattr(tool_calls, 'log', None) is not None:
+            tool_calls.log.extend(calls)
+        return f"명령 실행 완료: {summarize(calls, results)}"
+    except UnsafeCommandError as e:
+        return f"명령 실행 실패 (허용되지 않은 명령): {str(e)}"
+    except Exception as e:
+        return f"명령 실행 실패: {str(e)}"
+
 # 드론 제어 에이전트
 def create_drone_agent():
     system_prompt = """{{managed_agents_descriptions}}
@@ -442,36 +467,11 @@ tello.rotate_clockwise(90)
         Returns:
             str: 명령 실행 결과 메시지
         """
-        if not controller:
-            return "드론이 연결되지 않았습니다."
-            
-        tello = controller.tello
-        try:
-            # JSON 파싱 시도
-            try:
-                parsed = json.loads(command)
-                if "command" in parsed:
-                    command = parsed["command"]  # "takeoff" 같은 순수 문자열로 치환
-            except json.JSONDecodeError:
-                pass  # JSON이 아닌 경우 원래 command 사용
-            
-            # tello. 접두사가 있다면 제거
-            if command.startswith('tello.'):
-                command = command[6:]
-                
-            # 괄호가 없는 경우 추가
-            if '(' not in command:
-                command = f"{command}()"
-                
-            # 명령어 실행
-            getattr(tello, command.split('(')[0])(*eval(f"[{command.split('(')[1][:-1]}]" if '(' in command else "[]"))
-            return f"명령 실행 완료: {command}"
-        except Exception as e:
-            return f"명령 실행 실패: {str(e)}"
+        return execute_drone_command(command)
             
     return ToolCallingAgent(
         tools=[drone_control],
-        model=LiteLLMModel(model_id="gpt-4o", api_key=os.getenv("OPENAI_API_KEY")),
+        model=llm_model,
         system_prompt=system_prompt
     )
 
@@ -488,7 +488,7 @@ def create_camera_agent():
 """
     return ToolCallingAgent(
         tools=[tool_take_photo, tool_analyze_view],
-        model=LiteLLMModel(model_id="gpt-4o", api_key=os.getenv("OPENAI_API_KEY")),
+        model=llm_model,
         system_prompt=system_prompt
     )
 
@@ -499,10 +499,69 @@ def create_code_agent():
 주어진 명령을 수행하는 파이썬 코드를 작성하고 실행하세요.
 """
     return CodeAgent(
-        model=LiteLLMModel(model_id="gpt-4o", api_key=os.getenv("OPENAI_API_KEY")),
+        model=llm_model,
         system_prompt=system_prompt
     )
 
+def run_agent(agent, command, history):
+    # 세션의 최근 대화만 프롬프트에 붙이고 에이전트 내부 기록은 매번 초기화하여 기록이 계속 늘어나지 않게 합니다
+    return agent.run(with_history(command, history))
+
+# 에이전트는 유형마다 한 번만 만들고, 운영자별로 최근 대화를 기억합니다 (/agents/stats)
+agents = AgentPool(max_history=6)
+agents.register('drone', create_drone_agent, run_agent)
+agents.register('camera', create_camera_agent, run_agent)
+agents.register('code', create_code_agent, run_agent)
+agents.register_routes(app)
+agents.warm()
+
+# "이륙해줘", "앞으로 1미터" 같은 간단한 명령은 에이전트(LLM)를 거치지 않고 바로 실행합니다 (/intents/stats)
+intent_parser = IntentParser()
+app.add_url_rule('/intents/stats', 'intents_stats', lambda: jsonify(intent_parser.stats()))
+
+# 에이전트가 한 번 실행한 문장은 그 드론 명령들을 저장해 두고 다음부터 바로 실행합니다.
+# 에이전트가 쓸 수 있는 명령 표가 바뀌면 캐시가 초기화됩니다
+command_cache = IntentCache(schema={"model": "gpt-4o", "commands": command_table().describe()},
+                            path='webui_command_cache.json')
+app.add_url_rule('/commands/stats', 'commands_stats', lambda: jsonify(command_cache.stats()))
+
+def run_drone_command(command, operator):
+    """빠른 해석이나 명령 캐시에 있으면 바로 실행하고, 아니면 드론 에이전트에 넘깁니다. (결과, 걸린 시간) 반환"""
+    started = time.monotonic()
+    intent = intent_parser.parse(command)
+    if intent is not None:
+        with jobs.hold('drone'):
+            getattr(controller, intent["command"])(**intent.get("parameters", {}))
+        return f"명령이 실행되었습니다: {describe(intent)}", time.monotonic() - started
+
+    cached = command_cache.get(command)
+    if cached is not None:
+        # 캐시된 명령 전체를 먼저 검증하고, 통과하면 한 번에 실행합니다
+        dispatcher = ToolDispatcher(controller.tello)
+        try:
+            calls = [call for line in cached for call in dispatcher.plan(line)]
+        except UnsafeCommandError as e:
+            print(f"캐시된 명령이 유효하지 않아 버립니다: {str(e)}")
+            command_cache.discard(command)
+        else:
+            try:
+                with jobs.hold('drone'):
+                    results = dispatcher.execute(calls)
+            except Exception as e:
+                command_cache.discard(command)
+                return f"명령 실행 실패: {str(e)}", time.monotonic() - started
+            return f"명령 실행 완료: {summarize(calls, results)}", time.monotonic() - started
+
+    # 에이전트가 실행한 드론 명령을 기록하여 캐시에 저장합니다.
+    # 상태 조회(get_*/query_*)가 섞인 문장은 결과가 그때그때 다르므로 저장하지 않습니다
+    tool_calls.log = []
+    try:
+        result, latency = agents.run('drone', command, operator=operator)
+        if tool_calls.log and not any(is_query(call) for call in tool_calls.log):
+            command_cache.put(command, [format_call(call) for call in tool_calls.log])
+        return result, latency
+    finally:
+        tool_calls.log = None
 
 @app.route('/')
 def index():
@@ -527,6 +586,7 @@ def connect_drone():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/scan', methods=['POST'])
+@jobs.background()  # 비전 LLM을 기다리는 동안 드론 명령을 막지 않습니다
 def scan_surroundings():
     try:
         if controller:
@@ -543,11 +603,13 @@ def scan_surroundings():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/panorama', methods=['POST'])
+@jobs.background()  # 회전하는 동안에만 jobs.hold('drone')으로 드론을 독점합니다
 def create_panorama():
     try:
         if controller:
-            panorama_path = controller.create_panorama()
-            analysis = controller.analyze_image(panorama_path)
+            panorama_path, panorama = controller.create_panorama()
+            report_progress("파노라마 분석 중...")
+            analysis = controller.analyze_image(panorama)
             return jsonify({
                 "status": "success",
                 "message": "파노라마 촬영이 완료되었습니다.",
@@ -562,9 +624,11 @@ def serve_photo(filename):
     return send_from_directory('photos', filename)
 
 @app.route('/control', methods=['POST'])
+@jobs.background(key='drone')
 def control_drone():
     try:
         if controller:
+            controller.speaker.cancel()  # 새 명령이 오면 읽던 분석을 멈춥니다
             command = request.json.get('command')
             params = request.json.get('parameters', {})
             
@@ -585,36 +649,40 @@ def control_drone():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/agent_control', methods=['POST'])
+@jobs.background()  # LLM을 기다리는 동안 드론 작업을 막지 않도록 드론 명령만 jobs.hold('drone')으로 실행합니다
 def agent_control():
     try:
         if controller:
+            controller.speaker.cancel()  # 새 명령이 오면 읽던 분석을 멈춥니다
             command = request.json.get('command')
             agent_type = request.json.get('agent_type')
             
-            if agent_type == "drone":
-                agent = create_drone_agent()
-            elif agent_type == "camera":
-                agent = create_camera_agent()
-            elif agent_type == "code":
-                agent = create_code_agent()
-            else:
+            if agent_type not in agents:
                 return jsonify({"status": "error", "message": "알 수 없는 에이전트 유형입니다."})
             
-            result = agent.run(command)
-            return jsonify({"status": "success", "message": result})
+            report_progress(f"{agent_type} 에이전트 실행 중...")
+            if agent_type == "drone":
+                result, latency = run_drone_command(command, current_operator())
+            else:
+                result, latency = agents.run(agent_type, command, operator=current_operator())
+            return jsonify({"status": "success", "message": result, "latency": round(latency, 2)})
         return jsonify({"status": "error", "message": "드론이 연결되지 않았습니다."})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/start_recording', methods=['POST'])
+@jobs.background()  # 녹음과 음성 인식 동안에는 드론 작업을 막지 않습니다
 def start_recording():
     try:
+        if controller:
+            controller.speaker.cancel()  # 녹음에 분석 음성이 섞이지 않도록 멈춥니다
+
         # 음성 녹음 설정
         duration = 5  # 녹음 시간 (초)
         fs = 44100  # 샘플링 레이트
         channels = 1  # 모노 녹음
         
-        print("음성 녹음 시작...")
+        report_progress("음성 녹음 시작...")
         recording = sd.rec(int(duration * fs), samplerate=fs, channels=channels)
         sd.wait()  # 녹음이 끝날 때까지 대기
         
@@ -633,16 +701,16 @@ def start_recording():
                 )
             
             command = transcript.text
-            print(f"인식된 명령: {command}")
+            report_progress(f"인식된 명령: {command}")
             
             # 드론 에이전트로 명령 처리
-            agent = create_drone_agent()
-            result = agent.run(command)
+            result, latency = run_drone_command(command, current_operator())
             
             return jsonify({
                 "status": "success",
                 "command": command,
-                "result": result
+                "result": result,
+                "latency": round(latency, 2)
             })
             
         finally:
@@ -658,15 +726,9 @@ def start_recording():
 
 def get_frame():
     """프레임 스트리밍을 위한 제너레이터 함수"""
-    while True:
-        if controller and not controller.frame_queue.empty():
-            frame = controller.frame_queue.get()
-            _, buffer = cv2.imencode('.jpg', frame)
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        else:
-            time.sleep(0.03)
+    while controller is None:
+        time.sleep(0.5)
+    yield from controller.broadcaster.mjpeg_stream()
 
 def ensure_template_exists():
     """템플릿 디렉토리와 파일이 존재하는지 확인하고 생성"""
@@ -826,7 +888,12 @@ def ensure_template_exists():
         <div class="section">
             <h2 class="section-title">드론 카메라</h2>
             <div class="video-container">
-                <img src="{{ url_for('video_feed') }}" width="640" height="480">
+                <img id="video" src="{{ url_for('video_feed') }}" width="640" height="480">
+                <div id="video-stats" style="color: #ccc; font-size: 12px;"></div>
+                <div id="telemetry" data-rate="5" style="color: #ccc; font-size: 12px;"></div>
+                <script src="/telemetry/telemetry.js"></script>
+                <script src="/live/live_view.js"></script>
+                <script src="/jobs/jobs.js"></script>
             </div>
         </div>
 
@@ -901,7 +968,7 @@ def ensure_template_exists():
                 const response = await fetch('/scan', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
                 if (data.analysis) {
                     updateAnalysis(data.analysis);
@@ -917,7 +984,7 @@ def ensure_template_exists():
                 const response = await fetch('/panorama', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
                 if (data.analysis) {
                     updateAnalysis(data.analysis);
@@ -948,7 +1015,7 @@ def ensure_template_exists():
                         command: command
                     })
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
             } catch (error) {
                 updateStatus('명령 실행 중 오류가 발생했습니다: ' + error, true);
@@ -966,7 +1033,7 @@ def ensure_template_exists():
                 const response = await fetch('/start_recording', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 
                 if (data.status === 'success') {
                     updateStatus(`명령 실행 완료: ${data.command}`);
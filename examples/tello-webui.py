@@ -1,8 +1,12 @@
 from flask import Flask, render_template, Response, jsonify, request, send_from_directory
 import cv2
-import threading
-from queue import Queue
 import os
+from video_broadcast import VideoBroadcaster
+from live_view import LiveView
+from job_runner import JobRunner, report_progress
+from telemetry import TelemetryPublisher
+from speech_stream import StreamingSpeaker
+from image_pipeline import SceneAnalyzer
 from djitellopy import Tello
 import time
 from datetime import datetime
@@ -12,10 +16,7 @@ from openai import OpenAI
 import google.generativeai as genai
 
 from dotenv import load_dotenv
-import base64
-from gtts import gTTS
 import pygame
-import tempfile
 
 # .env 파일 로드
 load_dotenv()
@@ -43,15 +44,26 @@ chat_session = model.start_chat()
 
 app = Flask(__name__)
 
+# 웹 UI 비디오 설정 (JPEG 품질, 해상도)
+VIDEO_QUALITY = 80
+VIDEO_SIZE = (640, 480)
+
+# 비전 LLM 업로드 설정 (긴 변 픽셀 수, 최대 바이트 수)
+VISION_MAX_EDGE = 768
+VISION_MAX_BYTES = 120 * 1024
+
 class TelloController:
     def __init__(self):
         self.tello = Tello()
         self.frame_reader = None
         self.is_streaming = False
-        self.frame_queue = Queue(maxsize=10)
-        self.stream_thread = None
+        # 프레임을 한 번만 인코딩하여 모든 클라이언트에 나눠줍니다
+        self.broadcaster = VideoBroadcaster(self._latest_frame, quality=VIDEO_QUALITY, size=VIDEO_SIZE)
+        # 비전 LLM에는 줄인 이미지를 메모리에서 바로 보내고, 장면이 그대로면 이전 분석을 재사용합니다
+        self.vision = SceneAnalyzer(self._describe_image, max_edge=VISION_MAX_EDGE, max_bytes=VISION_MAX_BYTES)
         self.is_flying = False  # 이륙 상태 추적
         pygame.mixer.init()
+        self.speaker = StreamingSpeaker(lang='ko')
 
     def connect(self):
         """드론 연결 및 상태 확인"""
@@ -79,18 +91,11 @@ class TelloController:
         """비디오 스트리밍 중지"""
         print("비디오 스트림 정지 중...")
         self.is_streaming = False
-        if self.stream_thread:
-            self.stream_thread.join(timeout=2)
+        self.broadcaster.stop()
         try:
             self.tello.streamoff()
         except:
             pass
-        # 큐 비우기
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except:
-                pass
 
     def start_video_stream(self):
         """비디오 스트리밍 시작"""
@@ -99,31 +104,14 @@ class TelloController:
             time.sleep(2)  # 스트림 초기화 대기
             self.frame_reader = self.tello.get_frame_read()
             self.is_streaming = True
-            
-            self.stream_thread = threading.Thread(target=self._stream_loop)
-            self.stream_thread.daemon = True
-            self.stream_thread.start()
+            self.broadcaster.start()
             print("비디오 스트리밍 시작됨")
 
-    def _stream_loop(self):
-        """비디오 스트리밍 루프"""
-        while self.is_streaming:
-            if self.frame_reader:
-                frame = self.frame_reader.frame
-                if frame is not None:
-                    frame = cv2.resize(frame, (640, 480))
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    if self.frame_queue.full():
-                        try:
-                            self.frame_queue.get_nowait()
-                        except:
-                            pass
-                    
-                    try:
-                        self.frame_queue.put_nowait(frame.copy())
-                    except:
-                        pass
-            time.sleep(0.03)
+    def _latest_frame(self):
+        """브로드캐스터가 인코딩할 최신 RGB 프레임"""
+        if self.frame_reader:
+            return self.frame_reader.frame
+        return None
 
     def take_photo(self):
         """사진 촬영"""
@@ -141,24 +129,26 @@ class TelloController:
     def create_panorama(self):
         """파노라마 촬영"""
         try:
-            print("파노라마 촬영 시작...")
+            report_progress("파노라마 촬영 시작...")
             images = []
             
-            # 360도 회전하면서 사진 촬영 (90도씩 4장)
-            for i in range(4):
-                print(f"사진 {i+1}/4 촬영 중...")
-                frame = self.frame_reader.frame
-                if frame is not None:
-                    images.append(frame.copy())
-                else:
-                    raise Exception("프레임을 가져올 수 없습니다")
-                
-                if i < 3:  # 마지막 사진 후에는 회전하지 않음
-                    print(f"{90}도 회전 중...")
-                    self.tello.rotate_clockwise(90)
-                    time.sleep(2)  # 회전 후 안정화 대기
+            # 360도 회전하면서 사진 촬영 (90도씩 4장). 회전하는 동안에만 드론을 독점하고,
+            # 스티칭과 분석은 다른 드론 명령을 막지 않습니다
+            with jobs.hold('drone'):
+                for i in range(4):
+                    report_progress(f"사진 {i+1}/4 촬영 중...")
+                    frame = self.frame_reader.frame
+                    if frame is not None:
+                        images.append(frame.copy())
+                    else:
+                        raise Exception("프레임을 가져올 수 없습니다")
+
+                    if i < 3:  # 마지막 사진 후에는 회전하지 않음
+                        report_progress(f"{90}도 회전 중...")
+                        self.tello.rotate_clockwise(90)
+                        time.sleep(2)  # 회전 후 안정화 대기
             
-            print("파노라마 이미지 생성 중...")
+            report_progress("파노라마 이미지 생성 중...")
             stitcher = cv2.Stitcher.create()
             status, panorama = stitcher.stitch(images)
             
@@ -170,7 +160,7 @@ class TelloController:
                 filename = f'panoramas/tello_panorama_{timestamp}.jpg'
                 cv2.imwrite(filename, panorama)
                 print(f"파노라마 저장됨: {filename}")
-                return filename
+                return filename, panorama
             else:
                 raise Exception(f"파노라마 스티칭 실패 (status: {status})")
                 
@@ -178,29 +168,23 @@ class TelloController:
             print(f"파노라마 촬영 오류: {str(e)}")
             raise
 
-    def analyze_image(self, image_path: str) -> str:
+    def analyze_image(self, frame) -> str:
+        """Gemini로 이미지 분석. 장면이 바뀌지 않았으면 이전 분석을 재사용합니다"""
         try:
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-                
-            response = chat_session.send_message(
-                f"이 이미지에서 보이는 것을 자세히 설명해주세요.",
-                [
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    }
-                ]
-            )
-            
-            return response.text
+            return self.vision.analyze(frame)
         except Exception as e:
             print(f"이미지 분석 오류: {str(e)}")
             return f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
-        
-        
+
+    def _describe_image(self, image):
+        # 대화 기록 없이 보내므로 이전 이미지를 매번 다시 업로드하지 않습니다.
+        # 결과는 받는 대로 조각 단위로 내보냅니다
+        response = model.generate_content([
+            "이 이미지에서 보이는 것을 자세히 설명해주세요.",
+            {"mime_type": image.mime_type, "data": image.data}
+        ], stream=True)
+        for chunk in response:
+            yield chunk.text
 
 
     # def analyze_image(self, image_path: str) -> str:
@@ -233,36 +217,24 @@ class TelloController:
     #         return f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
 
     def speak(self, text: str):
-        """텍스트를 음성으로 변환하여 재생"""
-        try:
-            tts = gTTS(text=text, lang='ko')
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_filename = fp.name
-                tts.save(temp_filename)
-            
-            pygame.mixer.music.load(temp_filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            os.unlink(temp_filename)
-        except Exception as e:
-            print(f"TTS 오류: {str(e)}")
+        """텍스트를 문장 단위로 음성 변환하여 재생. 재생이 끝나기를 기다리지 않습니다"""
+        self.speaker.say(text)
 
     def scan_surroundings(self):
         """현재 보이는 장면을 촬영하고 분석"""
         try:
-            print("사진 촬영 중...")
-            filename, _ = self.take_photo()
-            
-            print("이미지 분석 중...")
-            analysis = self.analyze_image(filename)
-            print(f"분석 결과: {analysis}")
+            report_progress("사진 촬영 중...")
+            filename, frame = self.take_photo()
             
+            report_progress("이미지 분석 중...")
             try:
-                self.speak(analysis)
+                # 분석 결과를 받는 대로 문장 단위로 읽어 줍니다 (첫 문장이 끝나면 바로 재생)
+                analysis = self.speaker.speak_stream(self.vision.analyze_stream(frame))
             except Exception as e:
-                print(f"TTS 오류: {str(e)}")
+                print(f"이미지 분석 오류: {str(e)}")
+                analysis = f"이미지 분석 중 오류가 발생했습니다: {str(e)}"
+                self.speak(analysis)
+            print(f"분석 결과: {analysis}")
             
             return filename, analysis
         except Exception as e:
@@ -324,17 +296,27 @@ class TelloController:
 # 전역 컨트롤러 인스턴스
 controller = None
 
+# 비전 분석 업로드 크기와 재사용 통계 (/vision/stats)
+app.add_url_rule('/vision/stats', 'vision_stats', lambda: jsonify(controller.vision.stats() if controller else {}))
+
+# WebSocket 저지연 라이브 뷰 (/ws/video). 연결되지 않는 브라우저는 /video_feed MJPEG을 사용합니다
+live_view = LiveView(app, lambda: controller.broadcaster if controller else None)
+
+# 스캔/파노라마처럼 오래 걸리는 작업은 백그라운드에서 실행하고 작업 ID를 바로 반환합니다.
+# 드론을 움직이는 작업은 key='drone'으로 한 번에 하나씩 실행됩니다. 비전 LLM 분석처럼 드론과 상관없는 단계가 긴
+# 작업은 key 없이 실행하고, 드론에 명령하는 부분만 jobs.hold('drone')으로 감쌉니다.
+jobs = JobRunner(max_workers=2)
+jobs.register_routes(app)
+
+# 드론 상태를 한 번만 읽어 접속한 모든 대시보드에 변경분만 보냅니다 (/telemetry/stream)
+telemetry = TelemetryPublisher(
+    app, lambda: {controller.tello.address[0]: controller.tello} if controller and controller.is_streaming else {})
+
 def get_frame():
     """프레임 스트리밍을 위한 제너레이터 함수"""
-    while True:
-        if controller and not controller.frame_queue.empty():
-            frame = controller.frame_queue.get()
-            _, buffer = cv2.imencode('.jpg', frame)
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        else:
-            time.sleep(0.03)
+    while controller is None:
+        time.sleep(0.5)
+    yield from controller.broadcaster.mjpeg_stream()
 
 @app.route('/')
 def index():
@@ -359,6 +341,7 @@ def connect_drone():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/scan', methods=['POST'])
+@jobs.background()  # 비전 LLM을 기다리는 동안 드론 명령을 막지 않습니다
 def scan_surroundings():
     try:
         if controller:
@@ -375,11 +358,13 @@ def scan_surroundings():
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/panorama', methods=['POST'])
+@jobs.background()  # 회전하는 동안에만 jobs.hold('drone')으로 드론을 독점합니다
 def create_panorama():
     try:
         if controller:
-            panorama_path = controller.create_panorama()
-            analysis = controller.analyze_image(panorama_path)
+            panorama_path, panorama = controller.create_panorama()
+            report_progress("파노라마 분석 중...")
+            analysis = controller.analyze_image(panorama)
             return jsonify({
                 "status": "success",
                 "message": "파노라마 촬영이 완료되었습니다.",
@@ -394,9 +379,11 @@ def serve_photo(filename):
     return send_from_directory('photos', filename)
 
 @app.route('/control', methods=['POST'])
+@jobs.background(key='drone')
 def control_drone():
     try:
         if controller:
+            controller.speaker.cancel()  # 새 명령이 오면 읽던 분석을 멈춥니다
             command = request.json.get('command')
             params = request.json.get('parameters', {})
             
@@ -491,7 +478,12 @@ def ensure_template_exists():
     <div class="container">
         <h1>Tello Drone Scanner</h1>
         <div class="video-container">
-            <img src="{{ url_for('video_feed') }}" width="640" height="480">
+            <img id="video" src="{{ url_for('video_feed') }}" width="640" height="480">
+            <div id="video-stats" style="color: #ccc; font-size: 12px;"></div>
+            <div id="telemetry" data-rate="5" style="color: #ccc; font-size: 12px;"></div>
+            <script src="/telemetry/telemetry.js"></script>
+            <script src="/live/live_view.js"></script>
+            <script src="/jobs/jobs.js"></script>
         </div>
         <div class="controls">
             <button onclick="connectDrone()">드론 연결</button>
@@ -533,7 +525,7 @@ def ensure_template_exists():
                 const response = await fetch('/scan', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
                 if (data.analysis) {
                     updateAnalysis(data.analysis);
@@ -549,7 +541,7 @@ def ensure_template_exists():
                 const response = await fetch('/panorama', {
                     method: 'POST'
                 });
-                const data = await response.json();
+                const data = await followJob(await response.json());
                 updateStatus(data.message, data.status === 'error');
                 if (data.analysis) {
                     updateAnalysis(data.analysis);
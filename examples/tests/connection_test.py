@@ -1,38 +1,17 @@
-from djitellopy import Tello
-import time
-import socket
-import os
+from djitellopy import Tello, TelloNetwork
 
-def cleanup_port(port):
-    try:
-        # Create a test socket
-        temp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        temp_socket.bind(('', port))
-        temp_socket.close()
-        return True
-    except:
-        # Port is in use, try to force close it
-        try:
-            os.system(f'kill -9 $(lsof -t -i:{port})')
-            time.sleep(1)
-            return True
-        except:
-            return False
 
 def test_drone_connection():
     print("드론 연결 테스트를 시작합니다...")
     
-    # Clean up the Tello ports before connecting
-    print("1. 포트 정리 중...")
-    if cleanup_port(8889):
-        print("✓ 포트 8889 정리 완료")
-    else:
-        print("❌ 포트 8889를 정리할 수 없습니다")
-        print("컴퓨터를 재시작해주세요")
-        return False
-    
-    time.sleep(1)
-    tello = Tello()
+    # 포트를 0으로 주면 운영체제가 빈 포트를 골라주므로
+    # 다른 프로세스가 8889/8890 포트를 점유하고 있어도 테스트할 수 있습니다
+    # (connect()가 드론에 상태 포트를 알려줍니다)
+    print("1. 로컬 네트워크 준비 중...")
+    network = TelloNetwork(control_port=0, state_port=0)
+    print(f"✓ 제어 포트 {network.control_port}, 상태 포트 {network.state_port} 사용")
+
+    tello = Tello(network=network)
     
     try:
         print("\n2. 드론에 연결 시도 중...")
@@ -59,6 +38,7 @@ def test_drone_connection():
         
     finally:
         tello.end()
+        network.close()
 
 if __name__ == "__main__":
     test_drone_connection() 
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""`import djitellopy`에 걸리는 시간을 측정합니다.
+Measure how long `import djitellopy` takes in a fresh interpreter.
+
+비디오 의존성(av, numpy)은 get_frame_read()를 처음 호출할 때 불러오므로
+여기서는 포함되지 않아야 합니다.
+
+    python examples/tests/import_time_benchmark.py [반복 횟수]
+"""
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import djitellopy
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('av', 'numpy', 'cv2', 'PIL') if name in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def measure(runs):
+    timings = []
+    heavy = ''
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', SNIPPET], text=True)
+        elapsed, heavy = output.strip().partition(' ')[::2]
+        timings.append(float(elapsed) * 1000)
+    return timings, heavy
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    timings, heavy = measure(runs)
+
+    print(f"import djitellopy: 중앙값 {statistics.median(timings):.1f} ms, "
+          f"최소 {min(timings):.1f} ms, 최대 {max(timings):.1f} ms ({runs}회)")
+    if heavy:
+        print(f"경고: 무거운 모듈이 임포트 시점에 로드됨: {heavy}")
+    else:
+        print("✓ av/numpy/cv2/PIL은 임포트 시점에 로드되지 않습니다")
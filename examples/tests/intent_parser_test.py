@@ -0,0 +1,68 @@
+"""빠른 명령 해석기가 부정문을 LLM으로 넘기는지 확인합니다.
+Check that the fast-path intent parser never acts on negated commands.
+
+    python examples/tests/intent_parser_test.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_parser import IntentParser
+
+NEGATED = [
+    "don't take off",
+    "Don't land",
+    "Don't go forward",
+    "do not land",
+    "dont turn right",
+    "wait, not yet land",
+    "never take off",
+    "이륙하지 마",
+    "착륙하지 말아줘",
+    "앞으로 가지 말고 기다려",
+    "회전하지 않아도 돼",
+    "앞으로 1미터 가지 마세요",
+    "오른쪽으로 가지마",
+    "이륙 안 해",
+    "아직 이륙하지는 마",
+    "착륙 안 해도 돼",
+    "착륙 못 해",
+    "이륙 금지",
+    "이륙 그만",
+    "멈춰 착륙은 나중에",
+    "cancel takeoff",
+    "no, land later",
+    "wait and land",
+]
+
+PLAIN = {
+    "take off": "takeoff",
+    "land now": "land",
+    "이륙해줘": "takeoff",
+    "앞으로 1미터": "move",
+    "안전하게 착륙해": "land",
+    "go forward 1 meter now": "move",
+}
+
+
+def test_negated_commands_escalate():
+    parser = IntentParser()
+    for text in NEGATED:
+        intent = parser.parse(text)
+        assert intent is None, f"부정문이 명령으로 해석됨: {text!r} -> {intent}"
+        print(f"✓ {text!r} -> LLM")
+
+
+def test_plain_commands_still_parse():
+    parser = IntentParser()
+    for text, command in PLAIN.items():
+        intent = parser.parse(text)
+        assert intent is not None and intent["command"] == command, f"{text!r} -> {intent}"
+        print(f"✓ {text!r} -> {intent['command']}")
+
+
+if __name__ == "__main__":
+    test_negated_commands_escalate()
+    test_plain_commands_still_parse()
+    print("\n모든 테스트가 성공적으로 완료되었습니다!")
@@ -0,0 +1,272 @@
+"""LLM이 만든 드론 명령을 검증하고 실행하는 안전한 디스패처.
+Safe dispatcher that validates and runs drone commands produced by an LLM.
+
+에이전트가 돌려준 `tello.move_forward(100)`, `{"command": "rotate_clockwise", "args": [90]}` 같은 출력을
+`eval` 없이 AST 리터럴/JSON으로 파싱하고, 시작할 때 한 번 만들어 두는 명령 표(허용된 Tello 메서드와 그 시그니처,
+값 범위)로 검증합니다. 여러 줄로 된 계획은 모두 검증한 뒤 하나의 명령 순서로 실행하므로, 중간에 잘못된 명령이
+있으면 아무것도 실행하지 않습니다.
+
+```python
+dispatcher = ToolDispatcher(tello)
+dispatcher.run("tello.takeoff()\ntello.move_forward(100)\ntello.rotate_clockwise(90)")
+dispatcher.run('{"command": "emergency"}')  # UnsafeCommandError: 허용되지 않은 명령
+```
+"""
+
+import ast
+import fnmatch
+import functools
+import inspect
+import json
+from collections import namedtuple
+
+from djitellopy import Tello
+
+# 에이전트가 호출할 수 있는 Tello 메서드 (fnmatch 패턴)
+ALLOWED_COMMANDS = [
+    "takeoff", "land", "stop",
+    "move", "move_*", "rotate_*", "flip", "flip_*",
+    "go_xyz_speed", "curve_xyz_speed", "set_speed", "send_rc_control",
+    "get_*", "query_*",
+]
+# 패턴에 걸리더라도 허용하지 않는 메서드 (내부용이거나 객체를 반환함)
+DENIED_COMMANDS = [
+    "get_frame_read", "get_own_udp_object", "get_udp_video_address", "get_state_field",
+    "get_current_state", "get_last_state_update", "query_many",
+]
+# "메서드.인자" 패턴별 허용 범위 (Tello SDK 기준)
+PARAMETER_RANGES = {
+    "move*.x": (20, 500),
+    "rotate_*.x": (1, 360),
+    "set_speed.x": (10, 100),
+    "go_xyz_speed.[xyz]": (-500, 500),
+    "curve_xyz_speed.[xyz][12]": (-500, 500),
+    "go_xyz_speed.speed": (10, 100),
+    "curve_xyz_speed.speed": (10, 60),
+    "send_rc_control.*": (-100, 100),
+}
+PARAMETER_CHOICES = {
+    "move.direction": {"up", "down", "left", "right", "forward", "back"},
+    "flip.direction": {"l", "r", "f", "b"},
+}
+MAX_STEPS = 10
+
+Call = namedtuple('Call', ['name', 'args'])
+
+
+class UnsafeCommandError(ValueError):
+    """명령 표에 없거나 인자가 잘못된 명령"""
+    pass
+
+
+def _lookup(table, name, parameter):
+    for pattern, value in table.items():
+        if fnmatch.fnmatchcase(f"{name}.{parameter}", pattern):
+            return value
+    return None
+
+
+class CommandTable:
+    """허용된 Tello 메서드의 시그니처와 값 범위를 담은 명령 표"""
+
+    def __init__(self, cls=Tello):
+        self.signatures = {}
+        for name, method in inspect.getmembers(cls, inspect.isfunction):
+            if name.startswith('_') or any(fnmatch.fnmatchcase(name, pattern) for pattern in DENIED_COMMANDS):
+                continue
+            if any(fnmatch.fnmatchcase(name, pattern) for pattern in ALLOWED_COMMANDS):
+                signature = inspect.signature(method)
+                parameters = list(signature.parameters.values())[1:]  # self 제외
+                self.signatures[name] = signature.replace(parameters=parameters)
+
+    def __contains__(self, name):
+        return name in self.signatures
+
+    def describe(self):
+        """프롬프트나 캐시 스키마에 쓸 수 있는 명령 목록"""
+        return [f"{name}{signature}" for name, signature in sorted(self.signatures.items())]
+
+    def validate(self, name, args, kwargs):
+        """인자를 시그니처에 맞춰 검증하고 변환한 Call을 반환합니다.
+        Call.args에는 실제로 전달된 인자까지만 위치 순서대로 담습니다. 그 사이에 빠진 인자는 기본값으로 채웁니다
+        """
+        if name not in self.signatures:
+            raise UnsafeCommandError(f"허용되지 않은 명령입니다: {name}")
+        signature = self.signatures[name]
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError as e:
+            raise UnsafeCommandError(f"{name}의 인자가 올바르지 않습니다: {e}")
+
+        parameters = list(signature.parameters.values())
+        passed = [i for i, parameter in enumerate(parameters) if parameter.name in bound.arguments]
+        values = []
+        for parameter in parameters[:passed[-1] + 1] if passed else []:
+            if parameter.name not in bound.arguments:
+                values.append(parameter.default)
+                continue
+            value = self._convert(name, parameter, bound.arguments[parameter.name])
+            values.append(value)
+        return Call(name, tuple(values))
+
+    def _convert(self, name, parameter, value):
+        if value is None and parameter.default is None:
+            return value
+        annotation = parameter.annotation
+        try:
+            if annotation is int:
+                if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                    raise ValueError(value)
+                value = int(value)
+            elif annotation is float:
+                if isinstance(value, bool):
+                    raise ValueError(value)
+                value = float(value)
+            elif annotation is str and not isinstance(value, str):
+                raise ValueError(value)
+        except (TypeError, ValueError):
+            raise UnsafeCommandError(f"{name}의 {parameter.name} 값이 올바르지 않습니다: {value!r}")
+
+        limits = _lookup(PARAMETER_RANGES, name, parameter.name)
+        if limits is not None and not limits[0] <= value <= limits[1]:
+            raise UnsafeCommandError(
+                f"{name}의 {parameter.name} 값 {value}이(가) 허용 범위 {limits[0]}~{limits[1]}를 벗어났습니다")
+        choices = _lookup(PARAMETER_CHOICES, name, parameter.name)
+        if choices is not None and value not in choices:
+            raise UnsafeCommandError(f"{name}의 {parameter.name} 값은 {sorted(choices)} 중 하나여야 합니다")
+        return value
+
+
+@functools.lru_cache(maxsize=None)
+def command_table():
+    """Tello 명령 표. 처음 호출할 때 한 번만 만듭니다"""
+    return CommandTable(Tello)
+
+
+def _strip_code_fence(text):
+    lines = [line for line in text.strip().splitlines() if not line.strip().startswith('```')]
+    return '\n'.join(lines).strip()
+
+
+def _parse_python(text):
+    """'tello.move_forward(100)' 형태의 호출들을 (이름, 인자, 키워드 인자)로 파싱합니다"""
+    try:
+        tree = ast.parse(text, mode='exec')
+    except SyntaxError as e:
+        raise UnsafeCommandError(f"명령을 해석할 수 없습니다: {e.msg}")
+
+    steps = []
+    for statement in tree.body:
+        if not isinstance(statement, ast.Expr):
+            raise UnsafeCommandError("드론 명령 호출만 사용할 수 있습니다")
+        node = statement.value
+        call = node if isinstance(node, ast.Call) else None
+        target = call.func if call else node
+        if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == 'tello':
+            name = target.attr
+        elif isinstance(target, ast.Name):
+            name = target.id
+        else:
+            raise UnsafeCommandError("드론 명령 호출만 사용할 수 있습니다")
+
+        try:
+            args = [ast.literal_eval(arg) for arg in call.args] if call else []
+            kwargs = {keyword.arg: ast.literal_eval(keyword.value) for keyword in call.keywords} if call else {}
+        except ValueError:
+            raise UnsafeCommandError(f"{name}의 인자는 숫자나 문자열 값이어야 합니다")
+        if None in kwargs:
+            raise UnsafeCommandError(f"{name}에 **인자를 사용할 수 없습니다")
+        steps.append((name, args, kwargs))
+    return steps
+
+
+def _parse_json_step(step):
+    if isinstance(step, str):
+        return _parse_python(step)
+    if not isinstance(step, dict):
+        raise UnsafeCommandError("JSON 명령은 객체나 문자열이어야 합니다")
+    name = step.get("command") or step.get("name")
+    if not isinstance(name, str):
+        raise UnsafeCommandError("JSON 명령에 command가 없습니다")
+    if '(' in name or '\n' in name:
+        return _parse_python(name)
+    arguments = step.get("args", step.get("arguments", step.get("parameters", [])))
+    if isinstance(arguments, dict):
+        return [(name.replace('tello.', '', 1), [], arguments)]
+    if isinstance(arguments, list):
+        return [(name.replace('tello.', '', 1), arguments, {})]
+    raise UnsafeCommandError("JSON 명령의 args는 배열이나 객체여야 합니다")
+
+
+def parse_plan(text):
+    """LLM 출력(파이썬 호출 또는 JSON)을 (이름, 인자, 키워드 인자) 목록으로 파싱합니다"""
+    text = _strip_code_fence(text)
+    if not text:
+        raise UnsafeCommandError("명령이 비어 있습니다")
+    if text[0] in '[{':
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise UnsafeCommandError(f"JSON 명령을 해석할 수 없습니다: {e}")
+        steps = []
+        for step in data if isinstance(data, list) else [data]:
+            steps.extend(_parse_json_step(step))
+        return steps
+    return _parse_python(text)
+
+
+def format_call(call):
+    """다시 실행할 수 있는 'move_forward(100)' 형태의 문자열 (parse_plan으로 다시 읽을 수 있습니다)"""
+    return f"{call.name}({', '.join(repr(arg) for arg in call.args)})"
+
+
+def is_query(call):
+    """드론 상태를 읽기만 하는 명령. 결과가 상태에 따라 달라지므로 캐시하면 안 됩니다"""
+    return call.name.startswith(('get_', 'query_'))
+
+
+def summarize(calls, results):
+    """실행 결과 메시지. 조회 명령은 값을, 제어 명령은 호출만 표시합니다 (다시 실행할 수 없는 형식)"""
+    lines = []
+    for call, result in zip(calls, results):
+        suffix = f" -> {result}" if result is not None and is_query(call) else ""
+        lines.append(format_call(call) + suffix)
+    return "; ".join(lines)
+
+
+class ToolDispatcher:
+    """명령 표로 검증한 뒤 드론에서 실행하는 디스패처.
+
+    Args:
+        tello: 명령을 실행할 Tello
+        table: 명령 표. 생략하면 공유 명령 표를 사용합니다
+        max_steps: 한 번에 실행할 수 있는 최대 명령 수
+    """
+
+    def __init__(self, tello, table=None, max_steps=MAX_STEPS):
+        self.tello = tello
+        self.table = table or command_table()
+        self.max_steps = max_steps
+
+    def plan(self, text):
+        """LLM 출력을 검증된 Call 목록으로 변환합니다. 하나라도 잘못되면 UnsafeCommandError"""
+        steps = parse_plan(text)
+        if len(steps) > self.max_steps:
+            raise UnsafeCommandError(f"명령이 너무 많습니다 ({len(steps)}개, 최대 {self.max_steps}개)")
+        return [self.table.validate(name, args, kwargs) for name, args, kwargs in steps]
+
+    def execute(self, calls):
+        """Call들을 순서대로 실행하고 결과 목록을 반환합니다.
+        실행하는 동안 명령 잠금을 잡고 있으므로 다른 명령(keepalive 등)이 중간에 끼어들지 않습니다.
+        """
+        results = []
+        with self.tello.command_lock:
+            for call in calls:
+                print(f"명령 실행: {format_call(call)}")
+                results.append(getattr(self.tello, call.name)(*call.args))
+        return results
+
+    def run(self, text):
+        """LLM 출력을 검증하고 실행한 뒤 결과 메시지를 반환합니다"""
+        calls = self.plan(text)
+        return summarize(calls, self.execute(calls))
@@ -0,0 +1,117 @@
+"""웹 UI 예제에서 공유하는 비디오 브로드캐스터.
+Video broadcaster shared by the web UI examples.
+
+프레임마다 JPEG 인코딩을 한 번만 수행하고, 최신 JPEG을 시퀀스 번호와 함께 공유 슬롯에 보관합니다.
+접속한 클라이언트 수와 관계없이 인코딩 비용은 같으며, 클라이언트끼리 프레임을 빼앗지 않습니다.
+Each frame is JPEG encoded once and the latest JPEG is kept in a shared slot
+together with a sequence number, so any number of clients can stream it
+without consuming each other's frames.
+"""
+
+import threading
+import time
+
+import cv2
+
+
+class VideoBroadcaster:
+    """최신 프레임을 한 번 인코딩하여 여러 클라이언트에 나눠주는 브로드캐스터.
+
+    Args:
+        frame_source: 최신 RGB 프레임(또는 None)을 반환하는 함수
+        quality: JPEG 품질 (0-100)
+        size: 출력 해상도 (너비, 높이). None이면 원본 크기
+        max_fps: 인코딩 최대 프레임 수
+    """
+
+    def __init__(self, frame_source, quality=80, size=(640, 480), max_fps=30):
+        self.frame_source = frame_source
+        self.quality = quality
+        self.size = size
+        self.max_fps = max_fps
+
+        self.condition = threading.Condition()
+        self.jpeg = None
+        self.sequence = 0
+        self.encoded_at = 0.0
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """인코딩 스레드 시작"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """인코딩 스레드 정지. 클라이언트는 다시 시작될 때까지 새 프레임을 기다립니다."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def encode(self, frame):
+        """RGB 프레임을 설정된 크기와 품질의 JPEG 바이트로 변환"""
+        if self.size is not None and (frame.shape[1], frame.shape[0]) != tuple(self.size):
+            frame = cv2.resize(frame, tuple(self.size), interpolation=cv2.INTER_AREA)
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return buffer.tobytes() if ok else None
+
+    def publish(self, jpeg):
+        """인코딩된 JPEG을 공유 슬롯에 넣고 기다리는 클라이언트를 모두 깨웁니다"""
+        with self.condition:
+            self.jpeg = jpeg
+            self.sequence += 1
+            self.encoded_at = time.time()
+            self.condition.notify_all()
+
+    def _encode_loop(self):
+        interval = 1.0 / self.max_fps
+        last_frame = None
+        while self.running:
+            started = time.monotonic()
+            frame = self.frame_source()
+            # 같은 프레임을 다시 인코딩하지 않습니다
+            if frame is not None and frame is not last_frame:
+                last_frame = frame
+                jpeg = self.encode(frame)
+                if jpeg is not None:
+                    self.publish(jpeg)
+            remaining = interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def latest(self):
+        """(시퀀스 번호, JPEG 바이트) 반환. 아직 프레임이 없으면 JPEG은 None"""
+        with self.condition:
+            return self.sequence, self.jpeg
+
+    def wait_for_frame(self, last_sequence, timeout=1.0):
+        """`last_sequence` 이후의 새 프레임을 기다립니다.
+
+        브로드캐스터가 멈춰 있는 동안에도 timeout까지 기다리므로, 호출하는 루프가 헛돌지 않습니다.
+
+        Returns:
+            (시퀀스 번호, JPEG 바이트). 시간 안에 새 프레임이 없으면 JPEG은 None
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence != last_sequence, timeout)
+            if self.sequence == last_sequence:
+                return last_sequence, None
+            return self.sequence, self.jpeg
+
+    def mjpeg_stream(self):
+        """multipart/x-mixed-replace 응답용 제너레이터.
+        느린 클라이언트는 중간 프레임을 건너뛰고 항상 최신 프레임을 받습니다.
+        """
+        sequence = 0
+        while True:
+            sequence, jpeg = self.wait_for_frame(sequence)
+            if jpeg is None:
+                continue
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
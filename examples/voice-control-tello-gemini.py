@@ -6,6 +6,8 @@ import os
 import json
 import time
 from dotenv import load_dotenv
+from intent_parser import IntentParser
+from intent_cache import IntentCache
 
 # .env 파일 로드
 load_dotenv()
@@ -135,8 +137,19 @@ class TelloController:
             print(f"명령 실행 중 오류 발생: {str(e)}")
             raise
 
+# 간단한 명령은 Gemini 없이 바로 해석합니다
+intent_parser = IntentParser()
+
+# 한 번 해석한 문장은 저장해 두고 Gemini 없이 재사용합니다. 명령 스키마가 바뀌면 초기화됩니다
+intent_cache = IntentCache(schema=["gemini-1.5-flash", TelloController.available_functions],
+                           path='voice_intent_cache_gemini.json')
+
 def process_voice_command(audio_text: str) -> Dict:
-    """음성 명령을 Function calling 형식으로 변환"""
+    """음성 명령을 Function calling 형식으로 변환. 간단한 명령과 반복된 명령은 Gemini를 거치지 않습니다"""
+    return intent_parser.resolve(audio_text, lambda text: intent_cache.resolve(text, interpret_with_gemini))
+
+def interpret_with_gemini(audio_text: str) -> Dict:
+    """Gemini로 음성 명령을 JSON 명령으로 해석"""
     prompt = """당신은 드론 제어 시스템입니다. 사용자의 자연어 명령을 드론 제어 명령으로 변환합니다.
 
 가능한 명령어와 형식:
@@ -197,6 +210,8 @@ def main():
                     
                     # 종료 명령 확인
                     if "종료" in text:
+                        print(f"빠른 해석 통계: {intent_parser.stats()}")
+                        print(f"명령 캐시 통계: {intent_cache.stats()}")
                         print("프로그램을 종료합니다.")
                         break
                     
@@ -204,8 +219,12 @@ def main():
                     command = process_voice_command(text)
                     print(f"해석된 명령: {json.dumps(command, ensure_ascii=False)}")
                     
-                    # 드론 제어 실행
-                    controller.execute_function(command["command"], command.get("parameters"))
+                    # 드론 제어 실행. 실패하면 잘못 해석된 명령일 수 있으므로 캐시에서 지웁니다
+                    try:
+                        controller.execute_function(command["command"], command.get("parameters"))
+                    except Exception:
+                        intent_cache.discard(text)
+                        raise
                     
                 except sr.UnknownValueError:
                     print("음성을 인식하지 못했습니다.")
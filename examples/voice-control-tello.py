@@ -15,6 +15,8 @@ from PyQt5.QtGui import QImage, QPixmap
 import sys
 from ultralytics import YOLO
 import numpy as np
+from intent_parser import IntentParser
+from intent_cache import IntentCache
 
 # YOLO 모델 로드 및 최적화
 model = YOLO('yolov8n.pt')
@@ -372,8 +374,21 @@ class TelloController:
             print(f"명령 실행 중 오류 발생: {str(e)}")
             raise
 
+# 간단한 명령은 LLM 없이 바로 해석합니다
+intent_parser = IntentParser(keywords={
+    "detect_objects": ["뭐가 보이", "무엇이 보이", "뭐가 있", "무엇이 있", "물체", "감지"]
+})
+
+# 한 번 해석한 문장은 저장해 두고 LLM 없이 재사용합니다. 명령 스키마가 바뀌면 초기화됩니다
+intent_cache = IntentCache(schema=["gpt-4o-mini", TelloController.available_functions],
+                           path='voice_intent_cache.json')
+
 def process_voice_command(audio_text: str) -> Dict:
-    """음성 명령을 Function calling 형식으로 변환"""
+    """음성 명령을 Function calling 형식으로 변환. 간단한 명령과 반복된 명령은 LLM을 거치지 않습니다"""
+    return intent_parser.resolve(audio_text, lambda text: intent_cache.resolve(text, interpret_with_llm))
+
+def interpret_with_llm(audio_text: str) -> Dict:
+    """GPT Function calling으로 음성 명령을 해석"""
     system_prompt = """
     당신은 드론 제어 시스템입니다. 사용자의 자연어 명령을 드론 제어 명령으로 변환합니다.
     
@@ -429,11 +444,6 @@ def process_voice_command(audio_text: str) -> Dict:
     ]
 
     try:
-        # 물체 감지 관련 키워드 확인
-        detection_keywords = ["뭐가 보이", "무엇이 보이", "뭐가 있", "무엇이 있", "물체", "감지"]
-        if any(keyword in audio_text for keyword in detection_keywords):
-            return {"command": "detect_objects"}
-            
         response = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
@@ -487,6 +497,8 @@ def main():
                     
                     # 종료 명령 확인
                     if "종료" in text:
+                        print(f"빠른 해석 통계: {intent_parser.stats()}")
+                        print(f"명령 캐시 통계: {intent_cache.stats()}")
                         print("프로그램을 종료합니다.")
                         controller.stop_camera()
                         app.quit()
@@ -496,8 +508,12 @@ def main():
                     command = process_voice_command(text)
                     print(f"해석된 명령: {json.dumps(command, ensure_ascii=False)}")
                     
-                    # 드론 제어 실행
-                    controller.execute_function(command["command"], command.get("parameters"))
+                    # 드론 제어 실행. 실패하면 잘못 해석된 명령일 수 있으므로 캐시에서 지웁니다
+                    try:
+                        controller.execute_function(command["command"], command.get("parameters"))
+                    except Exception:
+                        intent_cache.discard(text)
+                        raise
                     
                 except sr.UnknownValueError:
                     print("음성을 인식하지 못했습니다.")
@@ -22,10 +22,12 @@ setuptools.setup(
     keywords=['tello', 'dji', 'drone', 'sdk', 'official sdk'],
     install_requires=[
         'numpy',
-        'opencv-python',
         'av',
-        'pillow'
     ],
+    extras_require={
+        # examples/ 의 OpenCV 기반 예제용 / for the OpenCV based examples
+        'examples': ['opencv-python', 'pillow'],
+    },
     python_requires='>=3.6',
     classifiers=[
         'Development Status :: 5 - Production/Stable',